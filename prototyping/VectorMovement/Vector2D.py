@@ -1,5 +1,35 @@
 import math, operator
 
+# the types taken for a scalar operand before trying a sequence
+try:
+	_SCALARS = (int, float, long)
+except NameError:
+	_SCALARS = (int, float)
+
+# the cos and sin of the angles rotated by (most rotations repeat a few
+# angles); cleared when it holds this many angles
+ROTATION_CACHE_SIZE = 360
+_rotations = {}
+
+def _cos_sin(angle_degrees):
+	try:
+		return _rotations[angle_degrees]
+	except KeyError:
+		if len(_rotations) >= ROTATION_CACHE_SIZE:
+			_rotations.clear()
+		radians = math.radians(angle_degrees)
+		cos_sin = _rotations[angle_degrees] = (math.cos(radians), math.sin(radians))
+		return cos_sin
+
+def _result(out, x, y):
+	# the methods with an out parameter store their result in it
+	# instead of allocating a new vector
+	if out is None:
+		return Vector2D(x, y)
+	out.x = x
+	out.y = y
+	return out
+
 class Vector2D(object):
 	__slots__ = ['x', 'y']
 
@@ -33,12 +63,16 @@ class Vector2D(object):
 		return 'Vector2D (%s, %s)' % (self.x, self.y)
 
 	def __eq__(self, other):
+		if isinstance(other, Vector2D):
+			return self.x == other.x and self.y == other.y
 		if hasattr(other, "__getitem__") and len(other) == 2:
 			return self.x == other[0] and self.y == other[1]
 		else:
 			return False
 
 	def __ne__(self, other):
+		if isinstance(other, Vector2D):
+			return self.x != other.x or self.y != other.y
 		if hasattr(other, "__getitem__") and len(other) == 2:
 			return self.x != other[0] or self.y != other[1]
 		else:
@@ -50,19 +84,29 @@ class Vector2D(object):
 	def _o2(self, other, f):
 		if isinstance(other, Vector2D):
 			return Vector2D(f(self.x, other.x), f(self.y, other.y))
+		elif isinstance(other, _SCALARS):
+			return Vector2D(f(self.x, other), f(self.y, other))
 		elif (hasattr(other, "__getitem__")):
 			return Vector2D(f(self.x, other[0]), f(self.y, other[1]))
 		else:
 			return Vector2D(f(self.x, other), f(self.y, other))
 
 	def _r_o2(self, other, f):
-		if (hasattr(other, "__getitem__")):
+		if isinstance(other, _SCALARS):
+			return Vector2D(f(other, self.x), f(other, self.y))
+		elif (hasattr(other, "__getitem__")):
 			return Vector2D(f(other[0], self.x), f(other[1], self.y))
 		else:
 			return Vector2D(f(other, self.x), f(other, self.y))
 
 	def _io(self, other, f):
-		if (hasattr(other, "__getitem__")):
+		if isinstance(other, Vector2D):
+			self.x = f(self.x, other.x)
+			self.y = f(self.y, other.y)
+		elif isinstance(other, _SCALARS):
+			self.x = f(self.x, other)
+			self.y = f(self.y, other)
+		elif (hasattr(other, "__getitem__")):
 			self.x = f(self.x, other[0])
 			self.y = f(self.y, other[1])
 		else:
@@ -73,6 +117,8 @@ class Vector2D(object):
 	def __add__(self, other):
 		if isinstance(other, Vector2D):
 			return Vector2D(self.x + other.x, self.y + other.y)
+		elif isinstance(other, _SCALARS):
+			return Vector2D(self.x + other, self.y + other)
 		elif hasattr(other, "__getitem__"):
 			return Vector2D(self.x + other[0], self.y + other[1])
 		else:
@@ -83,6 +129,9 @@ class Vector2D(object):
 		if isinstance(other, Vector2D):
 			self.x += other.x
 			self.y += other.y
+		elif isinstance(other, _SCALARS):
+			self.x += other
+			self.y += other
 		elif hasattr(other, "__getitem__"):
 			self.x += other[0]
 			self.y += other[1]
@@ -94,7 +143,9 @@ class Vector2D(object):
 	def __sub__(self, other):
 		if isinstance(other, Vector2D):
 			return Vector2D(self.x - other.x, self.y - other.y)
-		elif (hasattr(other, "__getitem__")):
+		elif isinstance(other, _SCALARS):
+			return Vector2D(self.x - other, self.y - other)
+		elif hasattr(other, "__getitem__"):
 			return Vector2D(self.x - other[0], self.y - other[1])
 		else:
 			return Vector2D(self.x - other, self.y - other)
@@ -102,7 +153,9 @@ class Vector2D(object):
 	def __rsub__(self, other):
 		if isinstance(other, Vector2D):
 			return Vector2D(other.x - self.x, other.y - self.y)
-		if (hasattr(other, "__getitem__")):
+		elif isinstance(other, _SCALARS):
+			return Vector2D(other - self.x, other - self.y)
+		elif hasattr(other, "__getitem__"):
 			return Vector2D(other[0] - self.x, other[1] - self.y)
 		else:
 			return Vector2D(other - self.x, other - self.y)
@@ -111,7 +164,10 @@ class Vector2D(object):
 		if isinstance(other, Vector2D):
 			self.x -= other.x
 			self.y -= other.y
-		elif (hasattr(other, "__getitem__")):
+		elif isinstance(other, _SCALARS):
+			self.x -= other
+			self.y -= other
+		elif hasattr(other, "__getitem__"):
 			self.x -= other[0]
 			self.y -= other[1]
 		else:
@@ -122,7 +178,9 @@ class Vector2D(object):
 	def __mul__(self, other):
 		if isinstance(other, Vector2D):
 			return Vector2D(self.x * other.x, self.y * other.y)
-		if (hasattr(other, "__getitem__")):
+		elif isinstance(other, _SCALARS):
+			return Vector2D(self.x * other, self.y * other)
+		elif hasattr(other, "__getitem__"):
 			return Vector2D(self.x * other[0], self.y * other[1])
 		else:
 			return Vector2D(self.x * other, self.y * other)
@@ -132,7 +190,10 @@ class Vector2D(object):
 		if isinstance(other, Vector2D):
 			self.x *= other.x
 			self.y *= other.y
-		elif (hasattr(other, "__getitem__")):
+		elif isinstance(other, _SCALARS):
+			self.x *= other
+			self.y *= other
+		elif hasattr(other, "__getitem__"):
 			self.x *= other[0]
 			self.y *= other[1]
 		else:
@@ -165,7 +226,7 @@ class Vector2D(object):
 		return self._r_o2(other, operator.truediv)
 
 	def __itruediv__(self, other):
-		return self._io(other, operator.floordiv)
+		return self._io(other, operator.truediv)
 
 	def __mod__(self, other):
 		return self._o2(other, operator.mod)
@@ -222,10 +283,12 @@ class Vector2D(object):
 		return Vector2D(-self.x, -self.y)
 
 	def get_length_sqrd(self):
-		return self.x**2 + self.y**2
+		x, y = self.x, self.y
+		return x*x + y*y
 
 	def get_length(self):
-		return math.sqrt(self.x**2 + self.y**2)
+		x, y = self.x, self.y
+		return math.sqrt(x*x + y*y)
 
 	def __setlength(self, value):
 		length = self.get_length()
@@ -234,21 +297,12 @@ class Vector2D(object):
 	length = property(get_length, __setlength, None, "gets or sets the magnitude of the vector")
 
 	def rotate(self, angle_degrees):
-		radians = math.radians(angle_degrees)
-		cos = math.cos(radians)
-		sin = math.sin(radians)
-		x = self.x*cos - self.y*sin
-		y = self.x*sin + self.y*cos
-		self.x = x
-		self.y = y
-
-	def rotated(self, angle_degrees):
-		radians = math.radians(angle_degrees)
-		cos = math.cos(radians)
-		sin = math.sin(radians)
-		x = self.x*cos - self.y*sin
-		y = self.x*sin + self.y*cos
-		return Vector2D(x, y)
+		self.rotated(angle_degrees, self)
+
+	def rotated(self, angle_degrees, out = None):
+		cos, sin = _cos_sin(angle_degrees)
+		x, y = self.x, self.y
+		return _result(out, x*cos - y*sin, x*sin + y*cos)
 
 	def get_angle(self):
 		if (self.get_length_sqrd() == 0):
@@ -266,47 +320,57 @@ class Vector2D(object):
 		dot = self.x*other[0] + self.y*other[1]
 		return math.degrees(math.atan2(cross, dot))
 
-	def normalized(self):
-		length = self.length
+	def normalized(self, out = None):
+		x, y = self.x, self.y
+		length = math.sqrt(x*x + y*y)
 		if length != 0:
-			return self / length
-		return Vector2D(self)
+			return _result(out, x / length, y / length)
+		return _result(out, x, y)
 
 	def normalize_return_length(self):
-		length = self.length
+		x, y = self.x, self.y
+		length = math.sqrt(x*x + y*y)
 		if length != 0:
-			self.x /= length
-			self.y /= length
+			self.x = x / length
+			self.y = y / length
 		return length
 
-	def perpendicular(self):
-		return Vector2D(-self.y, self.x)
+	def perpendicular(self, out = None):
+		return _result(out, -self.y, self.x)
 
-	def perpendicular_normal(self):
-		length = self.length
+	def perpendicular_normal(self, out = None):
+		x, y = self.x, self.y
+		length = math.sqrt(x*x + y*y)
 		if length != 0:
-			return Vector2D(-self.y / length, self.x / length)
-		return Vector2D(self)
+			return _result(out, -y / length, x / length)
+		return _result(out, x, y)
 
 	def dot(self, other):
+		if isinstance(other, Vector2D):
+			return float(self.x*other.x + self.y*other.y)
 		return float(self.x*other[0] + self.y*other[1])
 
 	def get_distance(self, other):
-		return math.sqrt((self.x - other[0])**2 + (self.y - other[1])**2)
+		return math.sqrt(self.get_dist_sqrd(other))
 
 	def get_dist_sqrd(self, other):
-		return (self.x - other[0])**2 + (self.y - other[1])**2
+		if isinstance(other, Vector2D):
+			dx, dy = self.x - other.x, self.y - other.y
+		else:
+			dx, dy = self.x - other[0], self.y - other[1]
+		return dx*dx + dy*dy
 
-	def projection(self, other):
-		other_length_sqrd = other[0]*other[0] + other[1]*other[1]
-		projected_length_times_other_length = self.dot(other)
-		return other * (projected_length_times_other_length / other_length_sqrd)
+	def projection(self, other, out = None):
+		ox, oy = other[0], other[1]
+		factor = (self.x*ox + self.y*oy) / float(ox*ox + oy*oy)
+		return _result(out, ox * factor, oy * factor)
 
 	def cross(self, other):
 		return self.x*other[1] - self.y*other[0]
 
-	def interpolate_to(self, other, range):
-		return Vector2D(self.x + (other[0] - self.x)*range, self.y + (other[1] - self.y)*range)
+	def interpolate_to(self, other, range, out = None):
+		x, y = self.x, self.y
+		return _result(out, x + (other[0] - x)*range, y + (other[1] - y)*range)
 
 	def convert_to_basis(self, x_vector, y_vector):
 		return Vector2D(self.dot(x_vector) / x_vector.get_length_sqrd(), self.dot(y_vector) / y_vector.get_length_sqrd())
@@ -0,0 +1,193 @@
+import numpy
+from Vector2D import Vector2D
+
+# Many vectors in one contiguous (n, 2) float64 buffer. The operations
+# work on all the vectors at once instead of allocating a Vector2D for
+# each result; indexing one element gives a view which reads and writes
+# the buffer.
+
+class Vector2DView(Vector2D):
+	__slots__ = ['row']
+
+	def __init__(self, row):
+		self.row = row
+
+	def _get_x(self):
+		return float(self.row[0])
+
+	def _set_x(self, value):
+		self.row[0] = value
+	x = property(_get_x, _set_x, None, "gets or sets the x of the viewed element")
+
+	def _get_y(self):
+		return float(self.row[1])
+
+	def _set_y(self, value):
+		self.row[1] = value
+	y = property(_get_y, _set_y, None, "gets or sets the y of the viewed element")
+
+	def __repr__(self):
+		return 'Vector2DView (%s, %s)' % (self.x, self.y)
+
+	def __reduce__(self):
+		# unpickles as a plain vector (the buffer is not pickled)
+		return (Vector2D, (self.x, self.y))
+
+
+def _operand(other):
+	if isinstance(other, Vector2DArray):
+		return other.data
+	elif isinstance(other, Vector2D):
+		return (other.x, other.y)
+	return other
+
+
+def _column(values):
+	# one value per vector (or a single value for all of them)
+	return numpy.reshape(values, (-1, 1))
+
+
+class Vector2DArray(object):
+	__slots__ = ['data']
+
+	def __init__(self, vectors, copy = True):
+		if isinstance(vectors, int):
+			self.data = numpy.zeros((vectors, 2))
+			return
+		if isinstance(vectors, Vector2DArray):
+			vectors = vectors.data
+		if copy:
+			data = numpy.array(vectors, dtype = numpy.float64)
+		else:
+			data = numpy.asarray(vectors, dtype = numpy.float64)
+		self.data = data.reshape(-1, 2)
+
+	def __len__(self):
+		return len(self.data)
+
+	def __getitem__(self, key):
+		if isinstance(key, (int, numpy.integer)):
+			return Vector2DView(self.data[key])
+		# a slice is a view of the buffer, an index array a copy
+		return Vector2DArray(self.data[key], copy = False)
+
+	def __setitem__(self, key, value):
+		self.data[key] = _operand(value)
+
+	def __iter__(self):
+		for row in self.data:
+			yield Vector2DView(row)
+
+	def __repr__(self):
+		return 'Vector2DArray (%s)' % self.data.tolist()
+
+	def copy(self):
+		return Vector2DArray(self.data)
+
+	def _get_x(self):
+		return self.data[:, 0]
+
+	def _set_x(self, value):
+		self.data[:, 0] = value
+	x = property(_get_x, _set_x, None, "gets or sets the x of all the vectors")
+
+	def _get_y(self):
+		return self.data[:, 1]
+
+	def _set_y(self, value):
+		self.data[:, 1] = value
+	y = property(_get_y, _set_y, None, "gets or sets the y of all the vectors")
+
+	def __add__(self, other):
+		return Vector2DArray(self.data + _operand(other), copy = False)
+	__radd__ = __add__
+
+	def __iadd__(self, other):
+		self.data += _operand(other)
+		return self
+
+	def __sub__(self, other):
+		return Vector2DArray(self.data - _operand(other), copy = False)
+
+	def __rsub__(self, other):
+		return Vector2DArray(_operand(other) - self.data, copy = False)
+
+	def __isub__(self, other):
+		self.data -= _operand(other)
+		return self
+
+	def __mul__(self, other):
+		return Vector2DArray(self.data * _operand(other), copy = False)
+	__rmul__ = __mul__
+
+	def __imul__(self, other):
+		self.data *= _operand(other)
+		return self
+
+	def __truediv__(self, other):
+		return Vector2DArray(self.data / _operand(other), copy = False)
+	__div__ = __truediv__
+
+	def __itruediv__(self, other):
+		self.data /= _operand(other)
+		return self
+	__idiv__ = __itruediv__
+
+	def __neg__(self):
+		return Vector2DArray(-self.data, copy = False)
+
+	def scale(self, factors):
+		self.data *= _column(factors)
+		return self
+
+	def scaled(self, factors):
+		return Vector2DArray(self.data * _column(factors), copy = False)
+
+	def get_length_sqrd(self):
+		return numpy.einsum('ij,ij->i', self.data, self.data)
+
+	def get_length(self):
+		return numpy.sqrt(self.get_length_sqrd())
+
+	def rotate(self, angle_degrees):
+		radians = numpy.radians(angle_degrees)
+		cos = numpy.cos(radians)
+		sin = numpy.sin(radians)
+		x = self.data[:, 0].copy()
+		y = self.data[:, 1]
+		self.data[:, 0] = x*cos - y*sin
+		self.data[:, 1] = x*sin + y*cos
+		return self
+
+	def rotated(self, angle_degrees):
+		return self.copy().rotate(angle_degrees)
+
+	def normalize_return_length(self):
+		length = self.get_length()
+		nonzero = length != 0
+		self.data[nonzero] /= length[nonzero, numpy.newaxis]
+		return length
+
+	def normalized(self):
+		vectors = self.copy()
+		vectors.normalize_return_length()
+		return vectors
+
+	def dot(self, other):
+		return numpy.einsum('ij,ij->i', self.data, numpy.broadcast_to(_operand(other), self.data.shape))
+
+	def get_dist_sqrd(self, other):
+		delta = self.data - _operand(other)
+		return numpy.einsum('ij,ij->i', delta, delta)
+
+	def get_distance(self, other):
+		return numpy.sqrt(self.get_dist_sqrd(other))
+
+	def interpolate_to(self, other, range):
+		return Vector2DArray(self.data + (_operand(other) - self.data) * _column(range), copy = False)
+
+	def __getstate__(self):
+		return self.data.tolist()
+
+	def __setstate__(self, state):
+		self.data = numpy.array(state, dtype = numpy.float64).reshape(-1, 2)
@@ -0,0 +1,80 @@
+import unittest, pickle
+from Vector2D import Vector2D
+from Vector2DArray import Vector2DArray
+
+
+class Vector2DArrayUnitTests(unittest.TestCase):
+
+	def setUp(self):
+		self.vectors = Vector2DArray([(3, 4), (0, 2), (-1, 0)])
+
+	def testCreationAndAccess(self):
+		self.assertEqual(len(self.vectors), 3)
+		self.assertEqual(Vector2DArray(2).data.tolist(), [[0, 0], [0, 0]])
+		self.assertEqual(self.vectors[0], Vector2D(3, 4))
+		self.assertEqual(self.vectors.x.tolist(), [3, 0, -1])
+		self.assertEqual(self.vectors.y.tolist(), [4, 2, 0])
+
+	def testViews(self):
+		v = self.vectors[1]
+		v.x = 5
+		v += (1, 1)
+		self.assertEqual(self.vectors.data[1].tolist(), [6, 3])
+		self.vectors[1:].data += 1
+		self.assertEqual(v, Vector2D(7, 4))
+		self.assertEqual(self.vectors[[0, 2]].data.tolist(), [[3, 4], [0, 1]])
+
+	def testMath(self):
+		v = self.vectors
+		self.assertEqual((v + 1).data.tolist(), [[4, 5], [1, 3], [0, 1]])
+		self.assertEqual((v - (1, 2)).data.tolist(), [[2, 2], [-1, 0], [-2, -2]])
+		self.assertEqual((2 * v).data.tolist(), [[6, 8], [0, 4], [-2, 0]])
+		self.assertEqual((v / 2).data.tolist(), [[1.5, 2], [0, 1], [-0.5, 0]])
+		self.assertEqual((v - v).data.tolist(), [[0, 0]] * 3)
+		self.assertEqual((1 - v).data.tolist(), [[-2, -3], [1, -1], [2, 1]])
+		self.assertEqual(v.scaled([1, 2, 3]).data.tolist(), [[3, 4], [0, 4], [-3, 0]])
+
+	def testInplace(self):
+		v = self.vectors
+		data = v.data
+		v += Vector2D(1, 1)
+		v *= 2
+		v.scale([1, 0.5, 0])
+		self.assertTrue(v.data is data)
+		self.assertEqual(v.data.tolist(), [[8, 10], [1, 3], [0, 0]])
+
+	def testLength(self):
+		v = self.vectors
+		self.assertEqual(v.get_length().tolist(), [5, 2, 1])
+		self.assertEqual(v.get_length_sqrd().tolist(), [25, 4, 1])
+		self.assertEqual(Vector2DArray([(3, 4), (0, 0)]).normalize_return_length().tolist(), [5, 0])
+		self.assertEqual(v.normalized().get_length().tolist(), [1, 1, 1])
+		self.assertEqual(v.get_distance((0, 0)).tolist(), [5, 2, 1])
+		self.assertEqual(v.get_dist_sqrd(v).tolist(), [0, 0, 0])
+
+	def testRotate(self):
+		v = self.vectors.rotated(90)
+		for vector, rotated in zip(self.vectors, v):
+			expected = vector.rotated(90)
+			self.assertAlmostEqual(rotated.x, expected.x)
+			self.assertAlmostEqual(rotated.y, expected.y)
+		v.rotate([-90, 0, 180])
+		self.assertAlmostEqual(v[0].x, 3)
+		self.assertAlmostEqual(v[1].x, -2)
+		self.assertAlmostEqual(v[2].y, 1)
+
+	def testDotAndInterpolate(self):
+		v = self.vectors
+		self.assertEqual(v.dot((1, 2)).tolist(), [11, 4, -1])
+		self.assertEqual(v.dot(v).tolist(), [25, 4, 1])
+		self.assertEqual(v.interpolate_to((1, 0), 0.5).data.tolist(), [[2, 2], [0.5, 1], [0, 0]])
+		self.assertEqual(v.interpolate_to(v + 2, [0, 0.5, 1]).data.tolist(), [[3, 4], [1, 3], [1, 2]])
+
+	def testPickle(self):
+		loaded = pickle.loads(pickle.dumps(self.vectors))
+		self.assertEqual(loaded.data.tolist(), self.vectors.data.tolist())
+		self.assertEqual(pickle.loads(pickle.dumps(self.vectors[0])), Vector2D(3, 4))
+
+
+if __name__ == "__main__":
+	unittest.main()
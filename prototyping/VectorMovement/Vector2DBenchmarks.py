@@ -0,0 +1,94 @@
+import json, optparse, timeit
+
+# Operations per second of each Vector2D method (and of the Vector2DArray
+# ones, counted per vector). Save a run and compare a later one with it
+# to see the regressions:
+#
+#	python Vector2DBenchmarks.py -o before.json
+#	python Vector2DBenchmarks.py -c before.json
+
+SETUP = """
+from Vector2D import Vector2D
+from Vector2DArray import Vector2DArray
+v = Vector2D(3.0, 4.0)
+w = Vector2D(-1.5, 2.5)
+t = (-1.5, 2.5)
+out = Vector2D(0.0, 0.0)
+vs = Vector2DArray([(i, -i) for i in range(%d)])
+ws = vs + 1.5
+outs = Vector2DArray(len(vs))
+"""
+
+# the number of vectors of the arrays
+ARRAY_SIZE = 1000
+
+# name, statement, the vectors each run of the statement works on
+BENCHMARKS = [
+	('add vector', 'v + w', 1),
+	('add tuple', 'v + t', 1),
+	('add scalar', 'v + 1.5', 1),
+	('iadd vector', 'out += w', 1),
+	('mul scalar', 'v * 1.5', 1),
+	('rmul scalar', '1.5 * v', 1),
+	('imul scalar', 'out *= 1.0', 1),
+	('truediv scalar', 'v / 1.5', 1),
+	('sub vector', 'v - w', 1),
+	('eq vector', 'v == w', 1),
+	('length', 'v.length', 1),
+	('dot', 'v.dot(w)', 1),
+	('get_distance', 'v.get_distance(w)', 1),
+	('rotate', 'out.rotate(30)', 1),
+	('rotated', 'v.rotated(30)', 1),
+	('rotated out', 'v.rotated(30, out)', 1),
+	('normalized', 'v.normalized()', 1),
+	('normalized out', 'v.normalized(out)', 1),
+	('projection', 'v.projection(w)', 1),
+	('projection out', 'v.projection(w, out)', 1),
+	('interpolate_to', 'v.interpolate_to(w, 0.5)', 1),
+	('interpolate_to out', 'v.interpolate_to(w, 0.5, out)', 1),
+	('array add', 'vs + ws', ARRAY_SIZE),
+	('array iadd', 'outs += ws', ARRAY_SIZE),
+	('array rotate', 'outs.rotate(30)', ARRAY_SIZE),
+	('array normalized', 'vs.normalized()', ARRAY_SIZE),
+	('array get_distance', 'vs.get_distance(ws)', ARRAY_SIZE),
+	('array interpolate_to', 'vs.interpolate_to(ws, 0.5)', ARRAY_SIZE),
+]
+
+
+def measure(statement, vectors, repeat):
+	timer = timeit.Timer(statement, SETUP % ARRAY_SIZE)
+	number, elapsed = timer.autorange()
+	best = min([elapsed] + timer.repeat(repeat - 1, number))
+	return number * vectors / best
+
+
+def main():
+	parser = optparse.OptionParser()
+	parser.add_option('-o', '--output', help = 'save the results to a JSON file')
+	parser.add_option('-c', '--compare', help = 'compare with the results of a JSON file')
+	parser.add_option('-r', '--repeat', type = 'int', default = 5, help = 'runs of each benchmark (the best is kept)')
+	options, args = parser.parse_args()
+
+	baseline = {}
+	if options.compare:
+		with open(options.compare) as fin:
+			baseline = json.load(fin)
+
+	results = {}
+	for name, statement, vectors in BENCHMARKS:
+		try:
+			results[name] = rate = measure(statement, vectors, options.repeat)
+		except (AttributeError, TypeError) as err:
+			print('%-24s failed: %s' % (name, err))
+			continue
+		line = '%-24s %14.0f ops/s' % (name, rate)
+		if baseline.get(name):
+			line += '  %+7.1f%%' % (100.0 * (rate / baseline[name] - 1))
+		print(line)
+
+	if options.output:
+		with open(options.output, 'w') as fout:
+			json.dump(results, fout, indent = 1, sort_keys = True)
+
+
+if __name__ == '__main__': main()
@@ -1,5 +1,6 @@
-import os, pygame, random, datetime
+import os, pygame, random, datetime, numpy
 from Vector2D import Vector2D
+from Vector2DArray import Vector2DArray
 
 
 def load_image(name, colorkey=None):
@@ -44,6 +45,40 @@ class Fish(pygame.sprite.Sprite):
 		self.destination = Vector2D(*destination)
 		self.state = "move"
 
+
+# Moves many fish in one call: their positions are views into one
+# Vector2DArray, so a fish of a school is moved by the school only.
+class School(object):
+	def __init__(self, fishes):
+		self.fishes = fishes
+		self.positions = Vector2DArray([(fish.position.x, fish.position.y) for fish in fishes])
+		self.destinations = self.positions.copy()
+		self.speeds = numpy.array([fish.speed for fish in fishes], dtype = numpy.float64)
+		self.moving = numpy.zeros(len(fishes), dtype = bool)
+
+		for fish, position in zip(fishes, self.positions):
+			fish.position = position
+
+	def update(self, time_passed_seconds):
+		moving = self.moving
+		if not moving.any():
+			return
+
+		positions = self.positions[moving]
+		destinations = self.destinations[moving]
+		travelvector = destinations - positions
+		positions += travelvector.scale(time_passed_seconds * self.speeds[moving])
+		self.positions[moving] = positions
+
+		moving[moving] = positions.get_dist_sqrd(destinations) != 0
+
+		for fish in self.fishes:
+			fish.rect.center = (fish.position.x, fish.position.y)
+
+	def moveTo(self, destination):
+		self.destinations[:] = destination
+		self.moving[:] = True
+
 def main():
 	pygame.init()
 	screen = pygame.display.set_mode((1024, 768))
@@ -56,6 +91,7 @@ def main():
 	for fish in range (10):
 		fishes.append(Fish((random.randint(0, 400), random.randint(0, 400)), random.uniform(0.2, 5.5)))
 
+	school = School(fishes)
 	sprites = pygame.sprite.RenderUpdates((fishes))
 
 	screen.blit(background, (0, 0))
@@ -69,12 +105,11 @@ def main():
 				exit()
 
 			if event.type == pygame.MOUSEMOTION:
-				for fish in fishes:
-					fish.moveTo(event.pos)
+				school.moveTo(event.pos)
 
 		time_passed_seconds = clock.tick() / 1000.0
 
-		sprites.update(time_passed_seconds)
+		school.update(time_passed_seconds)
 		sprites.clear(screen, background)
 		changes = sprites.draw(screen)
 		pygame.display.update(changes)
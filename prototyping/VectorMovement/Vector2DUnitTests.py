@@ -1,4 +1,5 @@
 import unittest, pickle
+import Vector2D as vector2d
 from Vector2D import Vector2D
 
 
@@ -107,6 +108,45 @@ class Vector2DUnitTests(unittest.TestCase):
 		self.assertEquals(inplace_vec, inplace_ref)
 		self.assertEquals(inplace_vec, alternate)
 
+	def testOutParameter(self):
+		v = Vector2D(3, 4)
+		w = Vector2D(-1, 2)
+		out = Vector2D(0, 0)
+		self.assert_(v.rotated(90, out) is out)
+		self.assertAlmostEqual(out.x, -4)
+		self.assertAlmostEqual(out.y, 3)
+		self.assert_(v.normalized(out) is out and out == [0.6, 0.8])
+		self.assert_(v.perpendicular(out) is out and out == [-4, 3])
+		self.assert_(v.perpendicular_normal(out) is out and out == [-0.8, 0.6])
+		self.assert_(v.projection((2, 0), out) is out and out == [3, 0])
+		self.assert_(v.interpolate_to(w, 0.5, out) is out and out == [1, 3])
+		self.assertEqual(v, [3, 4])
+
+	def testOutAliasing(self):
+		v = Vector2D(3, 4)
+		self.assert_(v.rotated(90, v) is v)
+		self.assertAlmostEqual(v.x, -4)
+		self.assertAlmostEqual(v.y, 3)
+		v = Vector2D(3, 4)
+		self.assert_(v.interpolate_to(Vector2D(-1, 2), 0.25, v) is v)
+		self.assertEqual(v, [2, 3.5])
+		v = Vector2D(3, 4)
+		v.projection(v, v)
+		self.assertEqual(v, [3, 4])
+		v.perpendicular(v)
+		self.assertEqual(v, [-4, 3])
+
+	def testRotationCache(self):
+		vector2d._rotations.clear()
+		v = Vector2D(1, 0)
+		for angle in range(vector2d.ROTATION_CACHE_SIZE):
+			v.rotated(angle)
+		self.assertEqual(len(vector2d._rotations), vector2d.ROTATION_CACHE_SIZE)
+		rotated = v.rotated(0.5)
+		self.assertEqual(list(vector2d._rotations), [0.5])
+		self.assertAlmostEqual(rotated.angle, 0.5)
+		self.assertAlmostEqual(v.rotated(90).y, 1)
+
 	def testPickle(self):
 		testvec = Vector2D(5, .3)
 		testvec_str = pickle.dumps(testvec)
@@ -22,12 +22,16 @@
 
 '''Linear Sprite Animation Utils.
 
-This module provides support for linear sprite animation.
+This module provides support for linear sprite animation. The
+sprite factory checks the type and the speed of the animated
+sprites and either adds them to a SpriteBatch (see sprite_batch,
+which moves and draws many of them at once) or creates them as
+single sprites. The random numbers of all the animated sprites
+come from rng.
 '''
 
 try:
-    from random import seed, randint
-    from datetime import datetime
+    from random import Random
     import pygame.sprite
     from graphics import load_image
     from base import Base
@@ -52,9 +56,35 @@ VERT_ANIM, HORIZ_ANIM = \
 MAX_SPEED = 220.0
 MIN_SPEED = 100.0
 
+# the random numbers of all the sprites (replay seeds it, so that
+# a replayed game places the sprites as the recorded one)
+rng = Random()
+
 class SpriteFactory(Base):
     '''The "right" way to create a new sprite (exposed interface).'''
 
+    def add_anim_sprite(self, batch, type, file, speed, pos=[0, 0]):
+        '''Add a new animated sprite to a sprite batch.
+
+        Arguments:
+        batch -- the SpriteBatch moving and drawing the sprite
+        type -- the animation style (vertical, horizontal, etc)
+        file -- the sprite's image filename
+        speed -- the sprite's speed movement
+        pos -- the sprite's initial position
+
+        Exceptions: ValueError if 1) the requested sprite type is
+        wrong, 2) the speed value is > max. or < min. acceptable.
+
+        Return: the sprite's index in the batch.
+        '''
+        # imported here, sprite_batch imports rng from this module
+        from sprite_batch import HORIZONTAL, VERTICAL
+
+        self._check(type, speed)
+        axis = VERTICAL if type == VERT_ANIM else HORIZONTAL
+        return batch.add(load_image(file)[0], pos, speed, axis)
+
     def create_anim_sprite(self, type, file, speed, pos=[0, 0]):
         '''Create a new animated sprite at an optional given position.
 
@@ -69,18 +99,23 @@ class SpriteFactory(Base):
 
         Return: SSprite if everything is fine, None otherwise.
         '''
-        if speed < MIN_SPEED or speed > MAX_SPEED:
-            raise SpriteSpeedError("Incorrect sprite speed value: {0}".format(speed))
+        self._check(type, speed)
 
         if (type == VERT_ANIM):
             return VertAnimSprite(file, pos, speed)
-        elif (type == HORIZ_ANIM):
-            return HorAnimSprite(file, pos, speed)
         else:
+            return HorAnimSprite(file, pos, speed)
+
+    def _check(self, type, speed):
+        '''Raise the error of a wrong sprite type or speed.'''
+        if speed < MIN_SPEED or speed > MAX_SPEED:
+            raise SpriteSpeedError("Incorrect sprite speed value: {0}".format(speed))
+
+        if type not in (VERT_ANIM, HORIZ_ANIM):
             raise SpriteTypeError("Incorrect sprite type: {0}".format(type))
 
 
-class SSprite(pygame.sprite.Sprite):
+class SSprite(pygame.sprite.DirtySprite):
     '''A static sprite - the base class of all sprites.'''
 
     def __init__(self, image, init_pos):
@@ -90,7 +125,7 @@ class SSprite(pygame.sprite.Sprite):
         image -- the sprite's image filename
         init_pos -- the sprite's initial position
         '''
-        pygame.sprite.Sprite.__init__(self)
+        pygame.sprite.DirtySprite.__init__(self)
         self.image = load_image(image)[0]
         self.rect = self.image.get_rect()
         self.rect.topleft = init_pos
@@ -108,7 +143,6 @@ class AnimSprite(SSprite):
         speed -- the sprite's speed movement
         '''
         SSprite.__init__(self, image, init_pos)
-        seed(datetime.now().microsecond)
         self.speed = speed
 
         # restrict the sprite's motion within the screen
@@ -117,6 +151,14 @@ class AnimSprite(SSprite):
         # the distance moved since the last movement
         self.distance_moved = 0.0
 
+        # the exact position after the last movement and before it
+        # (the sprite is drawn in between, see interpolate)
+        self.position = [float(self.rect.left), float(self.rect.top)]
+        self.previous = tuple(self.position)
+
+        # the sprite moves on every frame, so it's always redrawn
+        self.dirty = 2
+
 
     def update(self, time_pass_sec):
         '''Calculate the new distance for moving the sprite.
@@ -124,8 +166,30 @@ class AnimSprite(SSprite):
         Arguments:
         time_pass_sec -- updated time since the last movement in seconds
         '''
+        self.previous = tuple(self.position)
         self.distance_moved = time_pass_sec * self.speed
 
+    def move(self, dx, dy):
+        '''Move the sprite's exact position and its rectangle.'''
+        self.position[0] += dx
+        self.position[1] += dy
+        self.rect.topleft = self.position
+
+    def jump(self, left, top):
+        '''Place the sprite somewhere else (without moving in between).'''
+        self.position = [float(left), float(top)]
+        self.previous = tuple(self.position)
+        self.rect.topleft = self.position
+
+    def interpolate(self, alpha):
+        '''Place the sprite's rectangle between its last two positions.
+
+        Arguments:
+        alpha -- 0 for the previous position, 1 for the last one
+        '''
+        (x0, y0), (x1, y1) = self.previous, self.position
+        self.rect.topleft = (x0 + (x1 - x0) * alpha, y0 + (y1 - y0) * alpha)
+
 
 class VertAnimSprite(AnimSprite):
     '''A vertical animated sprite.'''
@@ -153,14 +217,14 @@ class VertAnimSprite(AnimSprite):
         AnimSprite.update(self, time_pass_sec)
         
         # update the sprite's position
-        self.rect.move_ip(0, self.distance_moved)
+        self.move(0, self.distance_moved)
 
         # if the sprite is out of screen update its place
         # to a new random (but still within the screen)        
         if self.rect.top >= self.area.bottom:
-            self.rect.left = randint(self.area.left + self.limit,
-                                     self.area.right - self.limit) 
-            self.rect.top = self.area.top - self.area.bottom
+            self.jump(rng.randint(self.area.left + self.limit,
+                              self.area.right - self.limit),
+                      self.area.top - self.area.bottom)
 
 
 class HorAnimSprite(AnimSprite):
@@ -189,14 +253,14 @@ class HorAnimSprite(AnimSprite):
         AnimSprite.update(self, time_pass_sec)
 
         # update the sprite's position
-        self.rect.move_ip(self.distance_moved, 0)
+        self.move(self.distance_moved, 0)
 
         # if the sprite is out of screen update its place
         # to a new random (but still within the screen)        
         if self.rect.left >= self.area.right:
-            self.rect.left = self.area.left - self.area.right
-            self.rect.top = randint(self.area.top + self.limit,
-                                    self.area.bottom - self.limit)
+            self.jump(self.area.left - self.area.right,
+                      rng.randint(self.area.top + self.limit,
+                              self.area.bottom - self.limit))
 
 class SpriteSpeedError(ValueError):
     '''Raised when a non-acceptable sprite speed is set.'''
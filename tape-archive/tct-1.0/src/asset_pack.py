@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+
+#    Prebaked Asset Pack.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Prebaked Asset Pack.
+
+This module builds and reads a single-file archive with all the
+resources listed in constants.FILES. Images are stored decoded
+(32 bits per pixel), sounds as raw PCM samples and fonts, music
+and texts as they are. The archive is memory-mapped, so images
+are made straight from the mapped pixels without any decoding.
+
+Build (or rebuild, after changing a resource) the archive with:
+
+    python asset_pack.py
+
+The archive records the size and the modification time of each
+resource it was built from; a resource changed since then is loaded
+from its own file until the archive is rebuilt.
+'''
+
+try:
+    import constants, io, json, logger, mmap, os, struct, pygame
+    from os_utils import file_path
+    from base import Base
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['AssetPack', 'MappedFile', 'build_pack', 'open_pack', 'get_pack']
+
+# the archive's signature and format version
+PACK_MAGIC = b'TCTPACK'
+PACK_VERSION = 2
+
+# signature, version, index offset, index length
+HEADER = struct.Struct('<7sBQQ')
+
+# every blob starts at a multiple of this (keeps the pixel rows aligned)
+BLOB_ALIGN = 16
+
+# the resource directory of each top level key of constants.FILES
+RESOURCE_DIRS = {'graphics': constants.GRAPHICS_DIR,
+                 'sounds': constants.SOUNDS_DIR,
+                 'fonts': constants.FONTS_DIR,
+                 'texts': constants.TEXTS_DIR}
+
+# sounds which are streamed by the music player, not decoded to PCM
+MUSIC_FILES = (constants.FILES['sounds']['menu']['share']['bg'][0],)
+
+# the pack opened by open_pack(), if any
+_pack = None
+
+
+def entry_name(dir, filename):
+    '''Return the name of a resource inside the archive.'''
+    return '/'.join((dir, filename.replace(os.sep, '/')))
+
+
+def walk_files(files=constants.FILES):
+    '''Yield the (directory, filename) pairs of all the game resources.'''
+    for top, dir in RESOURCE_DIRS.items():
+        stack = [files.get(top, {})]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                stack.extend(node.values())
+            else:
+                for filename in node:
+                    yield dir, filename
+
+
+def source_stamp(dir, filename):
+    '''Return the size and the modification time of a resource's
+    file, None if there is no such file.'''
+    try:
+        st = os.stat(file_path(filename, dir))
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def build_pack(filename=constants.ASSET_PACK, files=constants.FILES):
+    '''Decode all the game resources and write them in one archive.
+
+    Needs the mixer initialized like the game does (the
+    samples are stored in the mixer's format).
+
+    Arguments:
+    filename -- the archive's filename (relative to the resources dir)
+    files -- the resources, structured like constants.FILES
+
+    Return: the number of the archived resources.
+    '''
+    index = {}
+    fullname = os.path.join(constants.RESOURCES_DIR, filename)
+
+    with open(fullname, 'wb') as fout:
+        fout.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, 0))
+
+        for dir, name in sorted(set(walk_files(files))):
+            stamp = source_stamp(dir, name)
+            kind, meta, blob = _bake(dir, name)
+
+            # pad up to the next aligned offset
+            offset = fout.tell()
+            padding = -offset % BLOB_ALIGN
+            fout.write(b'\0' * padding)
+            offset += padding
+
+            fout.write(blob)
+            index[entry_name(dir, name)] = [kind, offset, len(blob), meta, stamp]
+
+        data = json.dumps(index, sort_keys=True).encode('utf-8')
+        index_offset = fout.tell()
+        fout.write(data)
+
+        fout.seek(0)
+        fout.write(HEADER.pack(PACK_MAGIC, PACK_VERSION,
+                               index_offset, len(data)))
+
+    return len(index)
+
+
+def _bake(dir, filename):
+    '''Return the kind, metadata and contents of a resource's blob.'''
+    fullname = file_path(filename, dir)
+
+    if dir == constants.GRAPHICS_DIR:
+        image = pygame.image.load(fullname)
+        meta = {'size': image.get_size(), 'colorkey': None}
+
+        if image.get_alpha() is None:
+            # keep the colorkey (paletted images) and let the game
+            # convert the opaque pixels to the display format
+            if image.get_colorkey() is not None:
+                meta['colorkey'] = tuple(image.get_colorkey())
+            meta['format'] = 'RGBX'
+        else:
+            # the byte order of the display's per pixel alpha format
+            meta['format'] = 'BGRA'
+
+        return 'image', meta, pygame.image.tobytes(image, meta['format'])
+
+    if dir == constants.SOUNDS_DIR and filename not in MUSIC_FILES:
+        sound = pygame.mixer.Sound(fullname)
+        meta = {'mixer': pygame.mixer.get_init()}
+        return 'pcm', meta, sound.get_raw()
+
+    with open(fullname, 'rb') as fin:
+        return 'blob', {}, fin.read()
+
+
+class MappedFile(io.RawIOBase):
+    '''A read-only file over a mapped blob.
+
+    Nothing is copied up front: each read copies only the bytes
+    it returns (pygame reads fonts and music piece by piece).
+    '''
+
+    def __init__(self, view):
+        '''Create a new file positioned at the start of the blob.
+
+        Arguments:
+        view -- a memoryview of the blob
+        '''
+        io.RawIOBase.__init__(self)
+        self.view = view
+        self.pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        elif whence != io.SEEK_SET:
+            raise ValueError('Invalid whence', whence)
+        if offset < 0:
+            raise ValueError('Negative seek position', offset)
+        self.pos = offset
+        return offset
+
+    def read(self, size=-1):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+        end = len(self.view)
+        if size is not None and size >= 0:
+            end = min(end, self.pos + size)
+        data = self.view[self.pos:end].tobytes()
+        self.pos += len(data)
+        return data
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        memoryview(buffer).cast('B')[:len(data)] = data
+        return len(data)
+
+    def readall(self):
+        return self.read()
+
+
+class AssetPack(Base):
+    '''A memory-mapped archive made by build_pack().'''
+
+    def __init__(self, filename=constants.ASSET_PACK):
+        '''Map an archive and read its index.
+
+        Arguments:
+        filename -- the archive's filename (relative to the resources dir)
+
+        Exceptions: IOError if the archive can't be read, ValueError
+        if it's not an archive of this version of the game.
+        '''
+        fullname = os.path.join(constants.RESOURCES_DIR, filename)
+
+        with open(fullname, 'rb') as fin:
+            # a private (copy on write) mapping, since surfaces made
+            # on the mapped pixels are allowed to write on them
+            self.map = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        magic, version, offset, length = HEADER.unpack_from(self.map)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError('Not a version {0} asset pack: {1}'.format(
+                PACK_VERSION, fullname))
+
+        self.index = json.loads(self.map[offset:offset + length].decode('utf-8'))
+        self.view = memoryview(self.map)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def read(self, dir, filename):
+        '''Return the kind, metadata and (mapped) contents of a resource,
+        Nones if it's not packed or changed since it was packed.'''
+        name = entry_name(dir, filename)
+        entry = self.index.get(name)
+        if entry is None:
+            return None, None, None
+
+        kind, offset, length, meta, stamp = entry
+
+        # a shipped pack may come without the resources' files
+        current = source_stamp(dir, filename)
+        if current is not None and current != stamp:
+            logger.info('{0} changed since the asset pack was built', name)
+            return None, None, None
+
+        return kind, meta, self.view[offset:offset + length]
+
+    def load_image(self, filename):
+        '''Return an image made on the mapped pixels, None if not packed.'''
+        kind, meta, data = self.read(constants.GRAPHICS_DIR, filename)
+        if kind != 'image':
+            return None
+
+        image = pygame.image.frombuffer(data, meta['size'], meta['format'])
+        if meta['colorkey'] is not None:
+            image.set_colorkey(meta['colorkey'])
+
+        return image
+
+    def load_sound(self, filename):
+        '''Return a sound made from the packed samples, None if not packed.
+
+        The samples are used only if the mixer plays in the same
+        format they were stored in.
+        '''
+        kind, meta, data = self.read(constants.SOUNDS_DIR, filename)
+        if kind != 'pcm' or tuple(meta['mixer']) != pygame.mixer.get_init():
+            return None
+
+        return pygame.mixer.Sound(buffer=data)
+
+    def open_file(self, dir, filename):
+        '''Return a file-like object of a packed blob, None if not packed.'''
+        kind, meta, data = self.read(dir, filename)
+        if kind != 'blob':
+            return None
+
+        return MappedFile(data)
+
+
+def open_pack(filename=constants.ASSET_PACK):
+    '''Open the game's asset pack, if there is a valid one.
+
+    Return: the opened pack, None if the resources are used one by one.
+    '''
+    global _pack
+
+    try:
+        _pack = AssetPack(filename)
+    except (IOError, ValueError, struct.error):
+        _pack = None
+
+    return _pack
+
+
+def get_pack():
+    '''Return the opened asset pack, None if there isn't one.'''
+    return _pack
+
+
+# build the asset pack if executed
+if __name__ == '__main__':
+    import sys
+    import sound_mixer
+
+    # the script runs from everywhere, like tct.py
+    os.chdir(os.path.abspath(os.path.dirname(sys.argv[0])))
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.init()
+
+    count = build_pack()
+    print('{0}: {1} resources packed in {2}'.format(
+        os.path.basename(sys.argv[0]), count,
+        os.path.join(constants.RESOURCES_DIR, constants.ASSET_PACK)))
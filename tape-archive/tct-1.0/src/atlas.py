@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+#    Texture Atlas Utilities.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Texture Atlas Utilities.
+
+This module packs many small images into one big surface and
+hands out subsurfaces of it, so that all of them share a single
+allocation and pixel format.
+'''
+
+try:
+    import pygame
+    from pygame.locals import SRCALPHA
+    from base import Base
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['TextureAtlas', 'shelf_pack']
+
+
+def shelf_pack(sizes, width):
+    '''Place rectangles on horizontal shelves (tallest first).
+
+    Arguments:
+    sizes -- a dictionary of name -> (width, height)
+    width -- the width of the area, at least the widest rectangle
+
+    Return: a dictionary of name -> pygame.Rect and the total height.
+    '''
+    # tallest first keeps the wasted space on each shelf small
+    order = sorted(sizes, key=lambda name: (-sizes[name][1], -sizes[name][0], name))
+
+    rects = {}
+    x = shelf_top = shelf_height = 0
+
+    for name in order:
+        w, h = sizes[name]
+        assert(w <= width)
+
+        # start a new shelf if it doesn't fit in the current one
+        if x + w > width:
+            shelf_top += shelf_height
+            x = shelf_height = 0
+
+        rects[name] = pygame.Rect(x, shelf_top, w, h)
+        x += w
+        shelf_height = max(shelf_height, h)
+
+    return rects, shelf_top + shelf_height
+
+
+class TextureAtlas(Base):
+    '''A set of images packed into one per pixel alpha surface.'''
+
+    def __init__(self):
+        '''Create a new empty atlas.'''
+        # name -> source surface (until build() is called)
+        self.images = {}
+
+        # name -> the area of the image inside the atlas
+        self.rects = {}
+
+        # the atlas surface, made by build()
+        self.surface = None
+
+    def add(self, name, image):
+        '''Add an image to be packed.
+
+        Arguments:
+        name -- the name of the image (for getting it back)
+        image -- the image's surface
+        '''
+        assert(self.surface is None)
+        self.images[name] = image
+
+    def build(self):
+        '''Pack the added images into the atlas surface.
+
+        Return: the atlas surface.
+        '''
+        sizes = dict((name, image.get_size())
+                     for name, image in self.images.items())
+        width = max([w for w, h in sizes.values()] or [1])
+
+        self.rects, height = shelf_pack(sizes, width)
+
+        self.surface = pygame.Surface((width, max(height, 1)), SRCALPHA)
+        self.surface = self.surface.convert_alpha()
+        self.surface.fill((0, 0, 0, 0))
+
+        # the colorkeyed pixels stay transparent, the rest are copied
+        for name, image in self.images.items():
+            self.surface.blit(image, self.rects[name])
+
+        # the atlas owns the pixels from now on
+        self.images = {}
+        return self.surface
+
+    def get(self, name):
+        '''Return the subsurface of an image of the atlas.'''
+        return self.surface.subsurface(self.rects[name])
+
+    def __contains__(self, name):
+        return name in self.rects
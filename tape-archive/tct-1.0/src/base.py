@@ -33,12 +33,24 @@ __all__ = ['Base']
 ## a base class
 #
 class Base(object):
+    # subclasses may use slots instead of a dictionary
+    __slots__ = ()
 
     ## print all the attributes of an object
     #
     # @param self the object pointer
     def print_attrs(self):
-        for attr in self.__dict__:
+        attrs = list(getattr(self, '__dict__', ()))
+
+        # the attributes kept in slots (if they are set)
+        for ty in type(self).mro():
+            slots = ty.__dict__.get('__slots__', ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            attrs.extend(attr for attr in slots
+                         if attr not in attrs and hasattr(self, attr))
+
+        for attr in attrs:
             print(attr, getattr(self, attr))
 
     ## find in which class the method of a
@@ -0,0 +1,542 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#    Headless Frame-Time Benchmark.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Headless Frame-Time Benchmark.
+
+This module runs the game's scenes without a window or a sound
+card (SDL's dummy drivers) for a fixed number of frames, feeding
+them scripted input, and reports per scene frame time percentiles
+and blits per frame as JSON:
+
+    python benchmark.py --frames 300 --output bench.json
+
+With `--trace-malloc' the bytes allocated during each frame (the
+most allocated at once, above what the frame started with) are
+reported too; tracing slows the frames down.
+
+The `busy_wait' entry is not a scene: it runs mvc's busy waiting
+controller for 1000 ticks per frame, posting the shared tick event,
+and next to it the same loop creating a new event on each tick (as
+the controller did before the events were flyweights). Both report
+their ticks and the events they created per second.
+
+The scenes run in the game's main loop (tct.MainController), so
+a frame is one tick of its clock: the events, the fixed-step
+updates and the rendering. Clocks never sleep while benchmarking,
+so the times measure only the game's work.
+'''
+
+try:
+    import constants, json, os, sys, time, tracemalloc
+    from optparse import OptionParser
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['run_benchmarks']
+
+# the simulated time of a clock tick without a frame rate (in ms)
+DEFAULT_TICK = 16
+
+# stop a scene that ignores its script after this many times the frames
+MAX_FRAMES_FACTOR = 20
+
+# the scenes benchmarked by default, in the order they run
+SCENES = ('intro', 'menu', 'settings', 'credits', 'intro_cut_scene',
+          'intro_fade_cache', 'busy_wait')
+
+# the busy waiting controller's ticks per scripted frame
+BUSY_WAIT_TICKS = 1000
+
+
+class BenchmarkError(Exception):
+    '''Raised when a scene does not finish as scripted.'''
+
+
+class GameOptions(object):
+    '''The command line options the scenes expect (sounds off).'''
+    fullscreen = False
+    music = False
+    asyncio = False
+    fade_cache = False
+    sound = False
+    verbose = 0
+    profile = None
+    record = None
+    replay = None
+
+
+class CountingSurface(object):
+    '''A display surface proxy counting the blits drawn on it.'''
+
+    def __init__(self, surface, harness):
+        self._surface = surface
+        self._harness = harness
+
+    def blit(self, *args, **kwargs):
+        self._harness.blits += 1
+        return self._surface.blit(*args, **kwargs)
+
+    def blits(self, blit_sequence, *args, **kwargs):
+        blit_sequence = list(blit_sequence)
+        self._harness.blits += len(blit_sequence)
+        return self._surface.blits(blit_sequence, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._surface, name)
+
+
+class ScriptedKeys(object):
+    '''What pygame.key.get_pressed returns: the scripted pressed keys.'''
+
+    def __init__(self, pressed):
+        self.pressed = pressed
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+class SceneRunner(object):
+    '''Stands for the game manager: runs a single scene, no switching.'''
+
+    def __init__(self, scene):
+        self.scene = scene
+
+    def handle_events(self, events):
+        self.scene.handle_events(events)
+
+    def update(self, dt):
+        self.scene.update(dt)
+
+    def render(self, alpha):
+        return self.scene.render(alpha)
+
+    def is_idle(self):
+        return self.scene.is_idle()
+
+
+class Harness(object):
+    '''Replaces the clock, the display and the input of pygame.
+
+    Each tick of a scene's clock ends a frame: its duration is
+    recorded and the scene's script is called for the next one.
+    '''
+
+    def __init__(self, frames, trace_malloc=False):
+        import pygame
+        self.pygame = pygame
+        self.frames = frames
+        self.trace_malloc = trace_malloc
+        self.saved = []
+        self.reset(None)
+
+    def reset(self, script):
+        '''Start measuring a new scene driven by a script.'''
+        self.script = script
+        self.frame = 0
+        self.blits = 0
+        self.updates = 0
+        self.pressed = set()
+        self.mouse_pos = (0, 0)
+        self.samples = []
+        self.last = time.perf_counter()
+        if self.trace_malloc:
+            tracemalloc.reset_peak()
+
+    def install(self):
+        '''Patch pygame (call once the display mode is set).'''
+        pygame = self.pygame
+        harness = self
+        screen = CountingSurface(pygame.display.get_surface(), self)
+
+        class Clock(object):
+            '''A clock which ends a frame on each tick and never sleeps.'''
+            def tick(self, framerate=0):
+                return harness.tick(framerate)
+            tick_busy_loop = tick
+
+            def get_fps(self):
+                return 0.0
+
+        def update(*args):
+            harness.updates += 1
+
+        self._patch(pygame.time, 'Clock', Clock)
+        self._patch(pygame.display, 'get_surface', lambda: screen)
+        self._patch(pygame.display, 'update', update)
+        self._patch(pygame.display, 'flip', update)
+        self._patch(pygame.key, 'get_pressed', lambda: ScriptedKeys(self.pressed))
+        self._patch(pygame.mouse, 'get_pos', lambda: self.mouse_pos)
+        self._patch(pygame.mouse, 'set_pos', lambda *args: None)
+
+    def uninstall(self):
+        '''Restore everything install() patched.'''
+        for module, name, value in reversed(self.saved):
+            setattr(module, name, value)
+        self.saved = []
+
+    def _patch(self, module, name, value):
+        self.saved.append((module, name, getattr(module, name)))
+        setattr(module, name, value)
+
+    def tick(self, framerate):
+        '''End the current frame, record it and script the next one.'''
+        now = time.perf_counter()
+
+        sample = {'time': (now - self.last) * 1000.0,
+                  'blits': self.blits}
+        if self.trace_malloc:
+            current, peak = tracemalloc.get_traced_memory()
+            sample['alloc_peak'] = peak - current
+            tracemalloc.reset_peak()
+        self.samples.append(sample)
+
+        self.frame += 1
+        self.blits = 0
+        if self.frame > self.frames * MAX_FRAMES_FACTOR:
+            raise BenchmarkError('the scene did not stop after {0} frames'
+                                 .format(self.frame))
+
+        if self.script:
+            self.script(self)
+
+        self.last = time.perf_counter()
+
+        if framerate:
+            return int(1000 / framerate)
+        return DEFAULT_TICK
+
+    def post_key(self, key):
+        '''Queue a key press event.'''
+        self.pygame.event.post(self.pygame.event.Event(
+            self.pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0))
+
+    def move_mouse(self, pos):
+        '''Move the scripted mouse and queue the motion event.'''
+        self.mouse_pos = pos
+        self.pygame.event.post(self.pygame.event.Event(
+            self.pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+
+
+def percentile(values, percent):
+    '''Return the nearest-rank percentile of a sorted list.'''
+    if not values:
+        return 0.0
+    rank = max(int(round(percent / 100.0 * len(values))) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def summarize(samples, setup):
+    '''Reduce the samples of a scene to the reported figures.'''
+    times = sorted(s['time'] for s in samples)
+    frames = max(len(samples), 1)
+
+    report = {'frames': len(samples),
+              'setup_ms': round(setup * 1000.0, 3),
+              'frame_ms': {'p50': round(percentile(times, 50), 4),
+                           'p95': round(percentile(times, 95), 4),
+                           'p99': round(percentile(times, 99), 4),
+                           'max': round(times[-1] if times else 0.0, 4),
+                           'mean': round(sum(times) / frames, 4)},
+              'blits_per_frame': round(
+                  sum(s['blits'] for s in samples) / float(frames), 2)}
+
+    if samples and 'alloc_peak' in samples[0]:
+        report['alloc_peak_bytes_per_frame'] = round(
+            sum(s['alloc_peak'] for s in samples) / float(frames), 1)
+
+    return report
+
+
+def _scenario(name, harness, game_opts):
+    '''Return a scene, what starts it, when it is done and its script.'''
+    pygame = harness.pygame
+    frames = harness.frames
+
+    if name in ('intro', 'intro_cut_scene', 'intro_fade_cache'):
+        from intro import Intro
+        from intro_cut_scene import IntroCutScene
+        from mvc import EscapeEvent
+
+        if name == 'intro':
+            scene = Intro(game_opts)
+            cutscenes = scene.cutscenes
+        else:
+            slides = [pygame.Surface(pygame.display.get_surface().get_size())
+                      for i in range(len(constants.FILES['graphics']['intro']['slides']))]
+            scene = cutscenes = IntroCutScene(slides, name == 'intro_fade_cache')
+
+        def script(h):
+            # skip the rest of the intro after the scripted frames
+            if h.frame == frames:
+                cutscenes.controller.notify(EscapeEvent())
+
+        return (scene, None, lambda: cutscenes.controller.is_finished,
+                script)
+
+    from menu import Menu
+    menu = Menu(game_opts)
+    options = (pygame.K_DOWN, pygame.K_DOWN, pygame.K_UP, pygame.K_DOWN)
+
+    if name == 'menu':
+        def script(h):
+            # walk the options with the keyboard and the mouse
+            if h.frame % 25 == 0:
+                h.post_key(options[(h.frame // 25) % len(options)])
+            if h.frame % 10 == 0:
+                h.move_mouse((400 + h.frame % 300, 200 + h.frame % 250))
+            if h.frame >= frames:
+                menu.menu_main_running = False
+
+        return (menu, menu.entry_actions,
+                lambda: not menu.menu_main_running, script)
+
+    if name == 'settings':
+        def script(h):
+            if h.frame % 25 == 0:
+                h.post_key(options[(h.frame // 25) % len(options)])
+            if h.frame % 10 == 0:
+                h.move_mouse((300 + h.frame % 200, 250 + h.frame % 100))
+            if h.frame == frames:
+                h.post_key(pygame.K_ESCAPE)
+
+        return (menu, menu._settings_option,
+                lambda: not menu.menu_settings_running, script)
+
+    if name == 'credits':
+        def script(h):
+            # leave the credits with the escape key
+            if h.frame >= frames:
+                h.pressed.add(pygame.K_ESCAPE)
+
+        return (menu, menu._credits_option,
+                lambda: menu.credits is None, script)
+
+    raise ValueError('No such scene', name)
+
+
+class TickCounter(object):
+    '''Stops a busy waiting controller after some ticks.'''
+
+    def __init__(self, manager, controller, ticks):
+        from mvc import TickEvent
+        manager.register_listener(self, TickEvent)
+        self.controller = controller
+        self.ticks = ticks
+        self.count = 0
+
+    def notify(self, event):
+        self.count += 1
+        if self.count >= self.ticks:
+            self.controller.keep_going = False
+
+
+class EventCounter(object):
+    '''Counts the mvc events created while it is installed.'''
+
+    def __init__(self):
+        self.count = 0
+
+    def install(self):
+        from mvc import Event
+        counter = self
+
+        # the flyweights create their instance through it too
+        def new(cls, *args, **kwargs):
+            counter.count += 1
+            return object.__new__(cls)
+
+        Event.__new__ = staticmethod(new)
+
+    def uninstall(self):
+        from mvc import Event
+        del Event.__new__
+
+
+def _busy_loop(controller_class, ticks, trace_malloc):
+    '''Run a busy waiting controller twice: timed, then counted.'''
+    from mvc import EventManager
+
+    def run():
+        manager = EventManager()
+        controller = controller_class(manager)
+        counter = TickCounter(manager, controller, ticks)
+        started = time.perf_counter()
+        controller.run()
+        return counter.count, max(time.perf_counter() - started, 1e-9)
+
+    ticks_run, seconds = run()
+
+    # counting slows the construction down, so it isn't timed
+    events = EventCounter()
+    events.install()
+    try:
+        if trace_malloc:
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+        run()
+        if trace_malloc:
+            alloc_peak = tracemalloc.get_traced_memory()[1] - current
+    finally:
+        events.uninstall()
+
+    figures = {'ticks': ticks_run,
+               'ticks_per_second': round(ticks_run / seconds),
+               'events_created': events.count,
+               'events_per_second': round(events.count / seconds)}
+    if trace_malloc:
+        figures['alloc_peak'] = alloc_peak
+    return figures
+
+
+def busy_wait(ticks, trace_malloc=False):
+    '''Run mvc's busy waiting controller and report the events created.
+
+    The same loop creating a new event per tick is run too, as
+    the baseline the shared (flyweight) tick event is measured
+    against.
+
+    Arguments:
+    ticks -- the number of tick events to post
+    trace_malloc -- also measure the allocated bytes with tracemalloc
+    '''
+    from mvc import Event, TickEvent, BusyWaitingController
+
+    class NewTickEvent(TickEvent):
+        '''A tick event created anew each time (with a dictionary).'''
+        def __new__(cls):
+            return Event.__new__(cls)
+
+    class NewEventController(BusyWaitingController):
+        '''The busy waiting controller creating a new event per tick.'''
+        def run(self):
+            post = self.event_manager.post
+            while self.keep_going:
+                post(NewTickEvent())
+
+    return {'shared_event': _busy_loop(BusyWaitingController, ticks,
+                                       trace_malloc),
+            'event_per_tick': _busy_loop(NewEventController, ticks,
+                                         trace_malloc)}
+
+
+def run_benchmarks(scenes=SCENES, frames=300, trace_malloc=False):
+    '''Run each scene for some frames and report its figures.
+
+    Arguments:
+    scenes -- the names of the scenes to run (see SCENES)
+    frames -- the number of scripted frames of each scene
+    trace_malloc -- also measure the allocated bytes with tracemalloc
+
+    Return: a dictionary of scene name -> figures.
+    '''
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    # keep the standard output clean for the JSON report
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+    import pygame
+    pygame.init()
+    pygame.display.set_mode((constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT))
+
+    if trace_malloc:
+        tracemalloc.start()
+
+    from mvc import EventManager
+    from tct import MainController
+
+    harness = Harness(frames, trace_malloc)
+    harness.install()
+    results = {}
+
+    try:
+        for name in scenes:
+            if name == 'busy_wait':
+                results[name] = busy_wait(frames * BUSY_WAIT_TICKS, trace_malloc)
+                continue
+
+            pygame.event.clear()
+            harness.reset(None)
+
+            started = time.perf_counter()
+            scene, start, done, script = _scenario(name, harness, GameOptions())
+            controller = MainController(EventManager(), None,
+                                        SceneRunner(scene))
+            if start:
+                start()
+            setup = time.perf_counter() - started
+
+            harness.reset(script)
+            while not done():
+                controller.run_frame()
+            results[name] = summarize(harness.samples, setup)
+    finally:
+        harness.uninstall()
+        if trace_malloc:
+            tracemalloc.stop()
+
+    results['_meta'] = {'frames': frames, 'python': sys.version.split()[0],
+                        'pygame': pygame.version.ver,
+                        'version': constants.GAME_VERSION}
+    return results
+
+
+def main():
+    parser = OptionParser(usage="Usage: %prog [OPTIONS]")
+
+    parser.add_option("-f", "--frames", type="int", default=300,
+                      help="scripted frames of each scene [default: %default]")
+    parser.add_option("-s", "--scenes", default=','.join(SCENES),
+                      help="comma separated scenes [default: %default]")
+    parser.add_option("-o", "--output", default=None,
+                      help="write the JSON report to a file")
+    parser.add_option("-m", "--trace-malloc", default=False,
+                      action="store_true", dest="trace_malloc",
+                      help="also measure the allocated bytes (slower)")
+
+    options, arguments = parser.parse_args()
+    if arguments:
+        parser.error("invalid argument")
+
+    # the resources are found relatively to this directory
+    os.chdir(os.path.abspath(os.path.dirname(sys.argv[0])))
+
+    results = run_benchmarks(options.scenes.split(','), options.frames,
+                             options.trace_malloc)
+    report = json.dumps(results, indent=2, sort_keys=True)
+
+    if options.output:
+        with open(options.output, 'w') as fout:
+            fout.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
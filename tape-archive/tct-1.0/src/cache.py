@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+#    Resource Caching Utilities.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Resource Caching Utilities.
+
+This module provides a size-bounded least recently used
+cache which keeps decoded resources (surfaces, etc.) alive
+between scenes, so that they are not loaded twice.
+'''
+
+try:
+    from collections import OrderedDict
+    from base import Base
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['LRUCache']
+
+
+class LRUCache(Base):
+    '''A least recently used cache with a size budget.
+
+    Every entry has a size (in bytes, or any other unit the
+    sizeof function returns). When the total size of the unpinned
+    entries exceeds the budget the least recently used of them are
+    evicted. The pinned entries stay until they are unpinned and
+    don't count toward the budget (so the cache as a whole can
+    grow past it while many entries are pinned).
+    '''
+
+    def __init__(self, budget, sizeof=lambda value: 1):
+        '''Create a new empty cache.
+
+        Arguments:
+        budget -- the maximum total size of the unpinned entries
+        sizeof -- a function which returns the size of a value
+        '''
+        self.budget = budget
+        self.sizeof = sizeof
+
+        # key -> [value, size], ordered from least to most recently used
+        self.entries = OrderedDict()
+
+        # key -> pin count
+        self.pins = {}
+
+        # the total size of all the cached entries
+        self.size = 0
+
+        # the part of the size taken by the pinned entries
+        self.pinned_size = 0
+
+        # the largest total size seen since the last reset_peak()
+        self.peak = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, default=None):
+        '''Return the value of a key and mark it as recently used.
+
+        Arguments:
+        key -- the key of the entry
+        default -- what to return on a cache miss
+        '''
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size=None):
+        '''Add (or replace) an entry and evict if over budget.
+
+        Arguments:
+        key -- the key of the entry
+        value -- the value to cache
+        size -- the size of the value, sizeof(value) if not given
+        '''
+        if size is None:
+            size = self.sizeof(value)
+
+        pinned = key in self.pins
+        if key in self.entries:
+            self.size -= self.entries[key][1]
+            if pinned:
+                self.pinned_size -= self.entries[key][1]
+
+        self.entries[key] = [value, size]
+        self.entries.move_to_end(key)
+        self.size += size
+        if pinned:
+            self.pinned_size += size
+        self.peak = max(self.peak, self.size)
+
+        self._evict()
+        return value
+
+    def discard(self, key):
+        '''Remove an entry (pinned or not) if it exists.'''
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+            if key in self.pins:
+                self.pinned_size -= entry[1]
+        self.pins.pop(key, None)
+
+    def pin(self, key):
+        '''Protect an entry from eviction (pins are counted).'''
+        count = self.pins.get(key, 0)
+        if count == 0 and key in self.entries:
+            self.pinned_size += self.entries[key][1]
+        self.pins[key] = count + 1
+
+    def unpin(self, key):
+        '''Release one pin of an entry, making it evictable again.'''
+        count = self.pins.get(key, 0) - 1
+        if count > 0:
+            self.pins[key] = count
+        elif key in self.pins:
+            del self.pins[key]
+            if key in self.entries:
+                self.pinned_size -= self.entries[key][1]
+            self._evict()
+
+    def is_pinned(self, key):
+        return key in self.pins
+
+    def clear(self):
+        '''Remove all the unpinned entries.'''
+        for key in [k for k in self.entries if k not in self.pins]:
+            self.discard(key)
+
+    def reset_peak(self):
+        '''Start measuring a new size high-water mark.'''
+        self.peak = self.size
+
+    def stats(self):
+        '''Return the cache counters as a dictionary.'''
+        return {'entries': len(self.entries), 'size': self.size,
+                'budget': self.budget, 'peak': self.peak,
+                'pinned': len(self.pins), 'pinned_size': self.pinned_size,
+                'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+    def _evict(self):
+        '''Drop least recently used unpinned entries until within budget.'''
+        if self.size - self.pinned_size <= self.budget:
+            return
+
+        for key in list(self.entries):
+            if self.size - self.pinned_size <= self.budget:
+                break
+            if key in self.pins:
+                continue
+            self.size -= self.entries.pop(key)[1]
+            self.evictions += 1
+
+
+# test the script if executed
+if __name__ == '__main__':
+    import sys
+    print((' '.join(('Testing', sys.argv[0]))))
+    c = LRUCache(2)
+    c.put('a', 1)
+    c.put('b', 2)
+    c.put('c', 3)
+    print(c.stats())
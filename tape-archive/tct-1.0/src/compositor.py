@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+#    Dirty Rectangle Compositor.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Dirty Rectangle Compositor.
+
+This module draws a scene as layers of sprites over a static
+background and redraws only the regions of the screen which
+changed since the last frame: the moved sprites, the menu when
+its focus changes and the mouse cursor when it moves. Only those
+regions are pushed to the display.
+
+A scene may also have a sprite_batch.SpriteBatch, drawn under all
+the layers: its sprites are drawn on a copy of the background, and
+the regions they left or entered are redrawn like the moved sprites'.
+'''
+
+try:
+    import pygame, profiler
+    from pygame.locals import SRCALPHA
+    from kezmenu import FOCUS_IMAGE_SPACE
+    from base import Base
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['Compositor', 'StaticSprite', 'CursorSprite', 'MenuSprite',
+           'COMPOSITOR_PHASES']
+
+# with more regions changed by the batch than this, the whole
+# screen is redrawn (cheaper than merging the regions)
+MAX_BATCH_RECTS = 64
+
+# the phases a compositor marks on its profiler: moving the batch's
+# sprites, updating the layers' sprites (a menu is rendered again
+# when its focus changes, the cursor follows the mouse), drawing
+# the batch on the background copy and drawing the changed regions
+COMPOSITOR_PHASES = ('sprites', 'layers', 'batch', 'draw')
+
+
+class StaticSprite(pygame.sprite.DirtySprite):
+    '''A sprite which never changes (a frame, a box, etc).'''
+
+    def __init__(self, image, pos=(0, 0)):
+        '''Create a new static sprite.
+
+        Arguments:
+        image -- the sprite's surface
+        pos -- the sprite's top-left position
+        '''
+        pygame.sprite.DirtySprite.__init__(self)
+        self.image = image
+        self.rect = self.image.get_rect(topleft=pos)
+        self.dirty = 0
+
+
+class CursorSprite(pygame.sprite.DirtySprite):
+    '''The custom mouse cursor, centered at the mouse position.'''
+
+    def __init__(self, image):
+        '''Create a new cursor sprite.
+
+        Arguments:
+        image -- the cursor's surface
+        '''
+        pygame.sprite.DirtySprite.__init__(self)
+        self.image = image
+        self.rect = self.image.get_rect()
+        self.pos = None
+
+    def update(self, *args):
+        '''Follow the mouse (the sprite gets dirty only if it moved).'''
+        pos = pygame.mouse.get_pos()
+        if pos != self.pos:
+            self.pos = pos
+            self.rect.center = pos
+            self.dirty = 1
+
+
+class MenuSprite(pygame.sprite.DirtySprite):
+    '''A KezMenu rendered offscreen, redrawn only when it changes.'''
+
+    def __init__(self, menu):
+        '''Create a new menu sprite and render the menu.
+
+        Arguments:
+        menu -- the KezMenu to show
+        '''
+        pygame.sprite.DirtySprite.__init__(self)
+        self.menu = menu
+        self.state = None
+        self.update()
+
+    def _menu_state(self):
+        '''Return everything which changes the look of the menu.'''
+        menu = self.menu
+        return (menu.option, menu.x, menu.y, menu.image_enabled, menu.font,
+                tuple(menu.focus_color), tuple(menu.normal_color))
+
+    def update(self, *args):
+        '''Render the menu again if its focus, colors, etc changed.'''
+        state = self._menu_state()
+        if state == self.state:
+            return
+        self.state = state
+
+        menu = self.menu
+        graphic = menu.focus_graphic
+
+        # the focus graphic is drawn on the left of the labels
+        left = menu.x
+        if menu.image_enabled:
+            left -= FOCUS_IMAGE_SPACE + graphic.get_width()
+        left, top = int(left), int(menu.y)
+
+        self.rect = pygame.Rect(left, top,
+                                int(menu.x + menu.width) - left + 1,
+                                menu.height + graphic.get_height())
+        self.image = pygame.Surface(self.rect.size, SRCALPHA).convert_alpha()
+        self.image.fill((0, 0, 0, 0))
+
+        # draw the menu relatively to the sprite (the offset keeps
+        # the labels' rectangles in screen coordinates for the mouse)
+        position, offset = menu.position, menu.screen_topleft_offset
+        menu.x, menu.y = menu.x - left, menu.y - top
+        menu.screen_topleft_offset = (left, top)
+        try:
+            menu.draw(self.image)
+        finally:
+            menu.x, menu.y = position
+            menu.screen_topleft_offset = offset
+
+        self.dirty = 1
+
+
+class Compositor(Base):
+    '''Draws layers of sprites, redrawing only what changed.'''
+
+    def __init__(self, screen, background, batch=None,
+                 profiler=profiler.NULL_PROFILER):
+        '''Create a new compositor without sprites.
+
+        Arguments:
+        screen -- the surface to draw on
+        background -- the surface drawn under all the layers
+        batch -- a SpriteBatch drawn over the background (optional)
+        profiler -- times the COMPOSITOR_PHASES of the frames
+        '''
+        self.screen = screen
+        self.batch = batch
+        self.profiler = profiler
+        # always in dirty rectangles mode: the group starts in full
+        # screen mode (without clearing the sprites' dirty flags) and
+        # goes back to it after a slow frame, redrawing every sprite
+        # on the following frame
+        self.sprites = pygame.sprite.LayeredDirty(
+            _use_update=True, _time_threshold=float('inf'))
+        self.set_background(background)
+
+    def set_background(self, background):
+        '''Replace the surface drawn under all the layers.
+
+        Arguments:
+        background -- the new background
+        '''
+        self.background = background
+
+        # the batch's sprites are drawn on a copy of the background
+        # (the layers are cleared with it), the regions they cover
+        # are restored from the background itself
+        self.batch_background = background
+        if self.batch is not None:
+            self.batch_background = background.copy()
+        self.batch_rects = []
+
+        self.sprites.clear(self.screen, self.batch_background)
+        self.repaint()
+
+    def add(self, sprites, layer):
+        '''Add a sprite, or a group of them, to a layer.
+
+        Arguments:
+        sprites -- a sprite or a group of sprites
+        layer -- higher layers are drawn on top of lower ones
+        '''
+        self.sprites.add(sprites, layer=layer)
+
+    def repaint(self):
+        '''Redraw the whole screen on the next frame.
+
+        Needed when something else drew on the screen (another
+        scene, a new display mode, etc).
+        '''
+        self.sprites.repaint_rect(self.screen.get_rect())
+
+    def update(self, *args):
+        '''Update all the sprites (the arguments are passed to them).'''
+        if self.batch is not None:
+            self.batch.update(*args)
+        self.profiler.mark('sprites')
+
+        self.sprites.update(*args)
+        self.profiler.mark('layers')
+
+    def _draw_batch(self):
+        '''Move the batch's sprites on the background copy and mark
+        the regions they left or entered for redrawing.'''
+        old_rects = self.batch_rects
+        background = self.background
+        self.batch_background.blits([(background, rect, rect)
+                                     for rect in old_rects], False)
+        self.batch_rects = self.batch.draw(self.batch_background)
+
+        if len(old_rects) + len(self.batch_rects) > MAX_BATCH_RECTS:
+            self.repaint()
+        else:
+            for rect in old_rects + self.batch_rects:
+                self.sprites.repaint_rect(rect)
+
+    def draw(self):
+        '''Redraw the changed regions of the screen.
+
+        Return: the rectangles to pass to pygame.display.update().
+        '''
+        if self.batch is not None:
+            self._draw_batch()
+        self.profiler.mark('batch')
+
+        rects = self.sprites.draw(self.screen)
+        self.profiler.mark('draw')
+        return rects
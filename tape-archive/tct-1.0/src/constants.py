@@ -53,10 +53,26 @@ INTRO_DIR = 'intro'
 MENU_DIR = 'menu'
 SHARE_DIR = 'share'
 
+'''the prebaked resources archive (see asset_pack.py)'''
+ASSET_PACK = 'ct-assets-0.pack'
+
 '''game resolution'''
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 
+'''main loop timing (see tct.MainController)'''
+# the scenes are updated this many times per second, in fixed steps
+UPDATE_RATE = 50
+
+# the highest frame rate (between updates the scenes are interpolated)
+FRAME_RATE = 60
+
+# the frame rate while the active scene is still
+IDLE_FRAME_RATE = 10
+
+# the longest frame time (in seconds) simulated after a stall
+MAX_FRAME_TIME = 0.25
+
 '''scene names'''
 SCENES = { 'intro':'introduction', 'menu':'main menu', 'level_one': 'first level' }
 
@@ -114,6 +130,28 @@ FILES = { 'graphics': {
           }
         }
 
+'''the resources each scene loads when it is created'''
+SCENE_FILES = { SCENES['intro']: {
+                  'graphics': FILES['graphics']['intro']['slides'] +
+                              tuple(FILES['graphics']['intro']['blank']),
+                  'sounds': ()
+                },
+                SCENES['menu']: {
+                  'graphics': tuple(FILES['graphics']['menu']['main']['bg'] +
+                                    FILES['graphics']['menu']['settings']['box'] +
+                                    FILES['graphics']['menu']['share']['frame'] +
+                                    FILES['graphics']['menu']['share']['bg'] +
+                                    FILES['graphics']['menu']['share']['cursor'] +
+                                    FILES['graphics']['menu']['share']['focus']) +
+                              FILES['graphics']['menu']['share']['anim'],
+                  'sounds': tuple(FILES['sounds']['menu']['share']['sel'] +
+                                  FILES['sounds']['menu']['share']['focus'])
+                },
+                SCENES['level_one']: {
+                  'graphics': (),
+                  'sounds': ()
+                } }
+
 '''other game information'''
 GAME_GPL = (
   "Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>",
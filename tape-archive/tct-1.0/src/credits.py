@@ -27,12 +27,12 @@
 
 
 try:
-    import constants, pygame
+    import constants, pygame, profiler, re
     from pygame.locals import *
     from base import Base
     from sound_mixer import load_sound, play_sound
     from graphics import load_image, load_font
-    from utils import get_time_sec
+    from credits_layout import CreditsLayout, cached_layout
 except ImportError as err:
     try:
         import os
@@ -76,6 +76,81 @@ SOUND_VOL = 0.2
 SCROLL_SPEED = 50
 SCROLL_FACTOR = 100
 
+## the height of the strips the credits text is composed into
+STRIP_HEIGHT = 256
+
+## the profiled phases of a credits screen's frame
+CREDITS_PHASES = ('events', 'update', 'compose', 'redraw')
+
+## the style of the lines, the default one and one per font size token
+## tag (a line's style index in the compiled layout points in here)
+STYLE_TAGS = sorted(SIZE_TAGS)
+STYLES = [(FONT_SIZE, FONT_COLOR)] + [SIZE_TAGS[tag] for tag in STYLE_TAGS]
+
+## matches all the markup token tags
+TOKEN_TAGS = re.compile('|'.join(re.escape(tag) for tag in
+                                 sorted(list(AUTH_TAGS) + list(SIZE_TAGS))))
+
+
+## read the credits text a line at a time, skip the comments and
+## interpret the markup token tags of each line in a single pass
+#
+# @param textfile the file with the text content
+# @return a generator of the lines' text and style index
+def credits_lines(textfile):
+    with open(textfile) as fin:
+        for line in fin:
+            # strip all white characters from right and left
+            line = line.strip()
+
+            # ignore lines having as first non
+            # white character the comment one
+            if line.startswith(CREDITS_COMMENT_TOKEN):
+                continue
+
+            # the font size token tags found in the line
+            size_tags = []
+
+            # replace the usernames with the real names
+            # and remove the font size token tags
+            def interpret(match):
+                tag = match.group()
+                if tag in AUTH_TAGS:
+                    return AUTH_TAGS[tag]
+                size_tags.append(tag)
+                return ''
+
+            line = TOKEN_TAGS.sub(interpret, line)
+
+            # the first font size token tag sets the size and color
+            if size_tags:
+                yield line, STYLE_TAGS.index(size_tags[0]) + 1
+            else:
+                yield line, 0
+
+
+## lay out the credits text (each line LINESPACE below the previous)
+#
+# @param textfile the file with the text content
+# @return the compiled layout
+def compile_credits(textfile):
+    lines = [(i * LINESPACE, style, text) for i, (text, style)
+             in enumerate(credits_lines(textfile))]
+    return CreditsLayout.compile(lines, len(lines) * LINESPACE)
+
+
+## load the compiled layout of the credits text (compiling
+## it again only if the text or the markup tags changed)
+#
+# @param textfile the file with the text content
+# @return the compiled layout
+def load_credits(textfile):
+    salt = repr((LINESPACE, AUTH_TAGS, [(tag, SIZE_TAGS[tag][0],
+                                         tuple(SIZE_TAGS[tag][1]))
+                                        for tag in STYLE_TAGS],
+                 FONT_SIZE, tuple(FONT_COLOR))).encode('utf-8')
+    return cached_layout(textfile, compile_credits, salt)
+
 
 ## class for creating text items
 #
@@ -107,26 +182,17 @@ class TextItem(Base):
         ## store the vertical offset
         self.vertical = vertical
 
-        ## set the font and size used for the text
-        self.font = load_font(
+        # get the (shared) font and size used for the text
+        font = load_font(
             constants.FILES['fonts']['menu']['share'][3], size)
 
-        # render the text with the appropriate attributes
-        self.text = self.font.render(self.text, True, self.color)
+        # render the text with the appropriate attributes (each
+        # line is rendered once, a glyph atlas wouldn't pay off)
+        self.text = font.render(self.text, True, self.color)
 
         ## set the x coordinate (horizontally in the middle)
         self.x = (self.surface.get_width() - self.text.get_width()) / 2.0
 
-    ## draw the text item
-    #
-    # @param self the object pointer
-    def redraw(self):
-        # set the y coordinate (vertically to the bottom + vertical offset)
-        y = self.parent.scroll_root + self.vertical
-
-        # blit the text at x, y on the surface given
-        self.surface.blit(self.text, (self.x, y))
-
 
 ## class for game's credits screen
 #
@@ -157,21 +223,19 @@ class Credits(Base):
         ## set the sound when we return back to the caller
         self.return_sound = sound
 
-        ## flag to control the credits loop
-        self.credits_running = None
-
-        ## the list with the rendered text items
-        self.text_items = []
+        ## whether the credits are shown (until the user leaves)
+        self.credits_running = True
 
         ## set the initial background image x coordinate
         self.bg_x_pos = 0
 
-        ## the total height of the rendered text content
-        self.height = 0
-
         ## the scroll root starts from the bottom of the screen
         self.scroll_root = self.screen.get_height()
 
+        ## the scroll root and background x coordinate before
+        ## the last update (the frames are drawn in between)
+        self.previous = (self.scroll_root, self.bg_x_pos)
+
         ## the speed of the scroll movement
         self.scroll_speed = SCROLL_SPEED
 
@@ -179,102 +243,125 @@ class Credits(Base):
         ## for the eye to be the same as the scroll speed
         self.background_speed = self.scroll_speed
 
-        with open(textfile) as fin:
-            # parse each line, interpreter markup tokens, create text items
-            for line in fin:
-
-                # strip all white characters from right and left
-                line = line.strip()
-
-                # ignore lines having as first non
-                # white character the comment one
-                if line.startswith(CREDITS_COMMENT_TOKEN):
-                    # go to the next line
-                    continue
-
-                # interpret main authors token tags
-                for token_tag in AUTH_TAGS:
-                    # check if the author token tag exists in the line
-                    if token_tag in line:
-                        # replace the username with the real name
-                        line = line.replace(token_tag, AUTH_TAGS[token_tag])
-                        # we accept only one author token tag on each line
-                        break
-
-                # interpret font sizes token tags and create text items
-                for token_tag in SIZE_TAGS:
-                    # check if the font size token tag exists in the line
-                    if token_tag in line:
-                        # remove the font size token tag
-                        line = line.replace(token_tag, "")
-
-                        # create the appropriate rendered text item
-                        newtext = TextItem(self,
-                                           self.screen,
-                                           line,
-                                           self.height,
-                                           SIZE_TAGS[token_tag][0],
-                                           SIZE_TAGS[token_tag][1])
-
-                        # we accept only one font size token tag per line
-                        break
-                    # if the line has no markup token tag render text as default
-                    else:
-                        # create the default rendered text item
-                        newtext = TextItem(self, self.screen, line, self.height)
-
-                # add text item to the list
-                self.text_items.append(newtext)
-
-                # the linespace between lines
-                # should be the max font size
-                self.height += LINESPACE
-
-        # create clock and track time
-        self.clock = pygame.time.Clock()
-
-
-    ## run the loop of the credits screen
-    #
-    # @param self the object pointer
-    # @return inform caller to quit or not
-    def run(self):
-        # flag to control the credits loop
-        self.credits_running = True
+        ## the laid out lines of the text (nothing is rendered up front)
+        self.layout = load_credits(textfile)
+
+        ## the total height of the text content
+        self.height = self.layout.height
+
+        ## the number of lines rendered so far
+        self.lines_rendered = 0
 
-        # display & update screen, get all the events
-        while self.credits_running:
-            # redraw the credits screen
-            need_update = self._redraw()
+        ## the rendered text items crossing the next strip's top
+        self.carried_items = []
 
-            # count time passed in seconds
-            time_passed_seconds = get_time_sec(self.clock.tick())
+        ## the composed strips inside (or just below) the screen,
+        ## strip index -> (x coordinate, strip) or None if empty
+        self.strips = {}
 
-            # update the screen objects' position
-            self._update(time_passed_seconds)
+        ## the index of the next strip to compose
+        self.next_strip = 0
 
-            # display the screen surface
-            pygame.display.update(need_update)
+        ## the index of the first strip not yet freed
+        self.first_strip = 0
 
-            # get all the events and operate properly
-            for e in pygame.event.get():
-                # quit when the close button is pressed
-                if e.type == pygame.QUIT:
-                    # force caller to terminate the game
-                    return False
+        ## times the phases of the credits screen's frames
+        self.profiler = profiler.get_profiler('credits', CREDITS_PHASES)
 
-            # handle keyboard keys
-            key = pygame.key.get_pressed()
-            # when user presses escape key or 'q'uit key
-            if key[K_ESCAPE] or key[K_q]:
-                self.credits_running = False
 
-                # play the return sound
-                if self.game_opts.sound:
-                    play_sound(self.return_sound, SOUND_VOL)
+    ## handle the keys of the credits screen
+    #
+    # @param self the object pointer
+    # @param events the events of the frame
+    def handle_events(self, events):
+        # handle keyboard keys
+        key = pygame.key.get_pressed()
+        # when user presses escape key or 'q'uit key
+        if self.credits_running and (key[K_ESCAPE] or key[K_q]):
+            self.credits_running = False
+
+            # play the return sound
+            if self.game_opts.sound:
+                play_sound(self.return_sound, SOUND_VOL)
+
+        self.profiler.mark('events')
+
+    ## move the screen objects by a time step
+    #
+    # @param self the object pointer
+    # @param dt the time step in seconds
+    def update(self, dt):
+        self.previous = (self.scroll_root, self.bg_x_pos)
+        self._update(dt)
+
+        # the background wrapped around, so it moves on from the
+        # previous position shifted by its width (not backwards)
+        if self.bg_x_pos > self.previous[1]:
+            self.previous = (self.previous[0],
+                             self.previous[1] + self.credits_bg.get_width())
 
-        # credits screen returns normally
-        return True
+        self.profiler.mark('update')
+
+    ## draw the credits screen between the last two updates
+    #
+    # @param self the object pointer
+    # @param alpha how far from the previous update to the last one
+    # @return the changed rectangles of the screen
+    def render(self, alpha):
+        scroll_root, bg_x_pos = self.previous
+        scroll_root += (self.scroll_root - scroll_root) * alpha
+        bg_x_pos += (self.bg_x_pos - bg_x_pos) * alpha
+
+        # right after wrapping around the background may be
+        # interpolated past its start, so wrap it around again
+        if bg_x_pos > 0:
+            bg_x_pos -= self.credits_bg.get_width()
+
+        return self._redraw(scroll_root, bg_x_pos)
+
+    ## compose the next strip of the text, rendering the lines
+    ## inside it (a line crossing two strips is drawn on both)
+    #
+    # @param self the object pointer
+    # @return the strip's x coordinate and surface, None if empty
+    def _compose_next_strip(self):
+        top = self.next_strip * STRIP_HEIGHT
+        bottom = top + STRIP_HEIGHT
+
+        # render the lines starting inside the strip
+        items = self.carried_items
+        while (self.lines_rendered < len(self.layout) and
+               self.layout.verticals[self.lines_rendered] < bottom):
+            vertical, style, text = self.layout.line(self.lines_rendered)
+            self.lines_rendered += 1
+
+            size, color = STYLES[style]
+            item = TextItem(self, self.screen, text, vertical, size, color)
+
+            # nothing to draw for the blank lines
+            if item.text.get_width():
+                items.append(item)
+
+        # keep the lines going on in the next strip
+        self.carried_items = [item for item in items
+                              if item.vertical + item.text.get_height() > bottom]
+
+        if not items:
+            return None
+
+        # the strip is only as wide as its widest line
+        x = min(int(item.x) for item in items)
+        width = max(int(item.x) + item.text.get_width() for item in items) - x
+
+        strip = pygame.Surface((width, STRIP_HEIGHT), SRCALPHA)
+        strip = strip.convert_alpha()
+        strip.fill((0, 0, 0, 0))
+        for item in items:
+            strip.blit(item.text, (item.x - x, item.vertical - top))
+
+        # skip the transparent runs quickly when blitting
+        strip.set_alpha(255, RLEACCEL)
+        return x, strip
 
     ## update the screen objects' position
     #
@@ -294,25 +381,53 @@ class Credits(Base):
 
         # correct the x coordinate of the background image
         if self.bg_x_pos < -self.credits_bg.get_width():
-            self.bg_x_pos = 0
+            self.bg_x_pos += self.credits_bg.get_width()
 
     ## redraw the credits screen
     #
     # @param self the object pointer
-    def _redraw(self):
+    # @param scroll_root the y coordinate of the text's top
+    # @param bg_x_pos the x coordinate of the background image
+    # @return the changed rectangles of the screen
+    def _redraw(self, scroll_root, bg_x_pos):
 
         # draw the background image
-        bg = self.screen.blit(self.credits_bg, (self.bg_x_pos, 0))
+        bg = self.screen.blit(self.credits_bg, (bg_x_pos, 0))
 
         # blit the continuation of the background image
-        if self.bg_x_pos < - (self.credits_bg.get_width() -
+        if bg_x_pos < - (self.credits_bg.get_width() -
                               self.screen.get_width()):
 
-            bg_cont = self.screen.blit(self.credits_bg, (self.bg_x_pos +
+            bg_cont = self.screen.blit(self.credits_bg, (bg_x_pos +
                              self.credits_bg.get_width(), 0))
 
-        # draw each text item
-        [item.redraw() for item in self.text_items]
+        self.profiler.mark('redraw')
+
+        # the part of the text inside the screen
+        view_top = -scroll_root
+        view_bottom = view_top + self.screen.get_height()
+        first = max(int(view_top // STRIP_HEIGHT), 0)
+        last = max(int(view_bottom // STRIP_HEIGHT), 0)
+
+        # free the strips which scrolled past the top of the screen
+        while self.first_strip < first:
+            self.strips.pop(self.first_strip, None)
+            self.first_strip += 1
+
+        # compose the strips up to one below the screen (so that
+        # they are ready before they scroll into view)
+        while self.next_strip <= last + 1:
+            self.strips[self.next_strip] = self._compose_next_strip()
+            self.next_strip += 1
+
+        self.profiler.mark('compose')
+
+        # draw only the strips of the text inside the screen
+        for i in range(first, last + 1):
+            strip = self.strips.get(i)
+            if strip:
+                self.screen.blit(strip[1], (strip[0],
+                                 scroll_root + i * STRIP_HEIGHT))
 
         # draw the frame of the window
         fr = self.screen.blit(self.window_frame, (0, 0))
@@ -323,6 +438,7 @@ class Credits(Base):
         else:
             need_update = (bg, fr)
 
+        self.profiler.mark('redraw')
         return need_update
 
 
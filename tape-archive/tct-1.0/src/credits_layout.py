@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+#    Compiled Credits Layout.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Compiled Credits Layout.
+
+This module stores the laid out credits text in a compact binary
+file: the vertical offset and the style index of each line, and
+the lines' text with the markup already substituted. The file is
+cached on disk and compiled again only when the hash of the
+source text (or of the markup tables) changes.
+
+The file is a header followed by four arrays:
+
+    magic, version, source hash, line count, total height
+    vertical offset of each line   (unsigned 32 bits)
+    style index of each line       (unsigned 8 bits)
+    end of each line's text        (unsigned 32 bits)
+    the lines' text                (UTF-8)
+'''
+
+try:
+    import constants, hashlib, os, struct
+    from array import array
+    from base import Base
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['CreditsLayout', 'cached_layout']
+
+# the file's signature and format version
+LAYOUT_MAGIC = b'TCTLYT'
+LAYOUT_VERSION = 1
+
+# signature, version, source hash, line count, total height
+HEADER = struct.Struct('<6sB20sII')
+
+# the compiled layouts are kept here (relative to the resources dir)
+LAYOUT_CACHE_DIR = 'cache'
+
+
+class CreditsLayout(Base):
+    '''The laid out lines of a credits text.'''
+
+    def __init__(self, verticals, styles, ends, text, height):
+        '''Create a new layout from its arrays.
+
+        Arguments:
+        verticals -- the vertical offset of each line
+        styles -- the style index of each line
+        ends -- where the text of each line ends in the text
+        text -- the UTF-8 text of all the lines
+        height -- the total height of the text
+        '''
+        self.verticals = verticals
+        self.styles = styles
+        self.ends = ends
+        self.text = text
+        self.height = height
+
+    def __len__(self):
+        return len(self.verticals)
+
+    def line(self, i):
+        '''Return the vertical offset, style index and text of a line.'''
+        start = self.ends[i - 1] if i else 0
+        return (self.verticals[i], self.styles[i],
+                self.text[start:self.ends[i]].decode('utf-8'))
+
+    @classmethod
+    def compile(cls, lines, height):
+        '''Lay out the lines of a text.
+
+        Arguments:
+        lines -- (vertical offset, style index, text) of each line
+        height -- the total height of the text
+        '''
+        verticals, styles, ends = array('I'), array('B'), array('I')
+        chunks, end = [], 0
+
+        for vertical, style, text in lines:
+            data = text.encode('utf-8')
+            end += len(data)
+
+            verticals.append(vertical)
+            styles.append(style)
+            ends.append(end)
+            chunks.append(data)
+
+        return cls(verticals, styles, ends, b''.join(chunks), height)
+
+    @classmethod
+    def load(cls, filename, digest):
+        '''Read a compiled layout.
+
+        Arguments:
+        filename -- the compiled file
+        digest -- the hash the layout must have been compiled from
+
+        Return: the layout, None if the file is stale or not valid.
+        '''
+        try:
+            with open(filename, 'rb') as fin:
+                data = fin.read()
+
+            magic, version, source, count, height = HEADER.unpack_from(data)
+            if (magic, version, source) != (LAYOUT_MAGIC, LAYOUT_VERSION, digest):
+                return None
+
+            arrays, offset = [], HEADER.size
+            for typecode in 'IBI':
+                values = array(typecode)
+                size = values.itemsize * count
+                values.frombytes(data[offset:offset + size])
+                arrays.append(values)
+                offset += size
+
+            verticals, styles, ends = arrays
+            text = data[offset:]
+            if len(ends) != count or (count and ends[-1] != len(text)):
+                return None
+        except (IOError, ValueError, struct.error):
+            return None
+
+        return cls(verticals, styles, ends, text, height)
+
+    def save(self, filename, digest):
+        '''Write the layout, compiled from a source with some hash.'''
+        with open(filename, 'wb') as fout:
+            fout.write(HEADER.pack(LAYOUT_MAGIC, LAYOUT_VERSION, digest,
+                                   len(self), self.height))
+            for values in (self.verticals, self.styles, self.ends):
+                fout.write(values.tobytes())
+            fout.write(self.text)
+
+
+def cached_layout(textfile, compile, salt=b''):
+    '''Return the layout of a text, compiling it only if it changed.
+
+    Arguments:
+    textfile -- the source text's filename
+    compile -- called with the filename to lay out the text
+    salt -- what else the layout depends on (the markup tables, etc)
+    '''
+    with open(textfile, 'rb') as fin:
+        digest = hashlib.sha1(salt + fin.read()).digest()
+
+    cache_dir = os.path.join(constants.RESOURCES_DIR, LAYOUT_CACHE_DIR)
+    filename = os.path.join(cache_dir, os.path.basename(textfile) + '.layout')
+
+    layout = CreditsLayout.load(filename, digest)
+    if layout is None:
+        layout = compile(textfile)
+
+        # a read-only installation compiles the layout each time
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            layout.save(filename, digest)
+        except (IOError, OSError):
+            pass
+
+    return layout
@@ -27,7 +27,7 @@
 # of the finite state machine of the game.
 
 try:
-    import constants
+    import constants, profiler
     from base import Base
 except ImportError as err:
     try:
@@ -58,12 +58,55 @@ class State(Base):
         assert(name is not '')
         self.name = name
 
+        ## the profiler of the state's frames (one doing nothing
+        #  unless the state times its phases)
+        self.profiler = profiler.NULL_PROFILER
+
     ## what to do when the state is enabled
     #
     # @param self the object pointer
     def do_actions(self):
         pass
 
+    ## handle the events of a frame (states must never block,
+    ## the main loop calls them once per frame)
+    #
+    # @param self the object pointer
+    # @param events the pygame events since the last frame
+    def handle_events(self, events):
+        pass
+
+    ## advance the state by a fixed time step
+    #
+    # @param self the object pointer
+    # @param dt the time step in seconds
+    def update(self, dt):
+        pass
+
+    ## draw the state
+    #
+    # @param self the object pointer
+    # @param alpha how far the frame is from the previous update to
+    # the last one (from 0 to 1), for interpolating the movements
+    # @return the changed rectangles of the screen (empty if none)
+    def render(self, alpha):
+        return []
+
+    ## the profiler timing the phases of the state's frames
+    #
+    # @param self the object pointer
+    # @return the state's profiler by default
+    def get_profiler(self):
+        return self.profiler
+
+    ## whether nothing changes on the screen for a while (the
+    ## main loop draws the frames at a lower rate)
+    #
+    # @param self the object pointer
+    # @return false by default
+    def is_idle(self):
+        return False
+
     ## what should be satisfied for enabling the state
     #
     # @param self the object pointer
@@ -103,9 +146,21 @@ class FSM(Base):
         ## dictionary of states
         self.states = dict()
 
+        ## dictionary of functions creating states when entered
+        self.factories = dict()
+
+        ## dictionary of the states which may follow each state
+        self.transitions = dict()
+
         ## the active state
         self.active_state = None
 
+        ## functions called with each newly entered state
+        self.enter_observers = []
+
+        ## functions called with each just exited state
+        self.exit_observers = []
+
     ## add a new state 
     #
     # @param self the object pointer    
@@ -113,6 +168,42 @@ class FSM(Base):
     def add_state(self, state):
         self.states[state.name] = state
 
+    ## add a new state which is created only when it is entered
+    ## and is dropped again when it is exited
+    #
+    # @param self the object pointer
+    # @param name the state's name
+    # @param factory a function returning the state instance
+    def add_factory(self, name, factory):
+        self.factories[name] = factory
+
+    ## allow a state to be followed by another one
+    #
+    # @param self the object pointer
+    # @param name the state's name
+    # @param next_name the name of the state which may follow it
+    def add_transition(self, name, next_name):
+        self.transitions.setdefault(name, []).append(next_name)
+
+    ## the states which may follow a state
+    #
+    # @param self the object pointer
+    # @param name the state's name
+    # @return a list of state names (empty if none)
+    def successors(self, name):
+        return self.transitions.get(name, [])
+
+    ## call functions each time a state is entered or exited
+    #
+    # @param self the object pointer
+    # @param on_enter a function taking the entered state
+    # @param on_exit a function taking the exited state
+    def add_observer(self, on_enter=None, on_exit=None):
+        if on_enter:
+            self.enter_observers.append(on_enter)
+        if on_exit:
+            self.exit_observers.append(on_exit)
+
     ## perform the active's state's actions and
     ## then check whether it should be altered
     #
@@ -133,11 +224,32 @@ class FSM(Base):
     # @param self the object pointer
     # @param new_state_name the name of the new active state
     def set_state(self, new_state_name):
-        if self.active_state:
-            self.active_state.exit_actions()
+        old_state = self.active_state
+
+        # make sure that the switch is a declared transition
+        assert (old_state is None or
+                new_state_name in self.successors(old_state.name))
+
+        if old_state:
+            old_state.exit_actions()
+
+            # drop the states made by a factory, so that their
+            # resources can be freed (they are made again if needed)
+            if old_state.name in self.factories:
+                del self.states[old_state.name]
+
+            for observer in self.exit_observers:
+                observer(old_state)
 
         # make sure that the given state exists
-        assert (new_state_name in self.states)
+        assert (new_state_name in self.states or
+                new_state_name in self.factories)
+
+        if new_state_name not in self.states:
+            self.states[new_state_name] = self.factories[new_state_name]()
 
         self.active_state = self.states[new_state_name]
         self.active_state.entry_actions()
+
+        for observer in self.enter_observers:
+            observer(self.active_state)
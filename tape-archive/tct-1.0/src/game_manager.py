@@ -29,12 +29,13 @@
 
 
 try:
-    import constants
+    import constants, graphics, logger
     from fsm import FSM
     from intro import Intro
     from menu import Menu
     from base import Base
     from level import LevelFactory
+    from preloader import AssetPreloader
 except ImportError as err:
     try:
         import os
@@ -68,44 +69,158 @@ class GameManager(Base):
         # part of the borg pattern
         self.__dict__ = self.__shared_state
 
+        ## the game's command line options
+        self.game_opts = game_opts
+
         ## the game scenes/levels
         self.scenes = FSM()
 
-        # initialise a sample level
-        # TODO: find a way of applying lazy initialisation
-        # on level creation - a level should be created only
-        # right before executed
-        # flev = LevelFactory().create_level(
-        #     constants.SCENES['level_one'],
-        #     game_opts)
-        flev = LevelFactory().create_level(
-            constants.SCENES['level_one']
-            )
-
-        # set and group the scenes
-        scenes = (Intro(game_opts), Menu(game_opts), 
-                  flev)
-
-        # add the scenes to the state machine
-        for s in scenes:
-            self.scenes.add_state(s)
-        
+        ## the largest growth of the image cache while each scene was
+        ## active (measured from the cache's size before its creation)
+        self.memory_peaks = dict()
+
+        ## the size of the image cache before the current scene
+        self.memory_base = 0
+
+        ## the scene profiler timing the current frame
+        self.scene_profiler = None
+
+        # each scene is created right before it is entered and
+        # dropped after it is exited (see FSM.add_factory)
+        self.scenes.add_factory(constants.SCENES['intro'],
+                                lambda: Intro(game_opts))
+        self.scenes.add_factory(constants.SCENES['menu'],
+                                lambda: Menu(game_opts))
+        self.scenes.add_factory(constants.SCENES['level_one'],
+                                lambda: LevelFactory().create_level(
+                                    constants.SCENES['level_one']))
+
+        # the scenes which may follow each scene
+        self.scenes.add_transition(constants.SCENES['intro'],
+                                   constants.SCENES['menu'])
+        self.scenes.add_transition(constants.SCENES['menu'],
+                                   constants.SCENES['level_one'])
+
+        ## decodes the resources of the upcoming scenes in the background
+        ## (on the event loop, once it runs, with the asyncio option)
+        self.preloader = AssetPreloader(self.scenes.successors,
+                                        threaded=not game_opts.asyncio)
+
+        # while the first scene is created, decode what follows it
+        self.preloader.warm(constants.SCENES['intro'])
+
+        self.scenes.add_observer(self._scene_entered, self._scene_exited)
+
+        # start measuring the first scene (including its creation)
+        self._reset_memory_peak()
+
         # enable the default state
-        self.scenes.active_state = scenes[0]
+        self.scenes.set_state(constants.SCENES['intro'])
+
+    ## keep the resources of the entered scene and
+    ## decode the resources of the scenes following it
+    #
+    # @param self the object pointer
+    # @param scene the entered scene
+    def _scene_entered(self, scene):
+        for filename in constants.SCENE_FILES[scene.name]['graphics']:
+            graphics.pin_image(filename)
+
+        self.preloader.warm(scene.name)
+
+    ## release the resources of the exited scene
+    ## and keep its memory high-water mark
+    #
+    # @param self the object pointer
+    # @param scene the exited scene
+    def _scene_exited(self, scene):
+        for filename in constants.SCENE_FILES[scene.name]['graphics']:
+            graphics.unpin_image(filename)
+
+        # it may be entered again, so it can be warmed again
+        self.preloader.forget(scene.name)
+
+        # what the scene added to the cache, at most
+        peak = max(self.memory_peaks.get(scene.name, 0),
+                   graphics.image_cache.peak - self.memory_base)
+        self.memory_peaks[scene.name] = peak
+
+        # start measuring the next scene (including its creation)
+        self._reset_memory_peak()
+
+        logger.info('{0}: image cache peak {1} KiB', scene.name, peak // 1024)
+
+    ## start measuring the memory used by the next scene
+    #
+    # @param self the object pointer
+    def _reset_memory_peak(self):
+        graphics.image_cache.reset_peak()
+        self.memory_base = graphics.image_cache.size
+
+    ## get the active scene's profiler ready for the scene's next
+    ## phase, leaving out the time spent outside the scene
+    #
+    # @param self the object pointer
+    def _resume_scene_profiler(self):
+        scene_profiler = self.scenes.active_state.get_profiler()
+        if scene_profiler is self.scene_profiler:
+            scene_profiler.resume()
+        else:
+            # a new frame, or the scene (or what it shows)
+            # changed during the frame
+            scene_profiler.begin()
+            self.scene_profiler = scene_profiler
+
+    ## pass the events of a frame to the active scene
+    ## (the first call of each frame)
+    #
+    # @param self the object pointer
+    # @param events the pygame events since the last frame
+    def handle_events(self, events):
+        # start timing a new frame of the scene
+        self.scene_profiler = None
+        self._resume_scene_profiler()
+
+        # the requests made before the event loop ran wait for it
+        self.preloader.dispatch()
+
+        self.scenes.active_state.handle_events(events)
+
+    ## advance the active scene by a fixed time step and
+    ## switch to the next scene when it is finished
+    #
+    # @param self the object pointer
+    # @param dt the time step in seconds
+    def update(self, dt):
+        self._resume_scene_profiler()
+        self.scenes.active_state.update(dt)
+
+        new_state_name = self.scenes.active_state.check_conditions()
+        if new_state_name is not None:
+            self.set_active_scene(new_state_name)
+
+    ## draw the active scene
+    #
+    # @param self the object pointer
+    # @param alpha how far the frame is from the previous update
+    # @return the changed rectangles of the screen
+    def render(self, alpha):
+        self._resume_scene_profiler()
+        return self.scenes.active_state.render(alpha)
 
-    ## execute the appropriate scene
+    ## whether the active scene is still for a while
     #
     # @param self the object pointer
-    def run_scene(self):
-        self.scenes.run()
+    # @return true if the frames can be drawn at a lower rate
+    def is_idle(self):
+        return self.scenes.active_state.is_idle()
 
-    ## switch the active scene and start the new one
+    ## switch the active scene
     #
     # @param self the object pointer
     # @param scene the name of the new active scene
     def set_active_scene(self, scene):
         self.scenes.set_state(scene)
-        self.run_scene()
 
 
     ## the string representation of the game manager
@@ -26,57 +26,312 @@ utilities, loading graphics, fonts, etc.
 '''
 
 try:
-    import constants, pygame
-    from pygame.locals import RLEACCEL
+    import constants, logger, pygame, threading
+    from pygame.locals import RLEACCEL, SRCALPHA
     from os_utils import file_path
+    from cache import LRUCache
+    from base import Base
+    from asset_pack import get_pack
+    from atlas import TextureAtlas
 except Exception as err:
         import constants, os
         path = os.path.basename(__file__)
         print('{0}: {1}'.format(path, err))
         exit(MOD_FAIL_ERR)
 
-__all__ = ['load_image', 'load_font', 'handle_mouse_cursor']
+__all__ = ['load_image', 'load_font', 'handle_mouse_cursor',
+           'pin_image', 'unpin_image', 'image_cache',
+           'decode_image', 'stash_image', 'is_image_loaded', 'build_atlas',
+           'get_glyph_atlas', 'GlyphAtlas']
 
 FONT_SIZE = 17
 IMAGE_COLORKEY = None
 
-def load_image(filename, colorkey=IMAGE_COLORKEY):
-    fullname = file_path(filename, constants.GRAPHICS_DIR)
+# the memory budget of the unpinned cached surfaces (in bytes)
+IMAGE_CACHE_BUDGET = 48 * 1024 * 1024
 
-    try:
-        image = pygame.image.load(fullname)
-    except:
-        import os
-        path = os.path.basename(__file__)
-        print("{0}: couldn't load image: {1}".format(path, fullname))
-        raise SystemExit
+def surface_size(surface):
+    '''Return the number of bytes used by the pixels of a surface.'''
+    return surface.get_pitch() * surface.get_height()
 
-    if image.get_alpha() is None:
-        image = image.convert()
+# the surfaces shared by all the scenes of the game
+image_cache = LRUCache(IMAGE_CACHE_BUDGET, surface_size)
+
+def image_key(filename, colorkey=IMAGE_COLORKEY, alpha=None):
+    '''Return the cache key of an image loaded with the given options.'''
+    if colorkey is not None and colorkey != -1:
+        colorkey = tuple(colorkey)
+    return (filename, colorkey, alpha)
+
+def load_image(filename, colorkey=IMAGE_COLORKEY, alpha=None):
+    '''Load an image converted to the display format.
+
+    The surface is cached and shared by all the callers asking
+    for the same image with the same options, so a caller which
+    modifies it (set_alpha, etc.) should use a copy instead.
+
+    Arguments:
+    filename -- the image's filename (relative to the graphics dir)
+    colorkey -- a transparent color, -1 for the topleft pixel's color
+    alpha -- True/False to force per pixel alpha on/off, None to detect it
+
+    Return: the surface and a new rect of the image.
+    '''
+    key = image_key(filename, colorkey, alpha)
+
+    image = image_cache.get(key)
+    if image is None:
+        image = _decode_image(filename, colorkey, alpha)
+
+        with _decoded_lock:
+            image = image_cache.put(key, image)
+            # an image stashed while this one was decoded is never used
+            if key == image_key(filename):
+                _decoded_images.pop(filename, None)
+
+    return image, image.get_rect()
+
+def pin_image(filename, colorkey=IMAGE_COLORKEY, alpha=None):
+    '''Keep an image in the cache until it is unpinned.'''
+    image_cache.pin(image_key(filename, colorkey, alpha))
+
+def unpin_image(filename, colorkey=IMAGE_COLORKEY, alpha=None):
+    '''Allow a pinned image to be evicted from the cache again.'''
+    image_cache.unpin(image_key(filename, colorkey, alpha))
+
+# surfaces decoded ahead of time (by another thread), filename -> surface
+_decoded_images = {}
+
+# makes checking the cache and stashing a surface one step
+_decoded_lock = threading.Lock()
+
+def decode_image(filename):
+    '''Decode an image, without converting it to the display format.
+
+    It does not touch the display, so it is safe to call it
+    from a thread other than the main one.
+
+    Arguments:
+    filename -- the image's filename (relative to the graphics dir)
+
+    Exceptions: SystemExit if the image can't be loaded.
+    '''
+    pack = get_pack()
+    image = pack and pack.load_image(filename)
+
+    if image is None:
+        fullname = file_path(filename, constants.GRAPHICS_DIR)
+
+        try:
+            image = pygame.image.load(fullname)
+        except:
+            logger.error("Couldn't load image: {0}", fullname)
+            raise SystemExit
+
+    return image
+
+def stash_image(filename, image):
+    '''Hand over an image decoded by decode_image to the next load_image.'''
+    with _decoded_lock:
+        # the main thread may have loaded it meanwhile
+        if image_key(filename) not in image_cache:
+            _decoded_images[filename] = image
+
+def is_image_loaded(filename):
+    '''Whether an image is cached or stashed (with the default options).'''
+    with _decoded_lock:
+        return filename in _decoded_images or image_key(filename) in image_cache
+
+def build_atlas(name, filenames):
+    '''Pack the transparent images of a list into one shared surface.
+
+    From then on load_image returns subsurfaces of the atlas for
+    those images (with the default options). Opaque images are
+    loaded but left out, since they blit faster on their own.
+
+    Arguments:
+    name -- the name of the atlas
+    filenames -- the images' filenames (relative to the graphics dir)
+
+    Return: the atlas surface.
+    '''
+    key = ('atlas', name)
+    if key in image_cache:
+        return image_cache.get(key)
+
+    atlas = TextureAtlas()
+    for filename in filenames:
+        image = load_image(filename)[0]
+        if image.get_alpha() is not None or image.get_colorkey() is not None:
+            atlas.add(filename, image)
+
+    surface = image_cache.put(key, atlas.build())
+    image_cache.pin(key)
+
+    # the subsurfaces share the atlas' pixels, so they cost nothing
+    for filename in atlas.rects:
+        image_cache.put(image_key(filename), atlas.get(filename), 0)
+        image_cache.pin(image_key(filename))
+
+    return surface
+
+def _decode_image(filename, colorkey, alpha):
+    with _decoded_lock:
+        image = _decoded_images.pop(filename, None)
+    if image is None:
+        image = decode_image(filename)
+
+    if alpha is None:
+        alpha = image.get_alpha() is not None
+
+    if alpha:
+        # packed images may already be in the display's format
+        if not _has_display_alpha_format(image):
+            image = image.convert_alpha()
     else:
-        image = image.convert_alpha()
+        image = image.convert()
 
-    if colorkey:
-        if colorkey is -1:
+    if colorkey is not None:
+        if colorkey == -1:
             colorkey = image.get_at((0, 0))
         image.set_colorkey(colorkey, RLEACCEL)
 
-    return image, image.get_rect()
+    return image
+
+
+# the fonts shared by all the scenes of the game, (filename, size) -> font
+font_registry = {}
+
+# the glyph atlases of the registered fonts, font -> atlas
+glyph_atlases = {}
 
+# the masks of the per pixel alpha surfaces made by convert_alpha
+_display_alpha_masks = None
+
+def _has_display_alpha_format(image):
+    global _display_alpha_masks
+
+    if _display_alpha_masks is None:
+        _display_alpha_masks = pygame.Surface((1, 1)).convert_alpha().get_masks()
+
+    return image.get_bitsize() == 32 and \
+        image.get_masks() == _display_alpha_masks
 
 def load_font(filename, size=FONT_SIZE):
+    '''Load a font, or return the already loaded one.
+
+    Arguments:
+    filename -- the font's filename (relative to the fonts dir)
+    size -- the height of the font in pixels
+
+    Return: the font shared by all the callers of the same file and size.
+    '''
+    key = (filename, size)
+
+    font = font_registry.get(key)
+    if font is None:
+        font = font_registry[key] = _open_font(filename, size)
+
+    return font
+
+def _open_font(filename, size):
     fullname = file_path(filename, constants.FONTS_DIR)
 
+    pack = get_pack()
+    fontfile = pack and pack.open_file(constants.FONTS_DIR, filename)
+
     try:
-        font = pygame.font.Font(fullname, size)
+        font = pygame.font.Font(fontfile or fullname, size)
     except:
-        import os
-        path = os.path.basename(__file__)
-        print("{0}: couldn't load font: {1}".format(path, fullname))
+        logger.error("Couldn't load font: {0}", fullname)
         raise SystemExit
 
     return font
 
+def get_glyph_atlas(font):
+    '''Return the (shared) glyph atlas of a font.'''
+    atlas = glyph_atlases.get(font)
+    if atlas is None:
+        atlas = glyph_atlases[font] = GlyphAtlas(font)
+    return atlas
+
+
+class GlyphAtlas(Base):
+    '''A cache of the rendered glyphs of a font.
+
+    Strings are built by blitting the cached glyph surfaces
+    side by side, so each character of a given color is
+    rendered by the font only once. The glyphs are placed
+    where the font places them (kerning included), measuring
+    the string with font.size, which renders nothing. Measuring
+    costs more than font.render for long strings, so the
+    composed strings are cached too: the atlas suits the short
+    strings drawn over and over (labels, counters).
+    '''
+
+    def __init__(self, font, antialias=True):
+        '''Create a new empty glyph atlas.
+
+        Arguments:
+        font -- the font used for rendering the glyphs
+        antialias -- whether the glyphs have smooth edges
+        '''
+        self.font = font
+        self.antialias = antialias
+
+        # (character, color) -> glyph surface
+        self.glyphs = {}
+
+        # (string, color) -> composed surface
+        self.lines = {}
+
+    def glyph(self, char, color):
+        '''Return the rendered glyph of a character.'''
+        key = (char, tuple(color))
+
+        glyph = self.glyphs.get(key)
+        if glyph is None:
+            glyph = self.glyphs[key] = self.font.render(char, self.antialias, color)
+
+        return glyph
+
+    def render(self, text, color):
+        '''Render a string like font.render, using the cached glyphs.
+
+        Arguments:
+        text -- the string to render
+        color -- the color of the text
+
+        Return: a per pixel alpha surface with the text, shared by
+        the callers rendering the same string (not to be changed).
+        '''
+        key = (text, tuple(color))
+
+        surface = self.lines.get(key)
+        if surface is None:
+            surface = self.lines[key] = self._compose(text, color)
+
+        return surface
+
+    def _compose(self, text, color):
+        '''Blit the glyphs of a string on a new surface.'''
+        glyphs = [self.glyph(char, color) for char in text]
+
+        # a glyph ends where the string up to it ends (the font
+        # positions the glyphs in fractions of pixels, so adding
+        # up the glyphs' advances and kerning would drift)
+        size = self.font.size
+        ends = [size(text[:i])[0] for i in range(1, len(text) + 1)]
+
+        # an empty string is zero pixels wide (like font.render)
+        surface = pygame.Surface((sum(ends[-1:]), self.font.get_height()),
+                                 SRCALPHA)
+        for image, end in zip(glyphs, ends):
+            surface.blit(image, (end - image.get_width(), 0))
+
+        return surface
+
+
 def handle_mouse_cursor(mc, su):
     '''update the custom mouse cursor'''
     x, y = pygame.mouse.get_pos()
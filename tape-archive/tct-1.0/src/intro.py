@@ -70,7 +70,10 @@ class Intro(State):
             ]
 
         ## cut scenes object
-        self.cutscenes = IntroCutScene(self.slides)
+        self.cutscenes = IntroCutScene(self.slides, self.game_opts.fade_cache)
+
+        ## the cut scenes time the phases of the intro's frames
+        self.profiler = self.cutscenes.controller.profiler
 
         # set sound volume to minimum
         pygame.mixer.music.set_volume(0.0)
@@ -88,12 +91,34 @@ class Intro(State):
         # set sound volume to maximum
         pygame.mixer.music.set_volume(MAX_VOLUME)
 
-    ## what to do when the intro is enabled
+    ## handle the keys of the intro slideshow
+    #
+    # @param self the object pointer
+    # @param events the events of the frame
+    def handle_events(self, events):
+        self.cutscenes.handle_events(events)
+
+    ## advance the intro slideshow
+    #
+    # @param self the object pointer
+    # @param dt the time step in seconds
+    def update(self, dt):
+        self.cutscenes.update(dt)
+
+    ## show the intro slideshow
+    #
+    # @param self the object pointer
+    # @param alpha how far from the previous update to the last one
+    # @return the changed rectangles of the screen
+    def render(self, alpha):
+        return self.cutscenes.render(alpha)
+
+    ## whether the slide is shown still for a while
     #
     # @param self the object pointer
-    def do_actions(self):
-        # run the intro slideshow
-        self.cutscenes.run()
+    # @return true between the fades of a slide
+    def is_idle(self):
+        return self.cutscenes.is_idle()
 
     ## what should be satisfied for enabling the next scene
     #
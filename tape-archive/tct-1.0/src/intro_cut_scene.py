@@ -27,7 +27,7 @@
 
 
 try:
-    import constants, pygame, graphics
+    import constants, pygame, graphics, profiler
     from pygame.locals import *
     from os_utils import safe_exit
     from base import Base
@@ -46,11 +46,178 @@ except ImportError as err:
 ## objects imported when `from <module> import *' is used
 __all__ = ['IntroCutScene']
 
-SLIDE_CLOCK_TICK = 80
-SLIDE_ALPHA_FADE = 5
 MAX_ALPHA = 255
-SLIDE_PRESENCE_DELAY = 100
-SLIDE_MONAD_DELAY = 10
+
+## how long a slide fades in (and out) in seconds
+SLIDE_FADE_TIME = 0.65
+
+## how long a slide is shown between its fades in seconds
+SLIDE_PRESENCE_TIME = 10.0
+
+## the alpha levels of the precomputed fades
+FADE_LEVELS = 32
+
+## with fewer levels the fades look choppy (they are blended live)
+MIN_FADE_LEVELS = 8
+
+## the memory cap of the precomputed fade frames (in bytes)
+FADE_CACHE_BUDGET = 64 * 2**20
+
+## the profiled phases of a cut scene's frame
+CUT_SCENE_PHASES = ('events', 'update', 'next_slide')
+
+
+## the linear easing curve
+#
+# @param t the fraction of the fade done, from 0 to 1
+# @return the fraction of the fade to show, from 0 to 1
+def linear(t):
+    return t
+
+
+## the smooth (slow start, slow end) easing curve
+#
+# @param t the fraction of the fade done, from 0 to 1
+# @return the fraction of the fade to show, from 0 to 1
+def ease_in_out(t):
+    return t * t * (3.0 - 2.0 * t)
+
+
+## the easing curve of the slides' fades
+SLIDE_EASING = ease_in_out
+
+
+## the timeline of a slide: fade in, presence, fade out
+#
+# This class tells the alpha of the blank slide covering
+# a slide at any time since the slide started.
+class SlideTimeline(Base):
+    ## create a new timeline
+    #
+    # @param self the object pointer
+    # @param fade the duration of each fade in seconds
+    # @param presence the duration between the fades in seconds
+    # @param easing the easing curve of the fades
+    def __init__(self, fade=SLIDE_FADE_TIME, presence=SLIDE_PRESENCE_TIME,
+                 easing=SLIDE_EASING):
+        self.fade = fade
+        self.presence = presence
+        self.easing = easing
+
+        ## when the fade out starts
+        self.fade_out = fade + presence
+
+        ## the duration of the whole timeline
+        self.duration = self.fade_out + fade
+
+    ## the alpha of the blank slide at some time
+    #
+    # @param self the object pointer
+    # @param time the time since the slide started
+    # @return the alpha, from 0 to MAX_ALPHA
+    def alpha(self, time):
+        if time < self.fade:
+            shown = self.easing(time / self.fade)
+        elif time < self.fade_out:
+            shown = 1.0
+        else:
+            shown = 1.0 - self.easing(min((time - self.fade_out) / self.fade, 1.0))
+        return int(round(MAX_ALPHA * (1.0 - shown)))
+
+    ## whether the alpha changes soon after some time
+    #
+    # @param self the object pointer
+    # @param time the time since the slide started
+    # @param soon how far to look ahead in seconds
+    # @return false while the slide is shown still
+    def is_changing(self, time, soon):
+        return not (self.fade <= time and time + soon < self.fade_out)
+
+    ## the time to continue from to skip the rest of a slide
+    #
+    # @param self the object pointer
+    # @param time the time since the slide started
+    # @return the time where the fade out shows the same alpha
+    def skip(self, time):
+        if time < self.fade:
+            # fade out from where the fade in is (the curve is symmetric)
+            return self.fade_out + (self.fade - time)
+        return max(time, self.fade_out)
+
+
+## the precomputed fade frames of a slide
+#
+# This class blends a slide with the blank slide at some alpha
+# levels ahead of time, so that showing a step of a fade is a
+# single blit. Only the frames of one slide are kept, and only
+# if enough of them fit in the memory cap.
+class FadeFrames(Base):
+    ## create a new empty cache
+    #
+    # @param self the object pointer
+    # @param blank the blank slide the slides fade from and to
+    # @param budget the memory cap of the frames in bytes
+    # @param levels the number of alpha levels to precompute
+    def __init__(self, blank, budget=FADE_CACHE_BUDGET, levels=FADE_LEVELS):
+        self.blank = blank
+        self.budget = budget
+        self.levels = levels
+
+        ## the slide the frames are blended from
+        self.slide = None
+
+        ## the blended frames, from the slide to the blank slide
+        self.frames = []
+
+    ## precompute the fade frames of a slide (freeing the previous ones)
+    #
+    # @param self the object pointer
+    # @param slide the slide to fade
+    # @return false if they don't fit in the cap (blend them live)
+    def prepare(self, slide):
+        if slide is self.slide:
+            return bool(self.frames)
+
+        self.slide = slide
+        self.frames = []
+
+        # as many levels as the cap allows
+        frame_size = graphics.surface_size(self.blank)
+        levels = min(self.levels, self.budget // frame_size)
+        if levels < MIN_FADE_LEVELS:
+            return False
+
+        alphas = [int(round(MAX_ALPHA * i / (levels - 1.0)))
+                  for i in range(levels)]
+
+        self.frames = self._blend(slide, alphas)
+        return True
+
+    ## the precomputed frame nearest to an alpha
+    #
+    # @param self the object pointer
+    # @param alpha the alpha of the blank slide
+    # @return the frame's surface
+    def frame(self, alpha):
+        level = int(round(alpha * (len(self.frames) - 1.0) / MAX_ALPHA))
+        return self.frames[level]
+
+    ## blend the frames (blits of the blank slide at each alpha)
+    #
+    # @param self the object pointer
+    # @param slide the slide to fade
+    # @param alphas the alpha of each frame
+    # @return the frames
+    def _blend(self, slide, alphas):
+        blank = self.blank.copy()
+
+        frames = []
+        for alpha in alphas:
+            frame = slide.convert()
+            blank.set_alpha(alpha)
+            frame.blit(blank, (0, 0))
+            frames.append(frame)
+        return frames
 
 
 ## class of the intro cut scene controller
@@ -66,101 +233,127 @@ class IntroCutSceneController:
     # @param view the view part of MVC
     def __init__(self, manager, view):
         self.event_manager = manager
-        self.event_manager.register_listener(self)
+        self.event_manager.register_listener(self, ReturnEvent, EscapeEvent,
+                                             SafeExitEvent)
         self.gui_view = view
-        
-        ## create clock and track time
-        self.clock = pygame.time.Clock()
 
         ## flag to indicate if the scene is finished
         self.is_finished = False
 
-        # just to be aware that this is a member variable
-        self.time = -1
-
+        ## flag to indicate that no slide follows the current one
+        self.last_slide = False
 
-    ## run the slideshow
-    #
-    # @param self the object pointer
-    def run(self):
+        ## the fades and the presence of each slide
+        self.timeline = SlideTimeline()
 
-        # perform cutscene slides main process
-        for slide in self.gui_view.slides:
-            evt = None
+        ## the index of the current slide
+        self.slide = 0
 
-            ## set the slide presence delay 
-            self.time = SLIDE_PRESENCE_DELAY
+        ## the time since the current slide started
+        self.time = 0.0
 
-            # exit immediately if the user wants to
-            if self.is_finished:
-                return
+        ## the time before the last update (frames are drawn in between)
+        self.previous_time = 0.0
 
-            # while the alpha of the blank slide is not zero
-            while self.gui_view.alphavalue >= 0:
-                # set the blank slide alternation delay 
-                self.clock.tick(SLIDE_CLOCK_TICK)
+        ## the alpha the slide was last shown with
+        self.shown_alpha = None
 
-                # decrease alpha value
-                self.gui_view.alphavalue -= SLIDE_ALPHA_FADE
+        ## times the phases of the cut scene's frames
+        self.profiler = profiler.get_profiler('intro cut scene',
+                                              CUT_SCENE_PHASES)
 
-                # show the next slide
-                self.gui_view.next_slide(slide)
-
-            # show the slide for some time
-            while self.time >= 0:
-                # delay for each time monad
-                self.clock.tick(SLIDE_MONAD_DELAY)
-
-                # intro event loop
-                for e in pygame.event.get():
-                    if e.type == pygame.QUIT:
-                        evt = SafeExitEvent()
+    ## advance the slideshow by a time step
+    #
+    # @param self the object pointer
+    # @param dt the time step in seconds
+    def update(self, dt):
+        if self.is_finished:
+            return
 
-                # handle keyboard keys
-                key = pygame.key.get_pressed()
-                # the user wants to skip this slide
-                if key[K_RETURN] or key[K_SPACE]:
-                    evt = ReturnEvent()
-                # the user wants to skip the intro
-                elif key[K_ESCAPE]:
-                    evt = EscapeEvent()
-                # the user wants to exit the game
-                elif key[K_q]:
-                    evt = SafeExitEvent()
-                
-                # inform the event manager about the generated event
-                if evt:
-                    self.event_manager.post(evt)
+        self.previous_time = self.time
+        self.time += dt
 
-                # decrease the time where a slide is showed
-                self.time -= 1
+        # go to the next slide, if any, after this one faded out
+        if self.time >= self.timeline.duration:
+            self.slide += 1
+            self.time = self.previous_time = 0.0
+            self.shown_alpha = None
 
-            # while the alpha of the blank slide is not zero
-            while self.gui_view.alphavalue <= MAX_ALPHA:
-                # set the blank slide alternation delay 
-                self.clock.tick(SLIDE_CLOCK_TICK)
+            if self.last_slide or self.slide >= len(self.gui_view.slides):
+                # the scene is finished normally
+                self.is_finished = True
 
-                # decrease alpha value
-                self.gui_view.alphavalue += SLIDE_ALPHA_FADE
+        self.profiler.mark('update')
 
-                # show the next slide                
-                self.gui_view.next_slide(slide)
+    ## show the current slide, only if its alpha changed
+    #
+    # @param self the object pointer
+    # @param alpha how far from the previous update to the last one
+    # @return the changed rectangles of the screen
+    def render(self, alpha):
+        if self.is_finished:
+            return []
+
+        time = self.previous_time + (self.time - self.previous_time) * alpha
+        slide_alpha = self.timeline.alpha(time)
+        if slide_alpha == self.shown_alpha:
+            return []
+
+        self.gui_view.alphavalue = self.shown_alpha = slide_alpha
+        rects = self.gui_view.next_slide(self.gui_view.slides[self.slide])
+        self.profiler.mark('next_slide')
+        return rects
+
+    ## whether the slide is shown still for a while
+    #
+    # @param self the object pointer
+    # @return true between the fades of a slide
+    def is_idle(self):
+        return not self.timeline.is_changing(
+            self.time, 1.0 / constants.IDLE_FRAME_RATE)
 
-        # the scene is finished normally
-        self.is_finished = True
+    ## post the events of the keyboard and the window
+    #
+    # @param self the object pointer
+    # @param events the events of the frame
+    def handle_events(self, events):
+        evt = None
+
+        # intro event loop
+        for e in events:
+            if e.type == pygame.QUIT:
+                evt = SafeExitEvent()
+
+        # handle keyboard keys
+        key = pygame.key.get_pressed()
+        # the user wants to skip this slide
+        if key[K_RETURN] or key[K_SPACE]:
+            evt = ReturnEvent()
+        # the user wants to skip the intro
+        elif key[K_ESCAPE]:
+            evt = EscapeEvent()
+        # the user wants to exit the game
+        elif key[K_q]:
+            evt = SafeExitEvent()
+
+        # inform the event manager about the generated event
+        if evt:
+            self.event_manager.post(evt)
+
+        self.profiler.mark('events')
 
     ## handle the related events 
     #
     # @param self the object pointer
     # @param event the generated event
     def notify(self, event):
-        # go to the next slide
+        # go to the next slide (after fading out this one)
         if isinstance(event, ReturnEvent):
-            self.time = 0
-        # skip the intro
+            self.time = self.previous_time = self.timeline.skip(self.time)
+        # skip the intro (after fading out this slide)
         elif isinstance(event, EscapeEvent):
-            self.time = 0
-            self.is_finished = True
+            self.time = self.previous_time = self.timeline.skip(self.time)
+            self.last_slide = True
         # quit the game using safe exit
         elif isinstance(event, SafeExitEvent):
             safe_exit()
@@ -176,7 +369,8 @@ class IntroCutSceneGUIView(Base):
     # @param self the object pointer
     # @param manager the event manager
     # @param slides the list of slides images
-    def __init__(self, manager, slides):
+    # @param fade_cache whether to precompute the fades
+    def __init__(self, manager, slides, fade_cache=False):
         self.event_manager = manager
         self.event_manager.register_listener(self)
 
@@ -194,6 +388,9 @@ class IntroCutSceneGUIView(Base):
         ## set the alpha to maximum value
         self.alphavalue = MAX_ALPHA
 
+        ## the precomputed fade frames (None to blend them live)
+        self.fades = FadeFrames(self.blank) if fade_cache else None
+
     ## handle the related events 
     #
     # @param self the object pointer
@@ -205,7 +402,12 @@ class IntroCutSceneGUIView(Base):
     #
     # @param self the object pointer
     # @param slide the object to blit
+    # @return the changed rectangles of the screen
     def next_slide(self, slide):
+        # show the precomputed frame, if the fades fit in the cache
+        if self.fades and self.fades.prepare(slide):
+            return [self.screen.blit(self.fades.frame(self.alphavalue), (0, 0))]
+
         # set the new alpha value of the blank slide
         self.blank.set_alpha(self.alphavalue)
 
@@ -216,10 +418,7 @@ class IntroCutSceneGUIView(Base):
         bs = self.screen.blit(self.blank, (0, 0))
 
         # pass only the changes to update
-        up_l = (s, bs)
-
-        # display the screen surface
-        pygame.display.update(up_l)
+        return [s, bs]
 
 
 ## class for game's intro cut scene actions
@@ -230,16 +429,41 @@ class IntroCutScene(Base):
     #
     # @param self the object pointer
     # @param slides the list of slides images
-    def __init__(self, slides):
+    # @param fade_cache whether to precompute the fades
+    def __init__(self, slides, fade_cache=False):
         self.event_manager = EventManager()
-        self.gui_view = IntroCutSceneGUIView(self.event_manager, slides)
+        self.gui_view = IntroCutSceneGUIView(self.event_manager, slides,
+                                             fade_cache)
         self.controller = IntroCutSceneController(self.event_manager, self.gui_view)
 
-    ## run the slideshow
+    ## handle the events of a frame
+    #
+    # @param self the object pointer
+    # @param events the events of the frame
+    def handle_events(self, events):
+        self.controller.handle_events(events)
+
+    ## advance the slideshow by a time step
+    #
+    # @param self the object pointer
+    # @param dt the time step in seconds
+    def update(self, dt):
+        self.controller.update(dt)
+
+    ## show the current slide
+    #
+    # @param self the object pointer
+    # @param alpha how far from the previous update to the last one
+    # @return the changed rectangles of the screen
+    def render(self, alpha):
+        return self.controller.render(alpha)
+
+    ## whether the slide is shown still for a while
     #
     # @param self the object pointer
-    def run(self):
-        self.controller.run()
+    # @return true between the fades of a slide
+    def is_idle(self):
+        return self.controller.is_idle()
 
 # test the script if executed
 if __name__ == '__main__':
@@ -113,6 +113,12 @@ class KezMenu(Base):
         self.mouse_focus = None
         self._font = None
 
+        ## the rendered labels, (label, color, font, underline) -> surface
+        self._label_cache = {}
+
+        ## what the labels were placed for, see _layout()
+        self._layout_key = None
+
         ## set a default font and its size (also fix size)
         self.font = pygame.font.Font(None, FONT_SIZE)
         self._fix_size()
@@ -137,24 +143,24 @@ class KezMenu(Base):
         self.height = 0
         # for each option in the menu (set menu's width, height)
         for o in self.options:
-            text = o['label']
-            font = o['font']
-            ren = font.render(text, True, self.normal_color)
+            width = o['font'].size(o['label'])[0]
 
             # find the maximum label width and set the menu's width
-            if ren.get_width() > self.width:
-                self.width = ren.get_width()
+            if width > self.width:
+                self.width = width
 
             # add all labels' heights and set the menu's height
-            self.height += font.get_height()
+            self.height += o['font'].get_height()
 
-    ## blit the menu to a surface
+        # the labels must be placed again
+        self._layout_key = None
+
+    ## place the labels and the focus graphic of each option (called
+    ## when the font, the position or the screen offset is changed)
     #
     # @param self the object pointer
-    # @param surface the surface used
-    def draw(self, surface):
+    def _layout(self):
         offset = 0
-        i = 0
         ol, ot = self.screen_topleft_offset
         first = self.options and self.options[0]
         last = self.options and self.options[-1]
@@ -162,64 +168,89 @@ class KezMenu(Base):
             indent = o.get('padding_col', 0)
 
             # padding above the line
-            if o != first and o.get('padding_line', 0):
+            if o is not first and o.get('padding_line', 0):
                 offset += o['padding_line']
-            
-            font = o.get('font', self._font)
 
-            # if there is a highlight color use it
-            if i == self.option and self.focus_color:
-                clr = self.focus_color
-            else:
-                clr = self.normal_color
-
-            # get the label of the option
-            text = o['label']
-
-            # get the size of the first letter
-            letter_width, letter_height = font.size(text[0])
-
-            # render the options's label
-            ren = font.render(text, True, clr)
-
-            # lock the surface
-            surface.lock()
-
-            # draw line in correct coordinates in
-            # order to underline the first letter
-            pygame.draw.line(ren, clr, (0, letter_height-1),
-                                       (letter_width, letter_height-1))
-
-            # unlock the surface
-            surface.unlock()
+            font = o.get('font', self._font)
+            width, height = font.size(o['label'])
 
-            if ren.get_width() > self.width:
-                self.width = ren.get_width()
+            if width > self.width:
+                self.width = width
 
+            # where the label is drawn and where the mouse focuses it
+            o['label_pos'] = (self.x + indent, self.y + offset)
             o['label_rect'] = pygame.Rect(
-                (ol + self.x + indent, ot + self.y + offset),
-                (ren.get_width(), ren.get_height()))
-
-            surface.blit(ren, (self.x + indent, self.y + offset))
+                (ol + self.x + indent, ot + self.y + offset), (width, height))
 
             # divide the difference between the font and graphic height
             calc_space = abs((font.get_height() -
                               self.focus_graphic.get_height()) / 2.0)
 
-            # print the menu image on focused option (only if it's enabled)
-            if i == self.option and self.image_enabled:
-                surface.blit(self.focus_graphic,
-                             (abs(self.x - FOCUS_IMAGE_SPACE -
+            # where the menu image is drawn when the option is focused
+            o['focus_pos'] = (abs(self.x - FOCUS_IMAGE_SPACE -
                                   self.focus_graphic.get_width()),
-                              self.y + calc_space + offset))
+                              self.y + calc_space + offset)
 
             offset += font.get_height()
 
             # padding below the line
-            if o != last and o.get('padding_line', 0):
+            if o is not last and o.get('padding_line', 0):
                 offset += o['padding_line']
 
-            i += 1
+        self._layout_key = (self.x, self.y, self.screen_topleft_offset)
+
+    ## render a label with its first letter underlined (each
+    ## label is rendered once per font and color, then reused)
+    #
+    # @param self the object pointer
+    # @param text the label of the option
+    # @param font the font of the option
+    # @param color the color of the label
+    # @param underline whether to underline the first letter
+    # @return the rendered label
+    def _render_label(self, text, font, color, underline=True):
+        key = (text, tuple(color), font, underline)
+        ren = self._label_cache.get(key)
+        if ren is None:
+            # render the options's label
+            ren = font.render(text, True, color)
+
+            if underline:
+                # get the size of the first letter
+                letter_width, letter_height = font.size(text[0])
+
+                # draw line in correct coordinates in
+                # order to underline the first letter
+                pygame.draw.line(ren, color, (0, letter_height-1),
+                                             (letter_width, letter_height-1))
+
+            self._label_cache[key] = ren
+        return ren
+
+    ## blit the menu to a surface
+    #
+    # @param self the object pointer
+    # @param surface the surface used
+    def draw(self, surface):
+        # place the labels again if the menu has been moved
+        if self._layout_key != (self.x, self.y, self.screen_topleft_offset):
+            self._layout()
+
+        for i, o in enumerate(self.options):
+            font = o.get('font', self._font)
+
+            # if there is a highlight color use it
+            if i == self.option and self.focus_color:
+                clr = self.focus_color
+            else:
+                clr = self.normal_color
+
+            surface.blit(self._render_label(o['label'], font, clr),
+                         o['label_pos'])
+
+            # print the menu image on focused option (only if it's enabled)
+            if i == self.option and self.image_enabled:
+                surface.blit(self.focus_graphic, o['focus_pos'])
 
     ## update the menu and get input for the menu
     #
@@ -347,6 +378,8 @@ class KezMenu(Base):
     # @param self the object pointer
     # @param font the preloaded font
     def _set_font(self, font):
+        if font is not self._font:
+            self._label_cache.clear()
         self._font = font
         for o in self.options:
             o['font'] = font
@@ -357,6 +390,8 @@ class KezMenu(Base):
     # @param self the object pointer
     # @param color the color on focused options
     def set_highlight_color(self, color):
+        if color != self.focus_color:
+            self._label_cache.clear()
         self.focus_color = color
 
     ## set the normal color of the menu options
@@ -364,6 +399,8 @@ class KezMenu(Base):
     # @param self the object pointer
     # @param color the color on normal options
     def set_normal_color(self, color):
+        if color != self.normal_color:
+            self._label_cache.clear()
         self.normal_color = color
 
     ## center the menu at x, y
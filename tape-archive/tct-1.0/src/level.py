@@ -21,8 +21,9 @@
 
 
 try:
-    import constants
+    import constants, pygame
     from base import Base
+    from spatial import create_index
     from fsm import FSM, State
     from os_utils import safe_exit
 except ImportError as err:
@@ -104,25 +105,87 @@ class LevelOneFactory(State):
     def create_room(self, name):
         return Room(name)
 
-    def create_door(self, colour):
-        return Door(colour)
+    def create_door(self, colour, rect=None):
+        return Door(colour, rect)
 
     ## what to do when the level is enabled
     #
     # @param self the object pointer
-    def do_actions(self):
+    # @param dt the time step in seconds
+    def update(self, dt):
         safe_exit()
 
 
-class MapSite: pass
+## something placed in a room (a door, an item, an obstacle)
+#
+class MapSite(Base):
+    ## place the site
+    #
+    # @param self the object pointer
+    # @param rect the site's rectangle in the room (nowhere if None)
+    def __init__(self, rect=None):
+        self.rect = pygame.Rect(rect or (0, 0, 0, 0))
 
 class Room(State):
-    def __init__(self, name):
+    ## create an empty room
+    #
+    # @param self the object pointer
+    # @param name the room's name
+    # @param bounds the room's rectangle
+    # @param uneven whether the sites crowd in parts of the room
+    def __init__(self, name, bounds=None, uneven=False):
         self.name = name
 
         # initialize the state
         State.__init__(self, self.name)
 
+        ## the room's rectangle
+        self.bounds = pygame.Rect(bounds or (0, 0, constants.SCREEN_WIDTH,
+                                             constants.SCREEN_HEIGHT))
+
+        ## the sites of the room, indexed by their rectangles
+        self.sites = create_index(self.bounds, uneven)
+
+    ## put a site in the room (on top of the others)
+    #
+    # @param self the object pointer
+    # @param site the MapSite to add
+    def add_site(self, site):
+        self.sites.insert(site, site.rect)
+
+    ## take a site out of the room
+    #
+    # @param self the object pointer
+    # @param site the MapSite to remove
+    def remove_site(self, site):
+        self.sites.remove(site)
+
+    ## move a site within the room
+    #
+    # @param self the object pointer
+    # @param site the MapSite to move
+    # @param pos the site's new top-left position
+    def move_site(self, site, pos):
+        site.rect.topleft = pos
+        self.sites.move(site, site.rect)
+
+    ## find the site under the mouse
+    #
+    # @param self the object pointer
+    # @param pos the mouse position
+    # @return the topmost site at the position, None if there is none
+    def pick(self, pos):
+        sites = self.sites.query_point(pos)
+        return sites[-1] if sites else None
+
+    ## find the sites a rectangle collides with
+    #
+    # @param self the object pointer
+    # @param rect the rectangle (a moving character, etc)
+    # @return the sites overlapping the rectangle, bottom to top
+    def collide(self, rect):
+        return self.sites.query_rect(rect)
+
     def do_actions(self):
         print('Your are in the', str(self))
 
@@ -133,7 +196,8 @@ class Room(State):
         print('entering', str(self))
 
 class Door(MapSite):
-    def __init__(self, colour):
+    def __init__(self, colour, rect=None):
+        MapSite.__init__(self, rect)
         self.colour = colour
         self.open = False
 
@@ -141,7 +205,8 @@ class Door(MapSite):
         print('opening door')
 
 class Item(MapSite):
-    def __init__(self, name):
+    def __init__(self, name, rect=None):
+        MapSite.__init__(self, rect)
         self.name = name
 
     def __str__(self):
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+
+#    Levelled Background Logger.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Levelled Background Logger.
+
+This module logs the game's messages without stalling a frame on
+the terminal. Logging a message only appends it, unformatted, to
+a ring buffer; a background thread formats and writes the buffered
+messages a few times per second, and once more when the game exits.
+
+The functions of the disabled levels do nothing, so a message below
+the level costs a call. Arguments are formatted (with str.format)
+only when written:
+
+    logger.info('{0}: image cache peak {1} KiB', name, peak)
+
+Errors and warnings are always logged; `-v' adds the informative
+messages and `-vv' the debugging ones.
+'''
+
+try:
+    import atexit, sys, threading
+    from collections import deque
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['configure', 'set_level', 'verbosity_level', 'flush',
+           'debug', 'info', 'warning', 'error',
+           'DEBUG', 'INFO', 'WARNING', 'ERROR']
+
+# the levels, from the most verbose
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning',
+               ERROR: 'error'}
+
+# the level of each -v option, from none
+VERBOSITY_LEVELS = (WARNING, INFO, DEBUG)
+
+# how many messages are kept until they are written (older
+# messages are dropped if the writer falls behind)
+RING_CAPACITY = 4096
+
+# how often the writer thread writes the buffered messages (in seconds)
+WRITE_INTERVAL = 0.1
+
+# the lowest level logged
+level = WARNING
+
+# the messages waiting to be written, (level, message, arguments);
+# appending to (and popping from) a deque needs no lock
+_records = deque(maxlen=RING_CAPACITY)
+
+# where the messages are written (None for the standard output)
+_stream = None
+
+# the background thread writing the messages, started on demand
+_writer = None
+
+# serializes the writing (never the logging) of the messages
+_write_lock = threading.Lock()
+
+# the number of messages dropped because the buffer was full
+dropped = 0
+
+
+class LogWriter(threading.Thread):
+    '''Writes the buffered messages periodically.'''
+
+    def __init__(self):
+        threading.Thread.__init__(self, name='log writer')
+        # never keep the game running
+        self.daemon = True
+
+    def run(self):
+        while True:
+            _stopping.wait(WRITE_INTERVAL)
+            _write_records()
+            if _stopping.is_set():
+                return
+
+
+# set when the game exits
+_stopping = threading.Event()
+
+
+def _write_records():
+    '''Format and write the buffered messages.'''
+    global dropped
+
+    with _write_lock:
+        lines = []
+        while True:
+            try:
+                record_level, message, args = _records.popleft()
+            except IndexError:
+                break
+            if args:
+                message = message.format(*args)
+            lines.append('{0}: {1}'.format(LEVEL_NAMES[record_level], message))
+
+        if dropped:
+            lines.append('{0}: {1} messages dropped'.format(
+                LEVEL_NAMES[WARNING], dropped))
+            dropped = 0
+
+        if lines:
+            stream = _stream or sys.stdout
+            stream.write('\n'.join(lines) + '\n')
+            stream.flush()
+
+
+def _start_writer():
+    '''Start the writer thread (and flush the log on exit).'''
+    global _writer
+
+    _writer = LogWriter()
+    _writer.start()
+    atexit.register(_shutdown)
+
+
+def _shutdown():
+    '''Stop the writer thread and write what is left.'''
+    _stopping.set()
+    if _writer is not None:
+        _writer.join()
+    _write_records()
+
+
+def _log_at(record_level):
+    '''Return a function logging messages at a level.'''
+    def log(message, *args):
+        global dropped
+
+        if len(_records) == _records.maxlen:
+            dropped += 1
+        _records.append((record_level, message, args))
+
+        if _writer is None:
+            _start_writer()
+    return log
+
+
+def _ignore(message, *args):
+    '''What the functions of the disabled levels do.'''
+
+
+_log_debug = _log_at(DEBUG)
+_log_info = _log_at(INFO)
+_log_warning = _log_at(WARNING)
+_log_error = _log_at(ERROR)
+
+# the logging functions (set_level replaces the disabled ones)
+debug = info = _ignore
+warning = _log_warning
+error = _log_error
+
+
+def set_level(new_level):
+    '''Log only the messages of a level and above.
+
+    Arguments:
+    new_level -- DEBUG, INFO, WARNING or ERROR
+    '''
+    global level, debug, info, warning, error
+
+    level = new_level
+    debug = _log_debug if DEBUG >= level else _ignore
+    info = _log_info if INFO >= level else _ignore
+    warning = _log_warning if WARNING >= level else _ignore
+    error = _log_error
+
+
+def verbosity_level(verbose):
+    '''Return the level of a number of -v options.'''
+    return VERBOSITY_LEVELS[min(int(verbose or 0), len(VERBOSITY_LEVELS) - 1)]
+
+
+def configure(new_level=WARNING, stream=None, capacity=RING_CAPACITY):
+    '''Set up the log (before anything is logged).
+
+    Arguments:
+    new_level -- the lowest level logged
+    stream -- where the messages are written (the standard output)
+    capacity -- how many messages are kept until they are written
+    '''
+    global _stream, _records
+
+    _stream = stream
+    if capacity != _records.maxlen:
+        _records = deque(_records, maxlen=capacity)
+    set_level(new_level)
+
+
+def flush():
+    '''Write the buffered messages now.'''
+    _write_records()
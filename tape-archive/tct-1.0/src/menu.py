@@ -28,11 +28,12 @@
 
 
 try:
-    import constants, os, pygame, sound_mixer, graphics
+    import constants, logger, os, pygame, profiler, sound_mixer, graphics
     from os_utils import file_path, safe_exit
-    from utils import get_time_sec
     from anim_sprite import *
+    from sprite_batch import *
     from credits import Credits
+    from compositor import *
     from kezmenu import KezMenu
     from fsm import State
 except ImportError as err:
@@ -66,14 +67,23 @@ ANIM_SPRITE_SPEED = 200.0
 ## animated sprite alpha (on settings)
 ANIM_SPRITE_ALPHA = 80.0
 
+## the menu graphics, packed into one texture atlas
+MENU_ATLAS_FILES = [filename
+                    for group in constants.FILES['graphics']['menu'].values()
+                    for files in group.values()
+                    for filename in files]
+
 MAIN_FONT_SIZE = 32
 MENU_FONT_SIZE = 25
 MAIN_FOCUS_COLOR = pygame.Color('brown')
 SETTINGS_FOCUS_COLOR = pygame.Color('orange')
-MENU_CLOCK_TICK = 50
 SOUND_VOL = 0.2
 MAX_ALPHA = 255
 
+## the profiled phases of a main menu's frame (see also the
+#  compositor's phases)
+MENU_PHASES = ('events', 'interpolate') + COMPOSITOR_PHASES
+
 ## class for game's menu screen
 #
 class Menu(State):
@@ -98,9 +108,19 @@ class Menu(State):
         ## flag to control the main menu's loop
         self.menu_main_running = True
 
+        ## the credits screen while it is shown, None otherwise
+        self.credits = None
+
+        ## times the phases of the menu's frames
+        self.profiler = profiler.get_profiler(self.name, MENU_PHASES)
+
         # enable key repeat for the menu
         pygame.key.set_repeat(MENU_KEY_DEL, MENU_KEY_INT)
 
+        # the graphics loaded below (and by the menus and
+        # the sprites) are subsurfaces of a single atlas
+        graphics.build_atlas(constants.MENU_DIR, MENU_ATLAS_FILES)
+
         ## set the main menu's background
         self.menu_main_bg = graphics.load_image(
             constants.FILES['graphics']['menu']['main']['bg'][0])[0]
@@ -163,88 +183,183 @@ class Menu(State):
         # set the settings menu's highlight color
         self.menu_settings.set_highlight_color(SETTINGS_FOCUS_COLOR)
 
-        ## the animated sprite group
-        self.anim_sprites = pygame.sprite.RenderUpdates()
+        ## the animated sprites (moving down and right)
+        self.anim_sprites = SpriteBatch(self.screen.get_rect())
 
-        # create the animated sprites 
-        sprite_num = len(constants.FILES['graphics']['menu']['share']['anim'])
+        # create the animated sprites (the "right" type of each
+        # one, using the factory)
         sprite_fact = SpriteFactory()
-        for i in range(sprite_num):
-            # create the "right" type of animated sprite using the factory
-            r_sprite = sprite_fact.create_anim_sprite(i, constants.FILES['graphics']['menu']
-                                                      ['share']['anim'][i], ANIM_SPRITE_SPEED)
-            self.anim_sprites.add(r_sprite)
-
-        ## create clock and track time
-        self.clock = pygame.time.Clock()
+        for i, filename in enumerate(constants.FILES['graphics']['menu']['share']['anim']):
+            sprite_fact.add_anim_sprite(self.anim_sprites, i, filename,
+                                        ANIM_SPRITE_SPEED)
+
+        ## the main menu (the settings menu is drawn over it)
+        self.menu_main_sprite = MenuSprite(self.menu_main)
+
+        # the sprites shared by both menus' scenes
+        cursor_sprite = CursorSprite(self.mouse_cursor)
+        frame_sprite = StaticSprite(self.window_frame)
+
+        ## the main menu's scene (redraws only what changed)
+        self.main_scene = Compositor(self.screen, self.menu_main_bg,
+                                     self.anim_sprites, self.profiler)
+        self.main_scene.add(self.menu_main_sprite, 0)
+        self.main_scene.add(cursor_sprite, 1)
+        self.main_scene.add(frame_sprite, 2)
+
+        ## the settings menu's scene, over a dimmed main menu (the
+        #  main menu is part of its background, see _settings_option)
+        self.settings_scene = Compositor(self.screen, self.menu_settings_bg,
+                                         self.anim_sprites, self.profiler)
+        self.settings_scene.add(StaticSprite(self.menu_box_bg, (
+                    (constants.SCREEN_WIDTH - self.menu_box_bg.get_width()) / 2.0,
+                    (constants.SCREEN_HEIGHT - self.menu_box_bg.get_height()) / 2.0)), 0)
+        self.settings_scene.add(MenuSprite(self.menu_settings), 1)
+        self.settings_scene.add(cursor_sprite, 2)
+        self.settings_scene.add(frame_sprite, 3)
 
 
     ## what to do when the main menu is enabled
     #
     # @param self the object pointer
-    def do_actions(self):
+    def entry_actions(self):
+        # the screen was drawn by another scene
+        self.main_scene.repaint()
 
-        # display & update screen, get all the events
-        while self.menu_main_running:
-
-            # draw the background
-            bg = self.screen.blit(self.menu_main_bg, (0, 0))
-
-            # count time passed in seconds
-            time_passed_seconds = get_time_sec(self.clock.tick(MENU_CLOCK_TICK))
-
-            # animate the sprites
-            self.anim_sprites.update(time_passed_seconds)
-
-            # rectlist = self.anim_sprites.draw(self.screen)
-            self.anim_sprites.draw(self.screen)
+    ## the scene of the menu shown (main or settings)
+    #
+    # @param self the object pointer
+    # @return the compositor of the scene
+    def _active_scene(self):
+        if self.menu_settings_running:
+            return self.settings_scene
+        return self.main_scene
 
-            # draw the main menu
-            self.menu_main.draw(self.screen)
+    ## the profiler of what is shown (the menu or the credits)
+    #
+    # @param self the object pointer
+    # @return the profiler timing the next frame
+    def get_profiler(self):
+        if self.credits:
+            return self.credits.profiler
+        return self.profiler
 
-            # draw the custom mouse cursor
-            graphics.handle_mouse_cursor(self.mouse_cursor, self.screen)
+    ## handle the events of the menu shown (or of the credits)
+    #
+    # @param self the object pointer
+    # @param events the events of the frame
+    def handle_events(self, events):
+        if self.credits:
+            self.credits.handle_events(events)
+            if not self.credits.credits_running:
+                self._credits_finished()
+        elif self.menu_settings_running:
+            self._handle_settings_events(events)
+            self.profiler.mark('events')
+        else:
+            self._handle_main_events(events)
+            self.profiler.mark('events')
 
-            # draw the frame of the window
-            fr = self.screen.blit(self.window_frame, (0, 0))
+    ## animate the sprites, follow the mouse and the menu's focus
+    #
+    # @param self the object pointer
+    # @param dt the time step in seconds
+    def update(self, dt):
+        if self.credits:
+            self.credits.update(dt)
+        else:
+            self._active_scene().update(dt)
 
-            need_update = (bg, fr)
+    ## redraw only the changed regions of the screen
+    #
+    # @param self the object pointer
+    # @param alpha how far from the previous update to the last one
+    # @return the changed rectangles of the screen
+    def render(self, alpha):
+        if self.credits:
+            return self.credits.render(alpha)
 
-            # display the screen surface
-            pygame.display.update(need_update)
-            
-            # get all the events
-            events = pygame.event.get()
+        self.anim_sprites.interpolate(alpha)
+        self.profiler.mark('interpolate')
 
-            # ......... and update the main menu
-            # which needs access to those events
-            self.menu_main.update(events)
+        return self._active_scene().draw()
 
-            # main menu event loop
-            for e in events:
-                # quit when the close button is pressed
-                if e.type == pygame.QUIT:
+    ## handle the events of the main menu
+    #
+    # @param self the object pointer
+    # @param events the events of the frame
+    def _handle_main_events(self, events):
+        # update the main menu
+        # which needs access to those events
+        self.menu_main.update(events)
+
+        # main menu event loop
+        for e in events:
+            # the rest of the events are for the settings or the credits
+            if self.menu_settings_running or self.credits:
+                break
+            # quit when the close button is pressed
+            if e.type == pygame.QUIT:
+                self._quit_option()
+            # handle keyboard keys
+            elif e.type == pygame.KEYDOWN:
+                # play the sound if there was a menu key shortcut
+                if self.game_opts.sound:
+                    if e.key in (pygame.K_p, pygame.K_s, pygame.K_c):
+                        sound_mixer.play_sound(
+                            self.select_option_snd, SOUND_VOL)
+
+                # when user presses escape or 'q'uit key
+                if e.key in (pygame.K_ESCAPE, pygame.K_q):
                     self._quit_option()
-                # handle keyboard keys
-                elif e.type == pygame.KEYDOWN:
-                    # play the sound if there was a menu key shortcut
-                    if self.game_opts.sound:
-                        if e.key in (pygame.K_p, pygame.K_s, pygame.K_c):
-                            sound_mixer.play_sound(
-                                self.select_option_snd, SOUND_VOL)
-
-                    # when user presses escape or 'q'uit key
-                    if e.key in (pygame.K_ESCAPE, pygame.K_q):
-                        self._quit_option()
-                    # when user presses 'p'lay key
-                    elif e.key == pygame.K_p:
-                        self._play_option()
-                    # when user presses 's'ettings key
-                    elif e.key == pygame.K_s:
-                        self._settings_option()
-                    # when user presses 'c'redits key
-                    elif e.key == pygame.K_c:
-                        self._credits_option()
+                # when user presses 'p'lay key
+                elif e.key == pygame.K_p:
+                    self._play_option()
+                # when user presses 's'ettings key
+                elif e.key == pygame.K_s:
+                    self._settings_option()
+                # when user presses 'c'redits key
+                elif e.key == pygame.K_c:
+                    self._credits_option()
+
+    ## handle the events of the settings menu
+    #
+    # @param self the object pointer
+    # @param events the events of the frame
+    def _handle_settings_events(self, events):
+        # update the settings menu
+        # which needs access to those events
+        self.menu_settings.update(events)
+
+        # settings menu event loop
+        for e in events:
+            # quit when the close button is pressed
+            if e.type == pygame.QUIT:
+                self._back_option()
+                self._quit_option()
+            # handle keyboard keys
+            elif e.type == pygame.KEYDOWN:
+                # play the sound if there was a menu key shortcut
+                if self.game_opts.sound:
+                    if e.key in (pygame.K_f, pygame.K_s, pygame.K_m,
+                                 pygame.K_b, pygame.K_ESCAPE):
+                        sound_mixer.play_sound(
+                            self.select_option_snd, SOUND_VOL)
+
+                # when user presses escape key or 'b'ack key
+                if e.key in (pygame.K_ESCAPE, pygame.K_b):
+                    self._back_option()
+                    # the rest of the events are for the main menu
+                    break
+                # when user presses 'f'ullscreen key
+                elif e.key == pygame.K_f:
+                    self._toggle_fullscreen_option()
+                # when user presses 's'ounds key
+                elif e.key == pygame.K_s:
+                    self._toggle_sounds_option()
+                # when user presses 'm'usic key
+                elif e.key == pygame.K_m:
+                    self._toggle_music_option()
 
     ## entry point for main menu's settings option
     #
@@ -255,88 +370,20 @@ class Menu(State):
         self.menu_settings_running = True
 
         # decrease the alpha of animated sprites
-        for s in self.anim_sprites:
-            s.image.set_alpha(ANIM_SPRITE_ALPHA)
-
-        # display & update screen, get all the events
-        while self.menu_settings_running:
-            # draw the background
-            bg = self.screen.blit(self.menu_settings_bg, (0, 0))
-
-            # draw the main menu
-            self.menu_main.draw(self.screen)
-
-            # count time passed in seconds
-            time_passed_seconds = get_time_sec(self.clock.tick(MENU_CLOCK_TICK))
-
-            # animate the sprites
-            self.anim_sprites.update(time_passed_seconds)
-            self.anim_sprites.draw(self.screen)
-            
-            # draw settings menu background box
-            menu_bg = self.screen.blit(self.menu_box_bg, (
-                    (constants.SCREEN_WIDTH - self.menu_box_bg.get_width()) / 2.0,
-                    (constants.SCREEN_HEIGHT - self.menu_box_bg.get_height()) / 2.0))
-
-            # draw the settings menu
-            self.menu_settings.draw(self.screen)
-
-            # draw the custom mouse cursor
-            graphics.handle_mouse_cursor(self.mouse_cursor, self.screen)
+        self.anim_sprites.set_alpha(ANIM_SPRITE_ALPHA)
 
-            # draw the frame of the window
-            fr = self.screen.blit(self.window_frame, (0, 0))
-
-            need_update = (bg, menu_bg, fr)
-
-            # display the screen surface
-            pygame.display.update(need_update)
-
-            # get all the events
-            events = pygame.event.get()
-
-            # ..... and update the settings menu
-            # which needs access to those events
-            self.menu_settings.update(events)
-
-            # settings menu event loop
-            for e in events:
-                # quit when the close button is pressed
-                if e.type == pygame.QUIT:
-                    self._back_option()
-                    self._quit_option()
-                # handle keyboard keys
-                elif e.type == pygame.KEYDOWN:
-                    # play the sound if there was a menu key shortcut
-                    if self.game_opts.sound:
-                        if e.key in (pygame.K_f, pygame.K_s, pygame.K_m,
-                                     pygame.K_b, pygame.K_ESCAPE):
-                            sound_mixer.play_sound(
-                                self.select_option_snd, SOUND_VOL)
-
-                    # when user presses escape key or 'b'ack key
-                    if e.key in (pygame.K_ESCAPE, pygame.K_b):
-                        self._back_option()
-                    # when user presses 'f'ullscreen key
-                    elif e.key == pygame.K_f:
-                        self._toggle_fullscreen_option()
-                    # when user presses 's'ounds key
-                    elif e.key == pygame.K_s:
-                        self._toggle_sounds_option()
-                    # when user presses 'm'usic key
-                    elif e.key == pygame.K_m:
-                        self._toggle_music_option()
-
-        # restore the alpha of the animated sprites
-        for s in self.anim_sprites:
-            s.image.set_alpha(MAX_ALPHA)
+        # the settings menu is drawn over the main one, under
+        # the animated sprites (setting the background repaints)
+        background = self.menu_settings_bg.copy()
+        self.menu_main_sprite.update()
+        background.blit(self.menu_main_sprite.image, self.menu_main_sprite.rect)
+        self.settings_scene.set_background(background)
 
     ## entry point for main menu's new game option
     #
     # @param self the object pointer
     def _play_option(self):
-        if self.game_opts.verbose:
-            print('Start a new game.')
+        logger.info('Start a new game.')
         self.menu_main_running = False
 
 
@@ -364,31 +411,32 @@ class Menu(State):
 
         # if credits text file exists and is readable
         if os.access(fullname, os.F_OK) and os.access(fullname, os.R_OK):
-            if self.game_opts.verbose:
-                print('Go to the credits screen.')
-
-            # create the credits screen
-            c = Credits(self.screen,
-                        self.game_opts,
-                        self.window_frame,
-                        self.menu_settings_bg,
-                        self.select_option_snd,
-                        fullname)
-
-            # run the credits screen
-            if not c.run():
-                # quit if the close button is
-                # pressed (inside the credits)
-                self._quit_option()
+            logger.info('Go to the credits screen.')
+
+            # create the credits screen (shown until the user leaves)
+            self.credits = Credits(self.screen,
+                                   self.game_opts,
+                                   self.window_frame,
+                                   self.menu_settings_bg,
+                                   self.select_option_snd,
+                                   fullname)
         else:
-            print((' '.join(("Couldn't read text file:", fullname))))
+            logger.error("Couldn't read text file: {0}", fullname)
+
+    ## return from the credits screen to the main menu
+    #
+    # @param self the object pointer
+    def _credits_finished(self):
+        self.credits = None
+
+        # the main menu is drawn again over the credits
+        self.main_scene.repaint()
 
     ## entry point for main menu's quit option
     #
     # @param self the object pointer
     def _quit_option(self):
-        if self.game_opts.verbose:
-            print('Exit the game!')
+        logger.info('Exit the game!')
 
         # perform safe exit
         safe_exit()
@@ -399,8 +447,7 @@ class Menu(State):
     def _toggle_fullscreen_option(self):
         self.game_opts.fullscreen = not self.game_opts.fullscreen
 
-        if self.game_opts.verbose:
-            print('Toggle fullscreen!')
+        logger.info('Toggle fullscreen!')
 
         # store the position of the mouse cursor
         mouse_position = pygame.mouse.get_pos()
@@ -413,20 +460,21 @@ class Menu(State):
         # update the mouse cursor position
         pygame.mouse.set_pos(mouse_position)
 
+        # the new display mode starts with a blank screen
+        self.settings_scene.repaint()
+
     ## entry point for settings menu's toggle sounds option
     #
     # @param self the object pointer
     def _toggle_sounds_option(self):
         self.game_opts.sound = not self.game_opts.sound
-        if self.game_opts.verbose:
-            print('Toggle sounds!')
+        logger.info('Toggle sounds!')
 
     ## entry point for settings menu's toggle music option
     #
     # @param self the object pointer
     def _toggle_music_option(self):
-        if self.game_opts.verbose:
-            print('Toggle music!')
+        logger.info('Toggle music!')
 
         self.game_opts.music = not self.game_opts.music
         if self.game_opts.music:
@@ -439,5 +487,10 @@ class Menu(State):
     # @param self the object pointer
     def _back_option(self):
         self.menu_settings_running = False
-        if self.game_opts.verbose:
-            print('Go back to main menu!')
+        logger.info('Go back to main menu!')
+
+        # restore the alpha of the animated sprites
+        self.anim_sprites.set_alpha(MAX_ALPHA)
+
+        # the main menu is drawn again over the settings one
+        self.main_scene.repaint()
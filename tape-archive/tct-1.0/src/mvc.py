@@ -27,10 +27,11 @@
 # pattern
 
 try:
-    import pygame
+    import logger, pygame
     from pygame.locals import *
     from base import Base
-    from weakref import WeakKeyDictionary
+    from collections import deque
+    from weakref import WeakKeyDictionary, ref
 except ImportError as err:
     try:
         import os
@@ -45,13 +46,14 @@ except ImportError as err:
 ## class of a generic event
 #
 # This is a superclass for any events that might be 
-# generated by an object and sent to the EventManager
+# generated by an object and sent to the EventManager.
+# Events keep their attributes in slots, and their name
+# is an attribute of their class.
 class Event(Base):
-    ## create a new event
-    #
-    # @param self the object pointer
-    def __init__(self):
-        self.name = 'Generic Event'
+    __slots__ = ()
+
+    ## the event's name
+    name = 'Generic Event'
 
     ## the string representation of the event
     #
@@ -60,100 +62,159 @@ class Event(Base):
     def __str__(self):
         return self.name
 
+## class of events without a payload
+#
+# All the events of such a type are the same, so creating one
+# returns a single shared instance (a flyweight) instead of
+# allocating a new object each time.
+class FlyweightEvent(Event):
+    __slots__ = ()
+
+    ## return the shared instance of the event's type
+    #
+    # @param cls the event's type
+    # @return the instance (created only the first time)
+    def __new__(cls):
+        instance = cls.__dict__.get('_instance')
+        if instance is None:
+            instance = Event.__new__(cls)
+            # a class attribute (the instances have no dictionary)
+            cls._instance = instance
+        return instance
+
 ## class of tick-related events
 #
 # A tick event is an event that is generated periodically.
 # Tick events are not used for tracking time (using a clock).
-class TickEvent(Event):
-    ## create a new tick event
-    #
-    # @param self the object pointer
-    def __init__(self):
-        self.name = 'CPU Tick Event'
+class TickEvent(FlyweightEvent):
+    __slots__ = ()
+    name = 'CPU Tick Event'
 
 ## class of quit-related events
 #
 # A quit event is generated whenever we must exit the game.
-class QuitEvent(Event):
-    ## create a new quit event
-    #
-    # @param self the object pointer
-    def __init__(self):
-        self.name = 'Program Quit Event'
+class QuitEvent(FlyweightEvent):
+    __slots__ = ()
+    name = 'Program Quit Event'
 
 ## class of escape-related events
 #
 # An escape event can be used for skipping a whole section, for
 # example an introductory section of the game.
-class EscapeEvent(Event):
-    ## create a new escape event
-    #
-    # @param self the object pointer
-    def __init__(self):
-        self.name = 'Escape Event'
+class EscapeEvent(FlyweightEvent):
+    __slots__ = ()
+    name = 'Escape Event'
 
 ## class of return-related events
 #
 # A return event can be used for skipping a single item, for
 # example a slide of a slideshow.
-class ReturnEvent(Event):
-    ## create a new return event
-    #
-    # @param self the object pointer
-    def __init__(self):
-        self.name = 'Return Event'
+class ReturnEvent(FlyweightEvent):
+    __slots__ = ()
+    name = 'Return Event'
 
 ## class of safe exit related events
 #
 # A safe exit event is generated whenever we must execute safe_exit
-class SafeExitEvent(Event):
-    ## create a new quit event
-    #
-    # @param self the object pointer
-    def __init__(self):
-        self.name = 'Safe Exit Event'
+class SafeExitEvent(FlyweightEvent):
+    __slots__ = ()
+    name = 'Safe Exit Event'
 
 
 ## class of an event manager
 #
 # This class is responsible for coordinating the communication 
-# between the Model, the View, and the Controller.
+# between the Model, the View, and the Controller. Listeners
+# subscribe to the event types they are interested in, and
+# an event is passed only to the listeners subscribed to its
+# type or to one of its base types.
 class EventManager(Base):
     ## create a new event manager
     #
     # @param self the object pointer
     def __init__(self):
+        ## listener -> the event types it is subscribed to
         self.listeners = WeakKeyDictionary()
-        self.eventQueue = []
+
+        ## event type -> (weak references to) the interested
+        ## listeners, rebuilt after the subscriptions change
+        self.dispatch_table = {}
+
+        ## the events deferred until the next dispatch_queued()
+        self.eventQueue = deque()
 
     ## add a new listener
     #
     # @param self the object pointer
     # @param listener the name of the listener
-    def register_listener(self, listener):
-        self.listeners[listener] = True
+    # @param event_types the types of the events to pass to the
+    # listener (all the events if none are given)
+    def register_listener(self, listener, *event_types):
+        self.listeners[listener] = event_types or (Event,)
+        self.dispatch_table.clear()
 
     ## remove a listener
     #
     # @param self the object pointer
     # @param listener the name of the listener
     def unregister_listener(self, listener):
-        if listener in self.listeners.keys():
+        if listener in self.listeners:
             del self.listeners[listener]
+            self.dispatch_table.clear()
+
+    ## the listeners interested in a type of events
+    #
+    # @param self the object pointer
+    # @param event_type the type of the events
+    # @return weak references to the listeners, in registration order
+    def _interested(self, event_type):
+        refs = self.dispatch_table.get(event_type)
+        if refs is None:
+            # a listener is interested in the events of the
+            # types it subscribed to and of their subtypes
+            refs = self.dispatch_table[event_type] = [
+                ref(listener, self._listener_died)
+                for listener, types in self.listeners.items()
+                if issubclass(event_type, types)]
+        return refs
+
+    ## forget the lookup tables when a listener is garbage collected
+    #
+    # @param self the object pointer
+    # @param listener_ref the dead weak reference
+    def _listener_died(self, listener_ref):
+        self.dispatch_table.clear()
 
     ## notify the related listener about the generated event
     #
     # @param self the object pointer
     # @param event the event to notify
     def post(self, event):
-        # uncomment to help debugging
-        if not isinstance(event, TickEvent):
-            print(event)
+        # trace the events (but the ticks) when debugging
+        if logger.level <= logger.DEBUG and not isinstance(event, TickEvent):
+            logger.debug('{0}', event)
 
-        # if the weakref has died, it will be automatically
-        # removed, so we do not need to worry about it
-        for listener in self.listeners.keys():
-            listener.notify(event)
+        # if the weakref has died, the lookup tables are rebuilt
+        # on the next post, so we do not need to worry about it
+        for listener_ref in self._interested(type(event)):
+            listener = listener_ref()
+            if listener is not None:
+                listener.notify(event)
+
+    ## defer an event until the queued events are dispatched
+    #
+    # @param self the object pointer
+    # @param event the event to notify later
+    def queue(self, event):
+        self.eventQueue.append(event)
+
+    ## notify the listeners about the queued events (once per
+    ## frame); the events queued meanwhile wait for the next one
+    #
+    # @param self the object pointer
+    def dispatch_queued(self):
+        for i in range(len(self.eventQueue)):
+            self.post(self.eventQueue.popleft())
 
 ## class of a keyboard controller
 #
@@ -167,7 +228,7 @@ class KeyboardController(Base):
     # @param manager the event manager
     def __init__(self, manager):
         self.event_manager = manager
-        self.event_manager.register_listener(self)
+        self.event_manager.register_listener(self, TickEvent)
 
     ## handle the related events 
     #
@@ -200,16 +261,18 @@ class BusyWaitingController:
     # @param manager the event manager
     def __init__(self, manager):
         self.event_manager = manager
-        self.event_manager.register_listener(self)
+        self.event_manager.register_listener(self, QuitEvent)
         self.keep_going = True
 
     ## continuously generate a tick event while executing
     #
     # @param self the object pointer
     def run(self):
+        # all the tick events are the same one (see FlyweightEvent)
+        event = TickEvent()
+        post = self.event_manager.post
         while self.keep_going:
-            event = TickEvent()
-            self.event_manager.post(event)
+            post(event)
 
     ## handle the related events 
     #
@@ -227,7 +290,7 @@ class MainGUIView(Base):
     # @param manager the event manager
     def __init__(self, manager):
         self.event_manager = manager
-        self.event_manager.register_listener(self)
+        self.event_manager.register_listener(self, QuitEvent)
         pygame.init()
         self.window = pygame.display.set_mode((428, 428))
         pygame.display.set_caption('Example Game')
@@ -82,13 +82,37 @@ def get_parsed_opts():
                      dest="sound", default=True,
                      help="disable music")
 
+    group.add_option("--fade-cache", default=False,
+                     dest="fade_cache", action="store_true",
+                     help="precompute the intro's fades (uses more memory)")
+
+    group.add_option("--asyncio", default=False,
+                     dest="asyncio", action="store_true",
+                     help="run the main loop on an asyncio event loop "
+                          "(the background tasks run between the frames)")
+
     parser.add_option_group(group)
 
     group = OptionGroup(parser, "Debug Options")
 
-    group.add_option("-v", "--verbose", default=False,
-                     action="store_true", dest="verbose",
-                     help="explain what is being done")
+    group.add_option("-v", "--verbose", default=0,
+                     action="count", dest="verbose",
+                     help="explain what is being done "
+                          "(twice to trace the events too)")
+
+    group.add_option("--profile", default=None,
+                     dest="profile", metavar="FILE",
+                     help="time the phases of each frame and write "
+                          "them to FILE (.json or .csv) on exit or F12")
+
+    group.add_option("--record", default=None,
+                     dest="record", metavar="FILE",
+                     help="record the input of the game to FILE")
+
+    group.add_option("--replay", default=None,
+                     dest="replay", metavar="FILE",
+                     help="replay the input recorded in FILE, without "
+                          "a window and at full speed")
 
     parser.add_option_group(group)
 
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+#    Background Asset Preloader.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Background Asset Preloader.
+
+This module decodes the resources of the scenes which may
+follow the active one (see FSM.add_transition) on a worker
+thread. The decoded images are handed over to graphics and
+converted on the main thread when a scene loads them.
+
+With the `--asyncio' option the resources are decoded on the
+event loop's thread pool instead (see tasks.run_in_background),
+one job per call, which the event loop shuts down on exit. The
+requests made before the event loop runs wait for it (see
+dispatch), no thread is started.
+'''
+
+try:
+    import constants, queue, tasks, threading
+    import graphics, sound_mixer
+    from base import Base
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['AssetPreloader']
+
+
+class AssetPreloader(Base):
+    '''Decodes the resources of the upcoming scenes in the background.'''
+
+    def __init__(self, successors, files=constants.SCENE_FILES,
+                 threaded=True):
+        '''Create a new idle preloader.
+
+        Arguments:
+        successors -- a function returning the scenes which may
+        follow a scene (like FSM.successors)
+        files -- the resources of each scene
+        threaded -- decode on a worker thread when there is no
+        event loop (otherwise wait for the event loop)
+        '''
+        self.successors = successors
+        self.files = files
+        self.threaded = threaded
+
+        # (kind, filename) pairs waiting for the worker
+        self.jobs = queue.Queue()
+
+        # the jobs not handed over to the event loop yet
+        self.undispatched = 0
+
+        # the scenes already warmed (or being warmed)
+        self.warmed = set()
+
+        # the worker thread, started on the first request made
+        # without an event loop
+        self.worker = None
+
+    def warm(self, scene):
+        '''Start decoding the resources of the scenes following a scene.
+
+        Arguments:
+        scene -- the name of the scene which has just been entered
+        '''
+        for next_scene in self.successors(scene):
+            self.warm_scene(next_scene)
+
+    def warm_scene(self, scene):
+        '''Start decoding the resources of a scene.
+
+        Arguments:
+        scene -- the name of the scene to preload
+        '''
+        if scene in self.warmed or scene not in self.files:
+            return
+        self.warmed.add(scene)
+
+        for kind in ('graphics', 'sounds'):
+            for filename in self.files[scene][kind]:
+                self.jobs.put((kind, filename))
+                self.undispatched += 1
+
+        if tasks.is_running():
+            self.dispatch()
+        elif self.threaded and self.worker is None:
+            self.worker = threading.Thread(target=self._work,
+                                           name='asset preloader')
+            # never keep the game alive for a preload
+            self.worker.daemon = True
+            self.worker.start()
+
+    def dispatch(self):
+        '''Hand the requested resources over to the event loop, if it runs.'''
+        if not tasks.is_running():
+            return
+
+        # each call of the pool decodes the next job (if the
+        # worker thread, started before, didn't take it)
+        while self.undispatched:
+            self.undispatched -= 1
+            tasks.run_in_background(self._work_one, False)
+
+    def forget(self, scene):
+        '''Allow a scene to be warmed again (its resources were released).'''
+        self.warmed.discard(scene)
+
+    def wait(self):
+        '''Block until all the requested resources are decoded.'''
+        self.jobs.join()
+
+    def _work(self):
+        '''The worker thread's loop: decode each requested resource.'''
+        while True:
+            self._work_one()
+
+    def _work_one(self, block=True):
+        '''Decode the next requested resource.
+
+        Arguments:
+        block -- wait for a request if there is none
+        '''
+        try:
+            kind, filename = self.jobs.get(block)
+        except queue.Empty:
+            return
+
+        try:
+            if kind == 'graphics':
+                if not graphics.is_image_loaded(filename):
+                    graphics.stash_image(filename,
+                                         graphics.decode_image(filename))
+            else:
+                sound_mixer.load_sound(filename)
+        except (Exception, SystemExit):
+            # the scene reports the failure when it loads the resource
+            pass
+        finally:
+            self.jobs.task_done()
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+#    Frame Phase Profiler.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Frame Phase Profiler.
+
+This module times the phases (update, draw, etc.) of each frame
+of the main loop and of the scenes it runs. The durations of the
+last frames are kept in a preallocated ring buffer and written to
+a CSV or JSON file when the game exits or the dump hotkey is
+pressed.
+
+Profiling is enabled with the `--profile FILE' option, and F12
+writes the profiles at any time. When it is disabled the scenes
+get a profiler whose methods do nothing.
+'''
+
+try:
+    import atexit, json
+    from array import array
+    from time import perf_counter
+    from pygame.locals import K_F12
+    from base import Base
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['get_profiler', 'enable', 'dump', 'FrameProfiler']
+
+# how many of the last frames are kept
+FRAME_CAPACITY = 4096
+
+# the key which writes the profiles while playing
+DUMP_KEY = K_F12
+
+# the file the profiles are written to, None when disabled
+_filename = None
+
+# the profiler of each scene loop, name -> profiler
+_profilers = {}
+
+
+class NullProfiler(Base):
+    '''The profiler used when profiling is disabled.'''
+
+    def begin(self):
+        pass
+
+    def resume(self):
+        pass
+
+    def mark(self, phase):
+        pass
+
+
+# shared by all the scene loops when profiling is disabled
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler(Base):
+    '''Records the durations of the phases of the frames of a loop.'''
+
+    def __init__(self, name, phases, capacity=FRAME_CAPACITY):
+        '''Create a new profiler with an empty ring buffer.
+
+        Arguments:
+        name -- the name of the profiled loop
+        phases -- the names of the phases of a frame
+        capacity -- how many of the last frames are kept
+        '''
+        self.name = name
+        self.phases = tuple(phases)
+        self.capacity = capacity
+
+        # phase name -> column of the ring buffer
+        self.index = dict((phase, i) for i, phase in enumerate(self.phases))
+
+        # one row of phase durations (in seconds) per frame
+        width = len(self.phases)
+        self.samples = array('d', [0.0]) * (capacity * width)
+        self.zero_row = array('d', [0.0]) * width
+
+        # the number of frames ever begun
+        self.frames = 0
+
+        # where the current frame's row starts
+        self.row = 0
+
+        # when the last phase ended
+        self.last = 0.0
+
+    def begin(self):
+        '''Start a new frame (overwriting the oldest kept one).'''
+        width = len(self.phases)
+        self.row = (self.frames % self.capacity) * width
+        self.samples[self.row:self.row + width] = self.zero_row
+        self.frames += 1
+        self.last = perf_counter()
+
+    def resume(self):
+        '''Go on timing the frame, leaving out the time since the
+        last mark (spent outside the profiled loop).'''
+        self.last = perf_counter()
+
+    def mark(self, phase):
+        '''End a phase: add the time since the last mark to it.'''
+        now = perf_counter()
+        self.samples[self.row + self.index[phase]] += now - self.last
+        self.last = now
+
+    def rows(self):
+        '''Return the kept frames' durations, oldest first, in ms.'''
+        width = len(self.phases)
+        count = min(self.frames, self.capacity)
+        first = self.frames - count
+
+        rows = []
+        for frame in range(first, self.frames):
+            start = (frame % self.capacity) * width
+            rows.append((frame, [value * 1000.0 for value in
+                                 self.samples[start:start + width]]))
+        return rows
+
+
+def get_profiler(name, phases):
+    '''Return the profiler of a loop (one doing nothing if disabled).
+
+    Arguments:
+    name -- the name of the profiled loop
+    phases -- the names of the phases of a frame
+    '''
+    if _filename is None:
+        return NULL_PROFILER
+
+    profiler = _profilers.get(name)
+    if profiler is None:
+        profiler = _profilers[name] = FrameProfiler(name, phases)
+    return profiler
+
+
+def enable(filename):
+    '''Start profiling and write the profiles to a file on exit.
+
+    Arguments:
+    filename -- a file ending in .json gets JSON, any other CSV
+    '''
+    global _filename
+
+    if _filename is None:
+        atexit.register(dump)
+    _filename = filename
+
+
+def dump():
+    '''Write the profiles of all the loops to the profiling file.'''
+    if _filename is None:
+        return
+
+    if _filename.endswith('.json'):
+        data = dict((p.name, {'phases': p.phases, 'frames': p.frames,
+                              'ms': [row for frame, row in p.rows()]})
+                    for p in _profilers.values())
+        with open(_filename, 'w') as fout:
+            json.dump(data, fout)
+    else:
+        with open(_filename, 'w') as fout:
+            fout.write('loop,frame,phase,ms\n')
+            for p in _profilers.values():
+                for frame, row in p.rows():
+                    for phase, ms in zip(p.phases, row):
+                        fout.write('{0},{1},{2},{3:.4f}\n'.format(
+                            p.name, frame, phase, ms))
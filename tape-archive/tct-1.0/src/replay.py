@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+
+#    Input Recording and Replay.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Input Recording and Replay.
+
+This module records everything a game depends on besides its
+resources: the seed of the sprites' random numbers and, in the
+order the game asks for them, the event batches, the pressed keys,
+the mouse and the durations of the clock ticks. Played back, the
+log makes the game run exactly as recorded, without a window and
+without sleeping in the clock:
+
+    python tct.py --record game.rec
+    python tct.py --replay game.rec --profile replay.csv
+
+The log is a header followed by one record per input read:
+
+    magic, version, seed
+    kind (1 byte), then its data (see RECORDS)
+
+A record repeating the previous one of its kind is the kind in
+lower case, without data.
+'''
+
+try:
+    import atexit, marshal, os, struct, pygame, logger
+    import anim_sprite
+    from base import Base
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['record', 'replay', 'stop', 'Recorder', 'Player', 'ReplayError']
+
+# the file's signature and format version
+LOG_MAGIC = b'TCTREC'
+LOG_VERSION = 1
+
+# signature, version, seed
+HEADER = struct.Struct('<6sBQ')
+
+# the kinds of records
+TICK, EVENTS, KEYS, MOUSE_POS, MOUSE_BUTTONS = b'T', b'E', b'K', b'P', b'B'
+
+# the fixed size data of each kind (the events and keys are
+# prefixed by their size: bytes of marshalled events, key count)
+RECORDS = {TICK: struct.Struct('<H'),
+           EVENTS: struct.Struct('<I'),
+           KEYS: struct.Struct('<H'),
+           MOUSE_POS: struct.Struct('<hh'),
+           MOUSE_BUTTONS: struct.Struct('<B')}
+
+# a pressed key's scancode
+SCANCODE = struct.Struct('<H')
+
+# the event attributes which can be recorded
+PLAIN_TYPES = (int, float, str, bool, bytes, tuple, type(None))
+
+# the recorder or the player while recording or replaying
+_active = None
+
+# the pygame functions replaced while recording or replaying
+_saved = []
+
+
+class ReplayError(Exception):
+    '''Raised when the game asks for other input than recorded.'''
+
+
+class Recorder(Base):
+    '''Writes the input of a game to a log.'''
+
+    def __init__(self, filename, seed):
+        '''Create a new log.
+
+        Arguments:
+        filename -- the log file
+        seed -- the seed of the sprites' random numbers
+        '''
+        self.log = open(filename, 'wb')
+        self.log.write(HEADER.pack(LOG_MAGIC, LOG_VERSION, seed))
+
+        # kind -> the data of the last record of the kind
+        self.last = {}
+
+    def write(self, kind, data):
+        '''Write a record, or its kind only if it repeats the last one.'''
+        if self.last.get(kind) == data:
+            self.log.write(kind.lower())
+        else:
+            self.last[kind] = data
+            self.log.write(kind + data)
+
+    def tick(self, ms):
+        self.write(TICK, RECORDS[TICK].pack(min(int(ms), 0xffff)))
+
+    def events(self, events):
+        data = marshal.dumps([(e.type, dict((name, value)
+                                            for name, value in e.dict.items()
+                                            if isinstance(value, PLAIN_TYPES)))
+                              for e in events])
+        self.write(EVENTS, RECORDS[EVENTS].pack(len(data)) + data)
+
+    def keys(self, pressed):
+        scancodes = [i for i, down in enumerate(pressed) if down]
+        self.write(KEYS, RECORDS[KEYS].pack(len(scancodes)) +
+                   b''.join(SCANCODE.pack(i) for i in scancodes))
+
+    def mouse_pos(self, pos):
+        self.write(MOUSE_POS, RECORDS[MOUSE_POS].pack(*pos))
+
+    def mouse_buttons(self, buttons):
+        mask = sum(1 << i for i, down in enumerate(buttons) if down)
+        self.write(MOUSE_BUTTONS, RECORDS[MOUSE_BUTTONS].pack(mask))
+
+    def close(self):
+        self.log.close()
+
+
+class Player(Base):
+    '''Reads the input of a game back from a log.'''
+
+    def __init__(self, filename):
+        '''Open a log.
+
+        Arguments:
+        filename -- the log file
+
+        Exceptions: ReplayError if the file is not a log.
+        '''
+        with open(filename, 'rb') as fin:
+            self.data = fin.read()
+
+        try:
+            magic, version, self.seed = HEADER.unpack_from(self.data)
+        except struct.error:
+            magic = version = None
+        if (magic, version) != (LOG_MAGIC, LOG_VERSION):
+            raise ReplayError('Not an input log', filename)
+
+        self.offset = HEADER.size
+
+        # kind -> the data of the last record of the kind
+        self.last = {}
+
+        # the number of keys get_pressed() returns
+        self.key_count = len(pygame.key.get_pressed())
+
+    def finished(self):
+        '''Return whether all the records were read.'''
+        return self.offset >= len(self.data)
+
+    def read(self, kind):
+        '''Read the next record, which must be of a kind.
+
+        Return: the unpacked fixed size data of the record.
+        '''
+        code = self.data[self.offset:self.offset + 1]
+        self.offset += 1
+
+        if code == kind.lower():
+            return self.last[kind]
+        if code != kind:
+            raise ReplayError('Expected a record of another kind',
+                              kind, code, self.offset - 1)
+
+        values = RECORDS[kind].unpack_from(self.data, self.offset)
+        self.offset += RECORDS[kind].size
+        if kind == EVENTS:
+            size, = values
+            values = marshal.loads(self.data[self.offset:self.offset + size])
+            self.offset += size
+        elif kind == KEYS:
+            count, = values
+            values = [SCANCODE.unpack_from(self.data, self.offset + i * SCANCODE.size)[0]
+                      for i in range(count)]
+            self.offset += count * SCANCODE.size
+
+        self.last[kind] = values
+        return values
+
+    def tick(self):
+        ms, = self.read(TICK)
+        return ms
+
+    def events(self):
+        return [pygame.event.Event(event_type, attrs)
+                for event_type, attrs in self.read(EVENTS)]
+
+    def keys(self):
+        pressed = [False] * self.key_count
+        for i in self.read(KEYS):
+            pressed[i] = True
+        return pygame.key.ScancodeWrapper(pressed)
+
+    def mouse_pos(self):
+        return self.read(MOUSE_POS)
+
+    def mouse_buttons(self):
+        mask, = self.read(MOUSE_BUTTONS)
+        return tuple(bool(mask & (1 << i)) for i in range(3))
+
+
+def _patch(module, name, value):
+    _saved.append((module, name, getattr(module, name)))
+    setattr(module, name, value)
+
+
+def record(filename):
+    '''Record the input of the game from now on (until it exits).
+
+    Arguments:
+    filename -- the log file
+    '''
+    global _active
+
+    seed = int.from_bytes(os.urandom(8), 'little')
+    anim_sprite.rng.seed(seed)
+
+    recorder = _active = Recorder(filename, seed)
+    Clock = pygame.time.Clock
+    get_events = pygame.event.get
+    get_pressed = pygame.key.get_pressed
+    get_pos = pygame.mouse.get_pos
+    get_buttons = pygame.mouse.get_pressed
+
+    class RecordingClock(object):
+        '''A clock recording the durations of its ticks.'''
+        def __init__(self):
+            self.clock = Clock()
+
+        def tick(self, framerate=0):
+            ms = self.clock.tick(framerate)
+            recorder.tick(ms)
+            return ms
+
+        def get_fps(self):
+            return self.clock.get_fps()
+
+    def get(*args, **kwargs):
+        events = get_events(*args, **kwargs)
+        recorder.events(events)
+        return events
+
+    def keys():
+        pressed = get_pressed()
+        recorder.keys(pressed)
+        return pressed
+
+    def pos():
+        position = get_pos()
+        recorder.mouse_pos(position)
+        return position
+
+    def buttons(*args, **kwargs):
+        pressed = get_buttons(*args, **kwargs)
+        recorder.mouse_buttons(pressed)
+        return pressed
+
+    _patch(pygame.time, 'Clock', RecordingClock)
+    _patch(pygame.event, 'get', get)
+    _patch(pygame.key, 'get_pressed', keys)
+    _patch(pygame.mouse, 'get_pos', pos)
+    _patch(pygame.mouse, 'get_pressed', buttons)
+    atexit.register(stop)
+
+
+def replay(filename):
+    '''Feed the game the recorded input from now on (call it after
+    the display is initialized). The game quits after the last
+    record.
+
+    Arguments:
+    filename -- the log file
+    '''
+    global _active
+
+    player = _active = Player(filename)
+    anim_sprite.rng.seed(player.seed)
+
+    get_events = pygame.event.get
+    quit_events = [pygame.event.Event(pygame.QUIT)]
+
+    class ReplayingClock(object):
+        '''A clock ticking as recorded, without sleeping.'''
+        def tick(self, framerate=0):
+            if player.finished():
+                return 0
+            return player.tick()
+        tick_busy_loop = tick
+
+        def get_fps(self):
+            return 0.0
+
+    def get(*args, **kwargs):
+        # keep the real queue from filling up
+        get_events()
+        if player.finished():
+            logger.info('replay finished')
+            return quit_events
+        return player.events()
+
+    def keys():
+        if player.finished():
+            return pygame.key.ScancodeWrapper([False] * player.key_count)
+        return player.keys()
+
+    def pos():
+        if player.finished():
+            return (0, 0)
+        return player.mouse_pos()
+
+    def buttons(*args, **kwargs):
+        if player.finished():
+            return (False, False, False)
+        return player.mouse_buttons()
+
+    _patch(pygame.time, 'Clock', ReplayingClock)
+    _patch(pygame.event, 'get', get)
+    _patch(pygame.key, 'get_pressed', keys)
+    _patch(pygame.mouse, 'get_pos', pos)
+    _patch(pygame.mouse, 'get_pressed', buttons)
+    atexit.register(stop)
+
+
+def stop():
+    '''Stop recording or replaying (closing the log).'''
+    global _active
+
+    for module, name, value in reversed(_saved):
+        setattr(module, name, value)
+    del _saved[:]
+
+    if isinstance(_active, Recorder):
+        _active.close()
+    _active = None
@@ -28,8 +28,9 @@
 
 
 try:
-    import constants, pygame
+    import constants, logger, pygame, threading
     from os_utils import file_path
+    from asset_pack import get_pack
 except ImportError as err:
     try:
         import os
@@ -55,20 +56,53 @@ MUSIC_REPEAT = -1
 pygame.mixer.pre_init(44100, -16, 2, 4096)
 
 
-## load a sound
+## the sounds shared by all the scenes of the game
+sound_registry = {}
+
+## guards the registry, the preloader loads sounds from its thread
+_registry_lock = threading.Lock()
+
+
+## load a sound, or return the already loaded one
 #
 # @param filename the filename of the sound
 # @throw SystemExit when the sound's load fails
 # @return the loaded sound
 def load_sound(filename):
+    with _registry_lock:
+        sound = sound_registry.get(filename)
+    if sound is None:
+        # decode it without the lock, it takes a while
+        sound = _open_sound(filename)
+
+        # keep the sound which was registered first, if the
+        # same one was loaded by two threads at the same time
+        with _registry_lock:
+            sound = sound_registry.setdefault(filename, sound)
+
+    return sound
+
+
+## load a sound from the asset pack or the disk
+#
+# @param filename the filename of the sound
+# @throw SystemExit when the sound's load fails
+# @return the loaded sound
+def _open_sound(filename):
     # get the path of the filename
     fullname = file_path(filename, constants.SOUNDS_DIR)
 
+    # use the prebaked samples if they are packed
+    pack = get_pack()
+    sound = pack and pack.load_sound(filename)
+    if sound is not None:
+        return sound
+
     # try to load the sound
     try:
         sound = pygame.mixer.Sound(fullname)
     except:
-        print((' '.join(("Couldn't load sound:", fullname))))
+        logger.error("Couldn't load sound: {0}", fullname)
         raise SystemExit
 
     # return the loaded sound
@@ -85,12 +119,16 @@ def play_music(filename, repeat=MUSIC_REPEAT):
     # get the path of the filename
     fullname = file_path(filename, constants.SOUNDS_DIR)
 
+    # stream the music from the pack if it is packed
+    pack = get_pack()
+    music = pack and pack.open_file(constants.SOUNDS_DIR, filename)
+
     # try to play the music theme
     try:
-        sound = pygame.mixer.music.load(fullname)
+        sound = pygame.mixer.music.load(music or fullname)
         pygame.mixer.music.play(repeat)
     except:
-        print((' '.join(("Couldn't play music:", fullname))))
+        logger.error("Couldn't play music: {0}", fullname)
         raise SystemExit
 
 
@@ -108,4 +146,4 @@ def play_sound(sound, volume=SOUND_VOLUME):
         # set volume as given
         channel.set_volume(volume)
     except AttributeError:
-        print('No sound channels available!')
+        logger.warning('No sound channels available!')
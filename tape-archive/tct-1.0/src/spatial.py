@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+
+#    Spatial Indexes.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Spatial Indexes.
+
+This module finds the entities of a room (clues, obstacles, doors)
+under the mouse or overlapping a rectangle without looking at all
+of them. Both indexes keep a rectangle per entity and have the same
+interface (insert, move, remove, query_point, query_rect):
+
+SpatialHash -- a uniform grid of cells, each listing the entities
+overlapping it; best when the entities are spread over the room.
+
+QuadTree -- a tree of quadrants split where the entities crowd; the
+fallback for rooms of uneven density (a few crowded corners in an
+empty room).
+
+The queries return the entities in the order they were inserted, so
+the last one is drawn (and picked) on top.
+'''
+
+try:
+    import pygame
+    from base import Base
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['SpatialHash', 'QuadTree', 'create_index']
+
+# the side of a spatial hash's cells in pixels (about the size of
+# an entity, so that most of them overlap a few cells)
+CELL_SIZE = 64
+
+# how many entities a quadrant holds before it is split
+QUAD_CAPACITY = 8
+
+# how many times the quadrants can be split
+QUAD_MAX_DEPTH = 8
+
+
+class SpatialIndex(Base):
+    '''What both indexes do with the entities' rectangles.'''
+
+    def __init__(self):
+        # entity -> its rectangle (a copy, moving needs the old one)
+        self.rects = {}
+
+        # entity -> the order it was inserted in (for the queries)
+        self.order = {}
+        self.inserted = 0
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __contains__(self, entity):
+        return entity in self.rects
+
+    def _add(self, entity, rect):
+        '''Keep an entity's rectangle, return the copy.'''
+        if entity in self.rects:
+            raise ValueError('Entity already in the index', entity)
+        rect = self.rects[entity] = pygame.Rect(rect)
+        self.order[entity] = self.inserted
+        self.inserted += 1
+        return rect
+
+    def _forget(self, entity):
+        '''Forget an entity, return its rectangle.
+
+        Exceptions: KeyError if the entity is not in the index.
+        '''
+        del self.order[entity]
+        return self.rects.pop(entity)
+
+    def _sorted(self, entities):
+        '''Return the entities in the order they were inserted.'''
+        return sorted(entities, key=self.order.__getitem__)
+
+    def move(self, entity, rect):
+        '''Give an entity a new rectangle (keeping its order).
+
+        Arguments:
+        entity -- an entity of the index
+        rect -- its new rectangle
+        '''
+        order = self.order[entity]
+        self.remove(entity)
+        self.insert(entity, rect)
+        self.order[entity] = order
+
+
+class SpatialHash(SpatialIndex):
+    '''A uniform grid of cells listing the entities overlapping them.'''
+
+    def __init__(self, cell_size=CELL_SIZE):
+        '''Create a new empty grid.
+
+        Arguments:
+        cell_size -- the side of the cells in pixels
+        '''
+        SpatialIndex.__init__(self)
+        self.cell_size = cell_size
+
+        # (column, row) -> the entities overlapping the cell
+        self.cells = {}
+
+    def _cells(self, rect):
+        '''Return the cells a rectangle overlaps.'''
+        size = self.cell_size
+        left, top = rect.left // size, rect.top // size
+        right = (rect.right - 1) // size if rect.width else left
+        bottom = (rect.bottom - 1) // size if rect.height else top
+        return [(column, row) for column in range(left, right + 1)
+                for row in range(top, bottom + 1)]
+
+    def insert(self, entity, rect):
+        '''Add an entity.
+
+        Arguments:
+        entity -- any hashable object
+        rect -- the entity's rectangle
+
+        Exceptions: ValueError if the entity is already in the index.
+        '''
+        rect = self._add(entity, rect)
+        cells = self.cells
+        for cell in self._cells(rect):
+            try:
+                cells[cell].add(entity)
+            except KeyError:
+                cells[cell] = set((entity,))
+
+    def remove(self, entity):
+        '''Remove an entity.
+
+        Exceptions: KeyError if the entity is not in the index.
+        '''
+        cells = self.cells
+        for cell in self._cells(self._forget(entity)):
+            entities = cells[cell]
+            entities.discard(entity)
+            if not entities:
+                del cells[cell]
+
+    def query_point(self, pos):
+        '''Return the entities whose rectangles contain a point.
+
+        Arguments:
+        pos -- the point (x, y)
+        '''
+        size = self.cell_size
+        entities = self.cells.get((int(pos[0]) // size, int(pos[1]) // size))
+        if not entities:
+            return []
+        rects = self.rects
+        return self._sorted([entity for entity in entities
+                             if rects[entity].collidepoint(pos)])
+
+    def query_rect(self, rect):
+        '''Return the entities whose rectangles overlap a rectangle.
+
+        Arguments:
+        rect -- the rectangle
+        '''
+        rect = pygame.Rect(rect)
+        cells, rects = self.cells, self.rects
+        found = set()
+        for cell in self._cells(rect):
+            for entity in cells.get(cell, ()):
+                if entity not in found and rects[entity].colliderect(rect):
+                    found.add(entity)
+        return self._sorted(found)
+
+
+class QuadNode(Base):
+    '''A quadrant of a QuadTree.'''
+
+    __slots__ = ('rect', 'depth', 'entities', 'children')
+
+    def __init__(self, rect, depth):
+        self.rect = rect
+        self.depth = depth
+
+        # the entities which don't fit in a single child
+        self.entities = set()
+
+        # the four quadrants, after the node is split
+        self.children = None
+
+    def child_containing(self, rect):
+        '''Return the child which contains a rectangle, if any.'''
+        for child in self.children:
+            if child.rect.contains(rect):
+                return child
+        return None
+
+    def split(self):
+        '''Create the four quadrants of the node.'''
+        x, y, w, h = self.rect
+        half_w, half_h = w // 2, h // 2
+        self.children = [QuadNode(pygame.Rect(left, top, width, height),
+                                  self.depth + 1)
+                         for left, width in ((x, half_w), (x + half_w, w - half_w))
+                         for top, height in ((y, half_h), (y + half_h, h - half_h))]
+
+
+class QuadTree(SpatialIndex):
+    '''A tree of quadrants, split where the entities crowd.'''
+
+    def __init__(self, bounds, capacity=QUAD_CAPACITY, max_depth=QUAD_MAX_DEPTH):
+        '''Create a new empty tree.
+
+        Arguments:
+        bounds -- the rectangle of the room (entities outside it are
+        kept in the root)
+        capacity -- how many entities a quadrant holds before it is split
+        max_depth -- how many times the quadrants can be split
+        '''
+        SpatialIndex.__init__(self)
+        self.root = QuadNode(pygame.Rect(bounds), 0)
+        self.capacity = capacity
+        self.max_depth = max_depth
+
+        # entity -> the node holding it
+        self.nodes = {}
+
+    def _place(self, entity, rect, node):
+        '''Put an entity in the deepest node (below one) containing it.'''
+        while node.children is not None:
+            child = node.child_containing(rect)
+            if child is None:
+                break
+            node = child
+        node.entities.add(entity)
+        self.nodes[entity] = node
+
+        if (node.children is None and len(node.entities) > self.capacity
+                and node.depth < self.max_depth):
+            node.split()
+            entities, node.entities = node.entities, set()
+            for other in entities:
+                self._place(other, self.rects[other], node)
+
+    def insert(self, entity, rect):
+        '''Add an entity.
+
+        Arguments:
+        entity -- any hashable object
+        rect -- the entity's rectangle
+
+        Exceptions: ValueError if the entity is already in the index.
+        '''
+        self._place(entity, self._add(entity, rect), self.root)
+
+    def remove(self, entity):
+        '''Remove an entity (the quadrants are never merged back).
+
+        Exceptions: KeyError if the entity is not in the index.
+        '''
+        self._forget(entity)
+        self.nodes.pop(entity).entities.discard(entity)
+
+    def _query(self, overlaps):
+        '''Return the entities whose rectangles pass a test, looking
+        only in the quadrants which pass it.'''
+        rects = self.rects
+        found = []
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            found.extend(entity for entity in node.entities
+                         if overlaps(rects[entity]))
+            if node.children is not None:
+                nodes.extend(child for child in node.children
+                             if overlaps(child.rect))
+        return self._sorted(found)
+
+    def query_point(self, pos):
+        '''Return the entities whose rectangles contain a point.
+
+        Arguments:
+        pos -- the point (x, y)
+        '''
+        return self._query(lambda rect: rect.collidepoint(pos))
+
+    def query_rect(self, rect):
+        '''Return the entities whose rectangles overlap a rectangle.
+
+        Arguments:
+        rect -- the rectangle
+        '''
+        return self._query(pygame.Rect(rect).colliderect)
+
+
+def create_index(bounds, uneven=False):
+    '''Return an empty index for a room.
+
+    Arguments:
+    bounds -- the rectangle of the room
+    uneven -- whether the entities crowd in parts of the room
+    '''
+    if uneven:
+        return QuadTree(bounds)
+    return SpatialHash()
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+
+#    Batched Sprite Animation.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Batched Sprite Animation.
+
+This module animates many sprites at once, moving each one along
+an axis and placing it back at a random place when it leaves the
+screen (the random numbers come from anim_sprite.rng, so that a
+replay places them alike). The sprites' positions, speeds, axes
+and limits are kept in NumPy arrays (one per attribute), so that
+moving and wrapping all the sprites is a few array operations and
+drawing them a single Surface.blits call.
+'''
+
+try:
+    import numpy
+    import pygame
+    from anim_sprite import rng
+    from base import Base
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['SpriteBatch', 'HORIZONTAL', 'VERTICAL']
+
+# the axis each sprite moves along (the index of its coordinate)
+HORIZONTAL, VERTICAL = 0, 1
+
+# the arrays start with room for this many sprites (and double)
+INITIAL_CAPACITY = 16
+
+# the arrays of the sprites' attributes: name, shape of a sprite's
+# element, element type
+ARRAYS = (
+    # the top-left corner after the last movement and before it
+    ('position', (2,), numpy.float64),
+    ('previous', (2,), numpy.float64),
+    # the top-left corner the sprite is drawn at (see interpolate)
+    ('drawn', (2,), numpy.float64),
+    # pixels per second
+    ('speed', (), numpy.float64),
+    # HORIZONTAL or VERTICAL
+    ('axis', (), numpy.intp),
+    # how far from the edges the sprite reappears
+    ('limit', (), numpy.int64),
+    # the index of the sprite's image
+    ('image', (), numpy.intp))
+
+
+class SpriteBatch(Base):
+    '''Sprites moving along an axis, kept in arrays.'''
+
+    def __init__(self, area):
+        '''Create a new empty batch.
+
+        Arguments:
+        area -- the rectangle the sprites move inside (the screen)
+        '''
+        self.area = pygame.Rect(area)
+
+        # the images of the sprites (a sprite keeps an index), copies
+        # of the images added, since set_alpha changes them
+        self.images = []
+
+        # the images added, in the order of their copies
+        self.sources = []
+
+        # the number of sprites
+        self.count = 0
+
+        # the random numbers come from the sprites' stream, so a
+        # replayed game places the sprites as the recorded one
+        self.random = numpy.random.default_rng(rng.getrandbits(64))
+
+        for name, shape, dtype in ARRAYS:
+            setattr(self, name, numpy.zeros((INITIAL_CAPACITY,) + shape, dtype))
+
+    def _grow(self):
+        '''Double the room of the arrays (keeping the sprites).'''
+        for name, shape, dtype in ARRAYS:
+            array = numpy.zeros((2 * len(self.speed),) + shape, dtype)
+            array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+
+    def add(self, image, pos, speed, axis):
+        '''Add a sprite.
+
+        Arguments:
+        image -- the sprite's surface
+        pos -- the sprite's initial top-left position
+        speed -- the sprite's speed in pixels per second
+        axis -- HORIZONTAL or VERTICAL
+
+        Return: the sprite's index in the arrays.
+        '''
+        if self.count == len(self.speed):
+            self._grow()
+
+        try:
+            index = self.sources.index(image)
+        except ValueError:
+            index = len(self.images)
+            self.sources.append(image)
+            # the images may be shared (see graphics.load_image)
+            self.images.append(image.copy())
+
+        i = self.count
+        self.position[i] = self.previous[i] = self.drawn[i] = pos
+        self.speed[i] = speed
+        self.axis[i] = axis
+        # a sprite moving down reappears within the screen's width
+        self.limit[i] = image.get_width() if axis == VERTICAL else image.get_height()
+        self.image[i] = index
+        self.count += 1
+        return i
+
+    def set_alpha(self, alpha):
+        '''Set the alpha of all the sprites' images (the batch's
+        copies, the images added are left alone).'''
+        for image in self.images:
+            image.set_alpha(alpha)
+
+    def update(self, time_pass_sec):
+        '''Move all the sprites, placing those which left the screen
+        back at a random place before it.
+
+        Arguments:
+        time_pass_sec -- updated time since the last movement in seconds
+        '''
+        n = self.count
+        position, axis = self.position[:n], self.axis[:n]
+        self.previous[:n] = position
+
+        rows = numpy.arange(n)
+        position[rows, axis] += self.speed[:n] * time_pass_sec
+
+        # the sprites past the right or the bottom edge
+        ends = numpy.array((self.area.right, self.area.bottom))
+        wrapped = position[rows, axis] >= ends[axis]
+        if not wrapped.any():
+            return
+
+        rows, axis = rows[wrapped], axis[wrapped]
+        other = 1 - axis
+        limit = self.limit[:n][wrapped]
+
+        # before the screen on their axis, anywhere on the other
+        starts = numpy.array((self.area.left, self.area.top))
+        sizes = numpy.array((self.area.width, self.area.height))
+        position[rows, axis] = starts[axis] - sizes[axis]
+        position[rows, other] = self.random.integers(
+            starts[other] + limit, starts[other] + sizes[other] - limit,
+            endpoint=True)
+
+        # they jump there without moving in between
+        self.previous[rows] = position[rows]
+
+    def interpolate(self, alpha):
+        '''Place the sprites between their last two positions.
+
+        Arguments:
+        alpha -- 0 for the previous positions, 1 for the last ones
+        '''
+        n = self.count
+        previous = self.previous[:n]
+        numpy.add(previous, (self.position[:n] - previous) * alpha,
+                  out=self.drawn[:n])
+
+    def draw(self, surface):
+        '''Draw all the sprites (where interpolate placed them).
+
+        Arguments:
+        surface -- the surface to draw on
+
+        Return: the rectangles drawn.
+        '''
+        images = self.images
+        return surface.blits([(images[index], (x, y)) for index, (x, y) in
+                              zip(self.image[:self.count].tolist(),
+                                  self.drawn[:self.count].tolist())])
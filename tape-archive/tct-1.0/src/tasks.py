@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+#    Background Tasks.
+#
+#    This file is part of The Crime Tracer.
+#
+#    Copyright (C) 2009-11 Free Software Gaming Geeks <fsgamedev@googlegroups.com>
+#
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''Background Tasks.
+
+With the `--asyncio' option the main loop is a coroutine which
+awaits the next frame on an asyncio event loop (see
+tct.MainController.run_async). The work handed to this module
+(writing files, decoding, flushing statistics) then runs while
+the main loop sleeps between the frames: coroutines on the event
+loop, blocking functions on its thread pool.
+
+Without the event loop the work is done right away, so the
+callers don't need to know which mode the game runs in.
+'''
+
+try:
+    import asyncio, logger
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print(("{0}: {1}".format(path, err)))
+    except ImportError:
+        print(("Couldn't load module: {0}".format(err)))
+    exit(2)
+
+__all__ = ['start', 'stop', 'is_running', 'spawn', 'run_in_background']
+
+# the event loop of the main loop, None when it doesn't run on one
+_loop = None
+
+# the unfinished background work (the event loop keeps only weak
+# references to its tasks)
+_pending = set()
+
+
+def start(loop):
+    '''Run the background work on an event loop from now on.
+
+    Arguments:
+    loop -- the running event loop of the main loop
+    '''
+    global _loop
+    _loop = loop
+
+
+def stop():
+    '''Do the background work right away again.'''
+    global _loop
+    _loop = None
+
+
+def is_running():
+    '''Return whether the background work runs on an event loop.'''
+    return _loop is not None
+
+
+def _done(future):
+    '''Forget a finished piece of work and log its failure, if any.'''
+    _pending.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        logger.error('background task failed: {0!r}', future.exception())
+
+
+def spawn(coroutine):
+    '''Run a coroutine between the frames.
+
+    Arguments:
+    coroutine -- the coroutine object to run
+
+    Return: its task, or its result if there is no event loop.
+    '''
+    if _loop is None:
+        return asyncio.run(coroutine)
+
+    task = _loop.create_task(coroutine)
+    _pending.add(task)
+    task.add_done_callback(_done)
+    return task
+
+
+def run_in_background(function, *args):
+    '''Call a blocking function off the main loop.
+
+    Arguments:
+    function -- the function to call
+    args -- its arguments
+
+    Return: its future, or its result if there is no event loop.
+    '''
+    if _loop is None:
+        return function(*args)
+
+    future = _loop.run_in_executor(None, function, *args)
+    _pending.add(future)
+    future.add_done_callback(_done)
+    return future
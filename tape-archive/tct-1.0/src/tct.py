@@ -28,13 +28,15 @@ and then starts the game manager for the rest things.
 '''
 
 try:
-    import constants, os, sys, pygame
+    import asyncio, constants, logger, os, sys, time, pygame, profiler, replay, tasks
     from parse_options import get_parsed_opts
 
     from graphics import load_image
+    from asset_pack import open_pack
     from game_manager import GameManager
     from base import Base
-    from mvc import KeyboardController, EventManager
+    from os_utils import safe_exit
+    from mvc import KeyboardController, EventManager, QuitEvent
 except Exception as err:
         import constants, os
         path = os.path.basename(__file__)
@@ -43,6 +45,9 @@ except Exception as err:
 
 __all__ = ['main']
 
+# the profiled phases of a frame of the main loop
+MAIN_LOOP_PHASES = ('clock.tick', 'events', 'update', 'render', 'display.update')
+
 def main():
     # change the current directory to the one of the game
     # this is to allow executions like ``python src/tct.py''
@@ -55,10 +60,31 @@ def main():
     # get the command line options; return the option flags
     game_opts = get_parsed_opts()
 
+    # log the informative messages too if asked to
+    logger.configure(logger.verbosity_level(game_opts.verbose))
+
+    # use the prebaked resources archive if it has been built
+    open_pack()
+
+    # time the frames of the scenes if asked to
+    if game_opts.profile:
+        profiler.enable(game_opts.profile)
+
+    # a replayed game runs without a window or a sound card
+    if game_opts.replay:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
     # MVC stuff
     event_manager = EventManager()
     gui_view = MainGUIView(event_manager, game_opts)
 
+    # record the input of the game, or replay a recorded one
+    if game_opts.replay:
+        replay.replay(game_opts.replay)
+    elif game_opts.record:
+        replay.record(game_opts.record)
+
     # the game manager
     game_manager = GameManager(game_opts)
 
@@ -66,7 +92,10 @@ def main():
     main_controller = MainController(event_manager, gui_view, game_manager)
 
     # keep running the game until a quit event occurs
-    main_controller.run()
+    if game_opts.asyncio:
+        asyncio.run(main_controller.run_async())
+    else:
+        main_controller.run()
 
     # if control somehow reaches this point close all the pygame subsystems
     pygame.quit()
@@ -74,28 +103,107 @@ def main():
 
 
 class MainController:
-    '''This class is responsible for running the main game loop until a quit event occurs.'''
+    '''This class is responsible for running the main game loop until a quit event occurs.
+
+    The scenes never block: on each frame the loop passes them the
+    events, updates them in fixed time steps (as many as the time
+    passed needs) and renders them in between the last two steps.
+
+    The loop either sleeps between the frames (run) or awaits them
+    on an asyncio event loop, which runs the background tasks in
+    the meantime (run_async).
+    '''
 
     def __init__(self, manager, view, gm):
         self.event_manager = manager
-        self.event_manager.register_listener(self)
+        self.event_manager.register_listener(self, QuitEvent)
         self.gui_view = view
         self.game_manager = gm
         self.main_loop_running = True
 
-    def run(self):
-        while self.main_loop_running:
-            # execute the game manager
-            self.game_manager.run_scene()
+        # the duration of an update in seconds
+        self.step = 1.0 / constants.UPDATE_RATE
 
-            evt = None
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    evt = QuitEvent()
+        # the time passed but not yet simulated by the updates
+        self.lag = 0.0
 
-            # inform the event manager about the generated event
-            if evt:
-                self.event_manager.post(evt)
+        self.clock = pygame.time.Clock()
+        self.profiler = profiler.get_profiler('main loop', MAIN_LOOP_PHASES)
+
+    def run(self):
+        while self.main_loop_running:
+            self.run_frame()
+
+    async def run_async(self):
+        '''Run the main loop as a coroutine awaiting the next frame.
+
+        Instead of sleeping in the clock, the loop awaits the rest
+        of each frame, so the background tasks (see tasks) run on
+        the event loop in between the frames.
+        '''
+        tasks.start(asyncio.get_running_loop())
+        try:
+            while self.main_loop_running:
+                started = time.perf_counter()
+                self.run_frame(limit=False)
+
+                # the rest of the frame is for the background tasks
+                rest = 1.0 / self.frame_rate() - (time.perf_counter() - started)
+                await asyncio.sleep(max(rest, 0.0))
+        finally:
+            tasks.stop()
+
+    def frame_rate(self):
+        '''Return the frame rate (lower while nothing moves on the screen).'''
+        if self.game_manager.is_idle():
+            return constants.IDLE_FRAME_RATE
+        return constants.FRAME_RATE
+
+    def run_frame(self, limit=True):
+        '''Run one frame of the game: events, updates and rendering.
+
+        Arguments:
+        limit -- sleep in the clock to keep the frame rate
+        '''
+        gm = self.game_manager
+        self.profiler.begin()
+
+        rate = self.frame_rate() if limit else 0
+
+        # after a stall don't try to catch up with all the time lost
+        self.lag += min(self.clock.tick(rate) / 1000.0,
+                        constants.MAX_FRAME_TIME)
+        self.profiler.mark('clock.tick')
+
+        events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT:
+                # inform the event manager about the generated event
+                self.event_manager.post(QuitEvent())
+            # write the profiles when the dump key is pressed
+            elif event.type == pygame.KEYDOWN and event.key == profiler.DUMP_KEY:
+                tasks.run_in_background(profiler.dump)
+
+        gm.handle_events(events)
+
+        # the events deferred during the last frame
+        self.event_manager.dispatch_queued()
+        self.profiler.mark('events')
+
+        # simulate the time passed in fixed steps
+        while self.lag >= self.step and self.main_loop_running:
+            gm.update(self.step)
+            self.lag -= self.step
+        self.profiler.mark('update')
+
+        # draw the scene between the last two steps
+        need_update = gm.render(self.lag / self.step)
+        self.profiler.mark('render')
+
+        # display only the changed regions of the screen
+        if need_update:
+            pygame.display.update(need_update)
+        self.profiler.mark('display.update')
 
     def notify(self, event):
         if isinstance(event, QuitEvent):
@@ -4,6 +4,7 @@ try:
     import anim_sprite
     import constants
     from anim_sprite import *
+    from sprite_batch import *
 except ImportError as err:
     try:
         import os
@@ -13,30 +14,65 @@ except ImportError as err:
         print((': '.join(("couldn't load module", str(err)))))
     exit(2)
 
-# code required to make the test work
-pygame.init()
-pygame.display.set_mode(
-    (constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT), 0)
-sprite_fact = SpriteFactory()
+ANIM_FILES = constants.FILES['graphics']['menu']['share']['anim']
 
 class BadInput(unittest.TestCase):
     '''Tests related with bad input given in anim_sprite.'''
 
+    def setUp(self):
+        self.sprite_fact = SpriteFactory()
+
     def test_min_speed(self):
         '''create_anim_sprite should fail with speed values < min. acceptable'''
-        self.assertRaises(anim_sprite.SpriteSpeedError, 
-                          sprite_fact.create_anim_sprite, 
-                          anim_sprite.VERT_ANIM,
-                          constants.FILES['graphics']['menu']['share']['anim'][0],
+        self.assertRaises(anim_sprite.SpriteSpeedError,
+                          self.sprite_fact.create_anim_sprite,
+                          anim_sprite.VERT_ANIM, ANIM_FILES[0],
                           anim_sprite.MIN_SPEED - 1)
 
     def test_max_speed(self):
         '''create_anim_sprite should fail with speed values > max. acceptable'''
-        self.assertRaises(anim_sprite.SpriteSpeedError, 
-                          sprite_fact.create_anim_sprite, 
-                          anim_sprite.VERT_ANIM,
-                          constants.FILES['graphics']['menu']['share']['anim'][0],
+        self.assertRaises(anim_sprite.SpriteSpeedError,
+                          self.sprite_fact.create_anim_sprite,
+                          anim_sprite.VERT_ANIM, ANIM_FILES[0],
+                          anim_sprite.MAX_SPEED + 1)
+
+    def test_type(self):
+        '''create_anim_sprite should fail with an unknown sprite type'''
+        self.assertRaises(anim_sprite.SpriteTypeError,
+                          self.sprite_fact.create_anim_sprite,
+                          len(ANIM_FILES), ANIM_FILES[0], anim_sprite.MIN_SPEED)
+
+class Batched(unittest.TestCase):
+    '''Tests related with adding the animated sprites to a sprite batch.'''
+
+    def setUp(self):
+        # the images are converted to the display format
+        pygame.display.init()
+        pygame.display.set_mode((8, 8))
+        self.sprite_fact = SpriteFactory()
+        self.batch = SpriteBatch(pygame.Rect(0, 0, 800, 600))
+
+    def test_axes(self):
+        '''each type of animated sprite should move along its axis'''
+        self.sprite_fact.add_anim_sprite(self.batch, anim_sprite.VERT_ANIM,
+                                         ANIM_FILES[0], anim_sprite.MIN_SPEED)
+        self.sprite_fact.add_anim_sprite(self.batch, anim_sprite.HORIZ_ANIM,
+                                         ANIM_FILES[1], anim_sprite.MAX_SPEED)
+        self.assertEqual(self.batch.count, 2)
+        self.assertEqual(self.batch.axis[:2].tolist(), [VERTICAL, HORIZONTAL])
+        self.assertEqual(self.batch.speed[:2].tolist(),
+                         [anim_sprite.MIN_SPEED, anim_sprite.MAX_SPEED])
+
+    def test_bad_input(self):
+        '''bad sprites should never be added'''
+        self.assertRaises(anim_sprite.SpriteSpeedError,
+                          self.sprite_fact.add_anim_sprite, self.batch,
+                          anim_sprite.VERT_ANIM, ANIM_FILES[0],
                           anim_sprite.MAX_SPEED + 1)
+        self.assertRaises(anim_sprite.SpriteTypeError,
+                          self.sprite_fact.add_anim_sprite, self.batch,
+                          len(ANIM_FILES), ANIM_FILES[0], anim_sprite.MIN_SPEED)
+        self.assertEqual(self.batch.count, 0)
 
 if __name__ == '__main__':
     unittest.main()
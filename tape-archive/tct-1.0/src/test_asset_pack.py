@@ -0,0 +1,131 @@
+try:
+    import os, shutil, tempfile, unittest, wave
+    import pygame
+    import constants
+    from asset_pack import AssetPack, build_pack, entry_name
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+# a font of the game (copied in the packed resources)
+FONT_FILE = constants.FILES['fonts']['menu']['share'][3]
+
+# the resources of the test pack, structured like constants.FILES
+FILES = {'graphics': {'test': ['alpha.png', 'opaque.png']},
+         'sounds': {'test': ['beep.wav']},
+         'fonts': {'test': [FONT_FILE]},
+         'texts': {'test': ['notes.txt']}}
+
+class RoundTrip(unittest.TestCase):
+    '''Tests related with reading back the resources of a pack.'''
+
+    def setUp(self):
+        # the samples are packed in the format of the running mixer
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        font_name = os.path.abspath(os.path.join(constants.RESOURCES_DIR,
+                                                 constants.FONTS_DIR, FONT_FILE))
+
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        for dir in (constants.GRAPHICS_DIR, constants.SOUNDS_DIR,
+                    constants.FONTS_DIR, constants.TEXTS_DIR):
+            os.makedirs(os.path.join(constants.RESOURCES_DIR, dir))
+
+        self.alpha = pygame.Surface((5, 3), pygame.SRCALPHA)
+        self.opaque = pygame.Surface((4, 6))
+        for x in range(5):
+            for y in range(3):
+                self.alpha.set_at((x, y), (x * 50, y * 80, 7, 40 * (x + y)))
+        for x in range(4):
+            for y in range(6):
+                self.opaque.set_at((x, y), (x * 60, 9, y * 40))
+        pygame.image.save(self.alpha, self.resource(constants.GRAPHICS_DIR, 'alpha.png'))
+        pygame.image.save(self.opaque, self.resource(constants.GRAPHICS_DIR, 'opaque.png'))
+
+        wav = wave.open(self.resource(constants.SOUNDS_DIR, 'beep.wav'), 'wb')
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(22050)
+        wav.writeframes(bytes(range(200)) * 10)
+        wav.close()
+
+        shutil.copy(font_name, self.resource(constants.FONTS_DIR, FONT_FILE))
+        with open(self.resource(constants.TEXTS_DIR, 'notes.txt'), 'wb') as fout:
+            fout.write(b'0123456789' * 100)
+
+        self.assertEqual(build_pack('test.pack', FILES), 5)
+        self.pack = AssetPack('test.pack')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    def resource(self, dir, filename):
+        return os.path.join(constants.RESOURCES_DIR, dir, filename)
+
+    def assertSamePixels(self, image, expected):
+        self.assertEqual(image.get_size(), expected.get_size())
+        for x in range(expected.get_width()):
+            for y in range(expected.get_height()):
+                self.assertEqual(image.get_at((x, y)), expected.get_at((x, y)))
+
+    def test_images(self):
+        '''the packed pixels should be the ones of the image files'''
+        for name, expected in (('alpha.png', self.alpha), ('opaque.png', self.opaque)):
+            self.assertSamePixels(self.pack.load_image(name), expected)
+        self.assertTrue(self.pack.load_image('missing.png') is None)
+
+    def test_sound(self):
+        '''the packed samples should be used only in the mixer's format'''
+        loose = pygame.mixer.Sound(self.resource(constants.SOUNDS_DIR, 'beep.wav'))
+        sound = self.pack.load_sound('beep.wav')
+        self.assertEqual(sound.get_raw(), loose.get_raw())
+
+        entry = self.pack.index[entry_name(constants.SOUNDS_DIR, 'beep.wav')]
+        entry[3]['mixer'] = [11025, 8, 1]
+        self.assertTrue(self.pack.load_sound('beep.wav') is None)
+
+    def test_blobs(self):
+        '''the packed files should read (and seek) like the files'''
+        fin = self.pack.open_file(constants.TEXTS_DIR, 'notes.txt')
+        self.assertEqual(fin.read(4), b'0123')
+        fin.seek(-3, os.SEEK_END)
+        self.assertEqual(fin.read(), b'789')
+        fin.seek(995)
+        buffer = bytearray(10)
+        self.assertEqual(fin.readinto(buffer), 5)
+        self.assertEqual(bytes(buffer[:5]), b'56789')
+        self.assertEqual(fin.tell(), 1000)
+
+        pygame.font.init()
+        font = pygame.font.Font(self.pack.open_file(constants.FONTS_DIR, FONT_FILE), 30)
+        loose = pygame.font.Font(self.resource(constants.FONTS_DIR, FONT_FILE), 30)
+        self.assertSamePixels(font.render('Tracer', True, (0, 0, 0)),
+                              loose.render('Tracer', True, (0, 0, 0)))
+
+    def test_changed_files(self):
+        '''changed resources should be read from their files'''
+        name = self.resource(constants.TEXTS_DIR, 'notes.txt')
+        with open(name, 'ab') as fout:
+            fout.write(b'more')
+        self.assertTrue(self.pack.open_file(constants.TEXTS_DIR, 'notes.txt') is None)
+
+        # touched only (same size)
+        name = self.resource(constants.GRAPHICS_DIR, 'alpha.png')
+        st = os.stat(name)
+        os.utime(name, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        self.assertTrue(self.pack.load_image('alpha.png') is None)
+
+        # shipped without the resource files
+        os.remove(self.resource(constants.GRAPHICS_DIR, 'opaque.png'))
+        self.assertSamePixels(self.pack.load_image('opaque.png'), self.opaque)
+
+if __name__ == '__main__':
+    unittest.main()
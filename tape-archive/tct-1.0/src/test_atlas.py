@@ -0,0 +1,98 @@
+try:
+    import unittest
+    import pygame
+    import constants, graphics
+    from atlas import shelf_pack
+    from menu import MENU_ATLAS_FILES
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+class ShelfPacking(unittest.TestCase):
+    '''Tests related with the layout of the texture atlas.'''
+
+    sizes = {'frame': (800, 600), 'box': (290, 200), 'cursor': (48, 48),
+             'focus': (35, 20), 'anim0': (129, 175), 'anim1': (84, 29)}
+
+    def test_no_overlap(self):
+        '''packed rectangles should never overlap'''
+        rects, height = shelf_pack(self.sizes, 800)
+        names = sorted(rects)
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                self.assertFalse(rects[a].colliderect(rects[b]), (a, b))
+
+    def test_within_area(self):
+        '''packed rectangles should fit in the width and the returned height'''
+        rects, height = shelf_pack(self.sizes, 800)
+        for name, rect in rects.items():
+            self.assertEqual(rect.size, self.sizes[name])
+            self.assertTrue(rect.right <= 800 and rect.bottom <= height)
+        self.assertEqual(height, 800)
+
+CURSOR = constants.FILES['graphics']['menu']['share']['cursor'][0]
+
+class MenuAtlas(unittest.TestCase):
+    '''Tests related with loading the menu graphics from the atlas.'''
+
+    def setUp(self):
+        # the images are converted to the display format
+        pygame.display.init()
+        pygame.display.set_mode((8, 8))
+        self.forget()
+
+    def tearDown(self):
+        self.forget()
+
+    def forget(self):
+        graphics.image_cache.discard(('atlas', constants.MENU_DIR))
+        for filename in MENU_ATLAS_FILES:
+            graphics.image_cache.discard(graphics.image_key(filename))
+
+    def load_originals(self):
+        originals = dict((filename, graphics.load_image(filename)[0])
+                         for filename in MENU_ATLAS_FILES)
+        self.forget()
+        return originals
+
+    def pixels(self, image):
+        # the image as it is blitted (with its colorkey)
+        surface = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+        surface.blit(image, (0, 0))
+        return pygame.image.tobytes(surface, 'RGBA')
+
+    def test_subsurfaces(self):
+        '''the transparent images should be subsurfaces of one surface'''
+        originals = self.load_originals()
+        atlas = graphics.build_atlas(constants.MENU_DIR, MENU_ATLAS_FILES)
+
+        for filename, original in originals.items():
+            image = graphics.load_image(filename)[0]
+            if original.get_alpha() is None and original.get_colorkey() is None:
+                self.assertTrue(image.get_parent() is None, filename)
+            else:
+                self.assertTrue(image.get_parent() is atlas, filename)
+            self.assertEqual(self.pixels(image), self.pixels(original), filename)
+
+        # the shared graphics (the cursor) are packed too
+        self.assertTrue(graphics.load_image(CURSOR)[0].get_parent() is atlas)
+
+    def test_cursor(self):
+        '''the cursor should be drawn from the atlas like from its own surface'''
+        original = self.load_originals()[CURSOR]
+        graphics.build_atlas(constants.MENU_DIR, MENU_ATLAS_FILES)
+
+        drawn = []
+        for cursor in (original, graphics.load_image(CURSOR)[0]):
+            screen = pygame.Surface((100, 100))
+            graphics.handle_mouse_cursor(cursor, screen)
+            drawn.append(pygame.image.tobytes(screen, 'RGB'))
+        self.assertEqual(drawn[0], drawn[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+try:
+    import unittest
+    from cache import LRUCache
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+class Eviction(unittest.TestCase):
+    '''Tests related with the size budget of the LRU cache.'''
+
+    def setUp(self):
+        self.cache = LRUCache(10, len)
+
+    def test_least_recently_used_first(self):
+        '''the least recently used entry should be evicted first'''
+        self.cache.put('a', 'xxxx')
+        self.cache.put('b', 'xxxx')
+        self.cache.get('a')
+        self.cache.put('c', 'xxxx')
+        self.assertTrue('a' in self.cache)
+        self.assertFalse('b' in self.cache)
+        self.assertEqual(self.cache.size, 8)
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_pinned_never_evicted(self):
+        '''pinned entries should survive until they are unpinned'''
+        self.cache.put('a', 'xxxxxx')
+        self.cache.pin('a')
+        self.cache.put('b', 'xxxxxx')
+        self.cache.put('c', 'xxxxxx')
+        self.assertTrue('a' in self.cache)
+        self.assertFalse('b' in self.cache)
+        self.cache.unpin('a')
+        self.assertFalse('a' in self.cache)
+        self.assertTrue('c' in self.cache)
+
+    def test_pinned_outside_budget(self):
+        '''pinned entries over the budget should not evict the unpinned ones'''
+        self.cache.pin('a')
+        self.cache.put('a', 'x' * 20)
+        self.cache.put('b', 'xxxx')
+        self.assertTrue('b' in self.cache)
+        self.assertEqual((self.cache.size, self.cache.pinned_size), (24, 20))
+        self.cache.discard('a')
+        self.assertEqual((self.cache.size, self.cache.pinned_size), (4, 0))
+
+    def test_pins_are_counted(self):
+        '''an entry pinned twice should need two unpins'''
+        self.cache.put('a', 'x')
+        self.cache.pin('a')
+        self.cache.pin('a')
+        self.cache.unpin('a')
+        self.assertTrue(self.cache.is_pinned('a'))
+        self.cache.unpin('a')
+        self.assertFalse(self.cache.is_pinned('a'))
+
+    def test_replace_updates_size(self):
+        '''replacing an entry should not count its old size'''
+        self.cache.put('a', 'xxxx')
+        self.cache.put('a', 'xx')
+        self.assertEqual(self.cache.size, 2)
+
+class Counters(unittest.TestCase):
+    '''Tests related with the hit/miss statistics of the LRU cache.'''
+
+    def test_hits_and_misses(self):
+        '''get should count the hits and the misses'''
+        cache = LRUCache(10)
+        self.assertEqual(cache.get('a'), None)
+        cache.put('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
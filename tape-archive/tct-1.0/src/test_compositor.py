@@ -0,0 +1,71 @@
+try:
+    import unittest
+    import pygame
+    from compositor import *
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+SCREEN = pygame.Rect(0, 0, 200, 100)
+
+class DirtyRects(unittest.TestCase):
+    '''Tests related with redrawing only the changed regions.'''
+
+    def setUp(self):
+        self.screen = pygame.Surface(SCREEN.size)
+        background = pygame.Surface(SCREEN.size)
+        background.fill((0, 0, 255))
+        frame = pygame.Surface((50, 50))
+        frame.fill((0, 255, 0))
+        cursor = pygame.Surface((10, 10))
+        cursor.fill((255, 0, 0))
+
+        self.compositor = Compositor(self.screen, background)
+        self.compositor.add(StaticSprite(frame, (100, 20)), 1)
+        self.cursor = CursorSprite(cursor)
+        self.move_cursor((20, 20))
+        self.compositor.add(self.cursor, 2)
+
+    def move_cursor(self, pos):
+        # what CursorSprite.update does with the mouse position
+        self.cursor.rect.center = pos
+        self.cursor.dirty = 1
+
+    def test_first_frame(self):
+        '''the first frame should redraw the whole screen'''
+        self.assertEqual(self.compositor.draw(), [SCREEN])
+        self.assertEqual(self.screen.get_at((120, 40)), (0, 255, 0))
+        self.assertEqual(self.screen.get_at((20, 20)), (255, 0, 0))
+
+    def test_static_frame(self):
+        '''a frame without changes should redraw nothing'''
+        self.compositor.draw()
+        self.assertEqual(self.compositor.draw(), [])
+        self.assertEqual(self.compositor.draw(), [])
+
+    def test_cursor_moved(self):
+        '''a moved cursor should redraw only where it was and where it is'''
+        self.compositor.draw()
+        self.move_cursor((60, 70))
+        rects = self.compositor.draw()
+        self.assertEqual(sorted(tuple(rect) for rect in rects),
+                         [(15, 15, 10, 10), (55, 65, 10, 10)])
+        self.assertEqual(self.screen.get_at((20, 20)), (0, 0, 255))
+        self.assertEqual(self.screen.get_at((60, 70)), (255, 0, 0))
+
+        # and nothing more once it stopped
+        self.assertEqual(self.compositor.draw(), [])
+
+    def test_repaint(self):
+        '''a repaint should redraw the whole screen again'''
+        self.compositor.draw()
+        self.compositor.repaint()
+        self.assertEqual(self.compositor.draw(), [SCREEN])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+try:
+    import os, tempfile, unittest
+    from credits_layout import CreditsLayout
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+class CompiledFile(unittest.TestCase):
+    '''Tests related with the compiled credits layout.'''
+
+    lines = [(0, 1, 'The Crime Tracer'), (60, 0, ''), (120, 3, 'Sakis Kasampalis')]
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.layout')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_round_trip(self):
+        '''a saved layout should load back the same lines'''
+        CreditsLayout.compile(self.lines, 180).save(self.filename, b'a' * 20)
+        layout = CreditsLayout.load(self.filename, b'a' * 20)
+        self.assertEqual([layout.line(i) for i in range(len(layout))], self.lines)
+        self.assertEqual(layout.height, 180)
+
+    def test_stale(self):
+        '''a layout compiled from another source should not load'''
+        CreditsLayout.compile(self.lines, 180).save(self.filename, b'a' * 20)
+        self.assertEqual(CreditsLayout.load(self.filename, b'b' * 20), None)
+
+    def test_truncated(self):
+        '''a damaged layout should not load'''
+        CreditsLayout.compile(self.lines, 180).save(self.filename, b'a' * 20)
+        with open(self.filename, 'r+b') as fout:
+            fout.truncate(os.path.getsize(self.filename) - 3)
+        self.assertEqual(CreditsLayout.load(self.filename, b'a' * 20), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+try:
+    import unittest
+    import pygame
+    import constants, graphics
+    from fsm import State, FSM
+    from game_manager import GameManager
+    from preloader import AssetPreloader
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+class RecordingState(State):
+    '''A state which records what is done to it.'''
+
+    def __init__(self, name, log):
+        State.__init__(self, name)
+        self.log = log
+        self.log.append(('created', name))
+
+    def entry_actions(self):
+        self.log.append(('entered', self.name))
+
+    def exit_actions(self):
+        self.log.append(('exited', self.name))
+
+class Lifecycle(unittest.TestCase):
+    '''Tests related with the states made by factories.'''
+
+    def setUp(self):
+        self.log = []
+        self.fsm = FSM()
+        for name in ('intro', 'menu'):
+            self.fsm.add_factory(name, lambda name=name: RecordingState(name, self.log))
+        self.fsm.add_transition('intro', 'menu')
+        self.fsm.add_transition('menu', 'intro')
+        self.fsm.add_observer(lambda state: self.log.append(('on enter', state.name)),
+                              lambda state: self.log.append(('on exit', state.name)))
+
+    def test_created_on_entry(self):
+        '''a state should be made right before it is entered'''
+        self.assertEqual(self.fsm.states, {})
+        self.fsm.set_state('intro')
+        self.assertEqual(self.log, [('created', 'intro'), ('entered', 'intro'),
+                                    ('on enter', 'intro')])
+        self.assertEqual(list(self.fsm.states), ['intro'])
+
+    def test_dropped_after_exit(self):
+        '''a state should be dropped after its exit actions'''
+        self.fsm.set_state('intro')
+        intro = self.fsm.active_state
+        del self.log[:]
+
+        self.fsm.set_state('menu')
+        self.assertEqual(self.log, [('exited', 'intro'), ('on exit', 'intro'),
+                                    ('created', 'menu'), ('entered', 'menu'),
+                                    ('on enter', 'menu')])
+        self.assertEqual(list(self.fsm.states), ['menu'])
+
+        # entered again, it is a new state
+        self.fsm.set_state('intro')
+        self.assertFalse(self.fsm.active_state is intro)
+
+    def test_added_states_kept(self):
+        '''a state added as an instance should never be dropped'''
+        self.fsm.add_state(RecordingState('credits', self.log))
+        self.fsm.add_transition('intro', 'credits')
+        self.fsm.add_transition('credits', 'intro')
+        self.fsm.set_state('credits')
+        credits = self.fsm.active_state
+        self.fsm.set_state('intro')
+        self.fsm.set_state('credits')
+        self.assertTrue(self.fsm.active_state is credits)
+
+    def test_transitions(self):
+        '''only the declared transitions should be allowed'''
+        self.assertEqual(self.fsm.successors('intro'), ['menu'])
+        self.assertEqual(self.fsm.successors('unknown'), [])
+        self.fsm.set_state('intro')
+        self.assertRaises(AssertionError, self.fsm.set_state, 'intro')
+
+class SceneResources(unittest.TestCase):
+    '''Tests related with what the game manager does on the scene switches.'''
+
+    def setUp(self):
+        # the observers only, without creating the scenes
+        self.manager = object.__new__(GameManager)
+        self.manager.memory_peaks = {}
+        self.manager.memory_base = 0
+        self.manager.preloader = AssetPreloader(lambda scene: [], {})
+
+        self.scene = State(constants.SCENES['menu'])
+        self.keys = [graphics.image_key(filename) for filename in
+                     constants.SCENE_FILES[self.scene.name]['graphics']]
+
+    def tearDown(self):
+        graphics.image_cache.discard(('test', 'big'))
+        graphics.image_cache.discard(('test', 'small'))
+        graphics.image_cache.discard(('test', 'before'))
+
+    def test_pinned_while_active(self):
+        '''the scene's images should be pinned while it is active'''
+        self.manager._scene_entered(self.scene)
+        for key in self.keys:
+            self.assertTrue(graphics.image_cache.is_pinned(key))
+
+        self.manager._scene_exited(self.scene)
+        for key in self.keys:
+            self.assertFalse(graphics.image_cache.is_pinned(key))
+
+    def test_memory_peaks(self):
+        '''the largest cache growth of each scene should be kept'''
+        # what was cached before the scene isn't counted
+        graphics.image_cache.put(('test', 'before'), pygame.Surface((200, 200), 0, 32))
+        self.manager._reset_memory_peak()
+        self.manager._scene_entered(self.scene)
+        graphics.image_cache.put(('test', 'big'), pygame.Surface((100, 100), 0, 32))
+        graphics.image_cache.discard(('test', 'big'))
+        self.manager._scene_exited(self.scene)
+
+        peak = self.manager.memory_peaks[self.scene.name]
+        self.assertEqual(peak, 40000)
+        self.assertEqual(graphics.image_cache.peak, graphics.image_cache.size)
+        self.assertEqual(self.manager.memory_base, graphics.image_cache.size)
+
+        # a smaller peak the next time doesn't replace it
+        self.manager._scene_entered(self.scene)
+        graphics.image_cache.put(('test', 'small'), pygame.Surface((10, 10), 0, 32))
+        self.manager._scene_exited(self.scene)
+        self.assertEqual(self.manager.memory_peaks[self.scene.name], peak)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+try:
+    import unittest
+    import pygame
+    import constants, graphics
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+# the font of the credits (the one rendered through a glyph atlas)
+FONT_FILE = constants.FILES['fonts']['menu']['share'][3]
+
+class Glyphs(unittest.TestCase):
+    '''Tests related with the glyph atlas of a font.'''
+
+    def setUp(self):
+        pygame.font.init()
+
+    def assertSameText(self, font, text, color):
+        expected = font.render(text, True, color)
+        rendered = graphics.get_glyph_atlas(font).render(text, color)
+        self.assertEqual(rendered.get_size(), expected.get_size())
+        for x in range(expected.get_width()):
+            for y in range(expected.get_height()):
+                pixel = expected.get_at((x, y))
+                # the color of fully transparent pixels doesn't matter
+                if pixel.a:
+                    self.assertEqual(rendered.get_at((x, y)), pixel, (text, x, y))
+                else:
+                    self.assertEqual(rendered.get_at((x, y)).a, 0, (text, x, y))
+
+    def test_like_font_render(self):
+        '''a string should look like the font renders it (kerning included)'''
+        for size in (40, 50):
+            font = graphics.load_font(FONT_FILE, size)
+            self.assertSameText(font, 'Credits', pygame.Color('black'))
+            self.assertSameText(font, 'The Crime Tracer', pygame.Color('brown'))
+
+    def test_glyphs_cached(self):
+        '''each character of a color should be rendered once'''
+        atlas = graphics.GlyphAtlas(graphics.load_font(FONT_FILE, 30))
+        atlas.render('Tracer', (0, 0, 0))
+        atlas.render('race', (0, 0, 0))
+        atlas.render('race', (255, 0, 0))
+        self.assertEqual(len(atlas.glyphs), 9)
+
+    def test_empty(self):
+        '''an empty string should give an empty (but valid) surface'''
+        font = graphics.load_font(FONT_FILE, 30)
+        surface = graphics.get_glyph_atlas(font).render('', (0, 0, 0))
+        self.assertEqual(surface.get_size(), (0, font.get_height()))
+
+    def test_lines_cached(self):
+        '''a string of a color should be composed once'''
+        atlas = graphics.GlyphAtlas(graphics.load_font(FONT_FILE, 30))
+        line = atlas.render('Tracer', (0, 0, 0))
+        self.assertTrue(atlas.render('Tracer', (0, 0, 0)) is line)
+        self.assertFalse(atlas.render('Tracer', (255, 0, 0)) is line)
+
+class Fonts(unittest.TestCase):
+    '''Tests related with the font registry.'''
+
+    def setUp(self):
+        pygame.font.init()
+
+    def test_shared(self):
+        '''the same file and size should give the same font'''
+        font = graphics.load_font(FONT_FILE, 20)
+        self.assertTrue(graphics.load_font(FONT_FILE, 20) is font)
+        self.assertFalse(graphics.load_font(FONT_FILE, 21) is font)
+        self.assertTrue(graphics.get_glyph_atlas(font) is
+                        graphics.get_glyph_atlas(graphics.load_font(FONT_FILE, 20)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+try:
+    import unittest
+    from intro_cut_scene import SlideTimeline, MAX_ALPHA, linear
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+class Timeline(unittest.TestCase):
+    '''Tests related with the timing of the intro slides.'''
+
+    timeline = SlideTimeline(fade=1.0, presence=4.0)
+
+    def test_fades(self):
+        '''a slide should fade in, stay and fade out in time'''
+        self.assertEqual(self.timeline.alpha(0.0), MAX_ALPHA)
+        self.assertEqual(self.timeline.alpha(1.0), 0)
+        self.assertEqual(self.timeline.alpha(3.0), 0)
+        self.assertEqual(self.timeline.alpha(6.0), MAX_ALPHA)
+        self.assertEqual(self.timeline.duration, 6.0)
+
+    def test_still(self):
+        '''only the presence of a slide should be still'''
+        self.assertTrue(self.timeline.is_changing(0.5, 0.1))
+        self.assertFalse(self.timeline.is_changing(2.0, 0.1))
+        self.assertTrue(self.timeline.is_changing(4.95, 0.1))
+
+    def test_skip(self):
+        '''skipping should fade out from the current alpha'''
+        timeline = SlideTimeline(fade=1.0, presence=4.0, easing=linear)
+        skipped = timeline.skip(0.25)
+        self.assertEqual(timeline.alpha(skipped), timeline.alpha(0.25))
+        self.assertEqual(timeline.skip(2.0), 5.0)
+        self.assertEqual(timeline.skip(5.5), 5.5)
+
+if __name__ == '__main__':
+    unittest.main()
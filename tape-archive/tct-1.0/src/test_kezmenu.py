@@ -0,0 +1,58 @@
+try:
+    import os, unittest
+    import pygame
+    import constants
+    from kezmenu import KezMenu
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+# code required to make the test work (even without a sound card)
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+class GameOptions(object):
+    sound = False
+
+class LabelCache(unittest.TestCase):
+    '''Tests related with the rendered labels of the menu.'''
+
+    def setUp(self):
+        # other tests may have quit the display
+        pygame.init()
+        self.screen = pygame.display.set_mode(
+            (constants.SCREEN_WIDTH, constants.SCREEN_HEIGHT), 0)
+        self.menu = KezMenu(GameOptions(), ['Play', None], ['Quit', None])
+
+    def test_reused(self):
+        '''drawing again without changes should not render the labels again'''
+        self.menu.draw(self.screen)
+        rendered = dict(self.menu._label_cache)
+        self.menu.draw(self.screen)
+        self.assertEqual(len(rendered), 2)
+        for key, ren in self.menu._label_cache.items():
+            self.assertTrue(ren is rendered[key])
+
+    def test_invalidated(self):
+        '''changing a color should render the labels again'''
+        self.menu.draw(self.screen)
+        self.menu.set_normal_color(self.menu.normal_color)
+        self.assertEqual(len(self.menu._label_cache), 2)
+        self.menu.set_normal_color(pygame.Color('white'))
+        self.assertEqual(len(self.menu._label_cache), 0)
+
+    def test_label_rects(self):
+        '''the labels' rectangles should follow the menu's position'''
+        self.menu.set_position(100, 50)
+        self.menu.draw(self.screen)
+        self.assertEqual(self.menu.options[0]['label_rect'].topleft, (100, 50))
+        self.menu.screen_topleft_offset = (10, 20)
+        self.menu.draw(self.screen)
+        self.assertEqual(self.menu.options[0]['label_rect'].topleft, (110, 70))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+try:
+    import io, unittest
+    import logger
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+class Levels(unittest.TestCase):
+    '''Tests related with the levels and the buffering of the log.'''
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        logger.flush()
+
+    def tearDown(self):
+        logger.configure()
+
+    def test_levels(self):
+        '''only the messages of the level and above should be written'''
+        logger.configure(logger.INFO, self.stream)
+        logger.debug('hidden')
+        logger.info('{0} scene', 'menu')
+        logger.error('failed')
+        logger.flush()
+        self.assertEqual(self.stream.getvalue(),
+                         'info: menu scene\nerror: failed\n')
+
+    def test_verbosity(self):
+        '''each -v option should show a more verbose level'''
+        self.assertEqual(logger.verbosity_level(0), logger.WARNING)
+        self.assertEqual(logger.verbosity_level(1), logger.INFO)
+        self.assertEqual(logger.verbosity_level(5), logger.DEBUG)
+
+    def test_ring(self):
+        '''a full buffer should drop the oldest messages'''
+        logger.configure(logger.WARNING, self.stream, capacity=2)
+        # keep the writer thread from writing meanwhile
+        with logger._write_lock:
+            for i in range(3):
+                logger.warning('{0}', i)
+        logger.flush()
+        self.assertEqual(self.stream.getvalue().splitlines(),
+                         ['warning: 1', 'warning: 2',
+                          'warning: 1 messages dropped'])
+
+if __name__ == '__main__':
+    unittest.main()
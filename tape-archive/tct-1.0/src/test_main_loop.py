@@ -0,0 +1,131 @@
+try:
+    import asyncio, os, unittest
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import constants, pygame, tasks
+    from mvc import EventManager
+    from tct import MainController
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+class FakeClock(object):
+    '''A clock whose ticks always last the same time.'''
+
+    def __init__(self, ms):
+        self.ms = ms
+        self.rates = []
+
+    def tick(self, framerate=0):
+        self.rates.append(framerate)
+        return self.ms
+
+class FakeScene(object):
+    '''Records how the main loop calls a scene.'''
+
+    def __init__(self, idle=False):
+        self.idle = idle
+        self.updates = []
+        self.alphas = []
+
+    def handle_events(self, events):
+        pass
+
+    def update(self, dt):
+        self.updates.append(dt)
+
+    def render(self, alpha):
+        self.alphas.append(alpha)
+        return []
+
+    def is_idle(self):
+        return self.idle
+
+class FixedStep(unittest.TestCase):
+    '''Tests related with the fixed time step of the main loop.'''
+
+    def setUp(self):
+        pygame.display.init()
+        self.step = 1.0 / constants.UPDATE_RATE
+
+    def tearDown(self):
+        pygame.display.quit()
+
+    def run_frames(self, scene, ms, frames):
+        controller = MainController(EventManager(), None, scene)
+        controller.clock = FakeClock(ms)
+        for i in range(frames):
+            controller.run_frame()
+        return controller
+
+    def test_steps(self):
+        '''the updates should simulate the time passed in fixed steps'''
+        scene = FakeScene()
+        self.run_frames(scene, 1000 * self.step * 2.5, 4)
+        self.assertEqual(len(scene.updates), 10)
+        self.assertTrue(all(dt == self.step for dt in scene.updates))
+
+    def test_interpolation(self):
+        '''each frame should be drawn between the last two updates'''
+        scene = FakeScene()
+        self.run_frames(scene, 1000 * self.step * 0.5, 4)
+        self.assertEqual(len(scene.updates), 2)
+        self.assertEqual(len(scene.alphas), 4)
+        self.assertTrue(all(0.0 <= alpha < 1.0 for alpha in scene.alphas))
+
+    def test_stall(self):
+        '''a long stall should not be simulated in full'''
+        scene = FakeScene()
+        self.run_frames(scene, 10000, 1)
+        self.assertTrue(len(scene.updates) * self.step <=
+                        constants.MAX_FRAME_TIME)
+
+    def test_idle(self):
+        '''a still scene should be drawn at a lower frame rate'''
+        controller = self.run_frames(FakeScene(idle=True), 100, 1)
+        self.assertEqual(controller.clock.rates, [constants.IDLE_FRAME_RATE])
+
+class AsyncLoop(unittest.TestCase):
+    '''Tests related with the main loop on an asyncio event loop.'''
+
+    def setUp(self):
+        pygame.display.init()
+
+    def tearDown(self):
+        pygame.display.quit()
+
+    def test_background(self):
+        '''background tasks should run between the frames'''
+        done = []
+        scene = FakeScene()
+        controller = MainController(EventManager(), None, scene)
+        controller.clock = FakeClock(1000.0 / constants.UPDATE_RATE)
+
+        async def task():
+            done.append(len(scene.alphas))
+
+        def render(alpha):
+            if len(scene.alphas) == 1:
+                tasks.spawn(task())
+                tasks.run_in_background(done.append, 'blocking')
+            scene.alphas.append(alpha)
+            # stop once the tasks are done
+            controller.main_loop_running = len(done) < 2
+            return []
+
+        scene.render = render
+        asyncio.run(controller.run_async())
+        self.assertEqual(sorted(done, key=str), [2, 'blocking'])
+        self.assertFalse(tasks.is_running())
+
+    def test_without_loop(self):
+        '''without an event loop the work should be done right away'''
+        self.assertEqual(tasks.run_in_background(max, 1, 2), 2)
+
+if __name__ == '__main__':
+    unittest.main()
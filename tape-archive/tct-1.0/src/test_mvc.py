@@ -0,0 +1,94 @@
+try:
+    import gc, unittest
+    from mvc import (Event, EventManager, TickEvent, QuitEvent, EscapeEvent,
+                     ReturnEvent)
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+class Listener(object):
+    '''Records the events it is notified about.'''
+
+    def __init__(self):
+        self.events = []
+
+    def notify(self, event):
+        self.events.append(event)
+
+class Dispatch(unittest.TestCase):
+    '''Tests related with the typed dispatch of the event manager.'''
+
+    def setUp(self):
+        self.manager = EventManager()
+
+    def test_typed(self):
+        '''a listener should get only the events it subscribed to'''
+        quit, tick = Listener(), Listener()
+        self.manager.register_listener(quit, QuitEvent)
+        self.manager.register_listener(tick, TickEvent)
+        self.manager.post(TickEvent())
+        self.assertEqual(len(quit.events), 0)
+        self.assertEqual(len(tick.events), 1)
+
+    def test_base_types(self):
+        '''subscribing to a type should subscribe to its subtypes'''
+        every, keys = Listener(), Listener()
+        self.manager.register_listener(every)
+        self.manager.register_listener(keys, EscapeEvent, ReturnEvent)
+        for event in (TickEvent(), EscapeEvent(), ReturnEvent()):
+            self.manager.post(event)
+        self.assertEqual(len(every.events), 3)
+        self.assertEqual(len(keys.events), 2)
+
+    def test_register_later(self):
+        '''a listener should get the events posted after it registered'''
+        first, second = Listener(), Listener()
+        self.manager.register_listener(first, TickEvent)
+        self.manager.post(TickEvent())
+        self.manager.register_listener(second, TickEvent)
+        self.manager.post(TickEvent())
+        self.manager.unregister_listener(first)
+        self.manager.post(TickEvent())
+        self.assertEqual(len(first.events), 2)
+        self.assertEqual(len(second.events), 2)
+
+    def test_dead_listener(self):
+        '''a garbage collected listener should not be notified'''
+        listener = Listener()
+        self.manager.register_listener(listener, TickEvent)
+        self.manager.post(TickEvent())
+        del listener
+        gc.collect()
+        self.manager.post(TickEvent())
+        self.assertEqual(len(self.manager.listeners), 0)
+
+    def test_queue(self):
+        '''queued events should wait until they are dispatched'''
+        listener = Listener()
+        self.manager.register_listener(listener, TickEvent)
+        self.manager.queue(TickEvent())
+        self.assertEqual(len(listener.events), 0)
+        self.manager.dispatch_queued()
+        self.assertEqual(len(listener.events), 1)
+
+class Events(unittest.TestCase):
+    '''Tests related with the event objects.'''
+
+    def test_flyweight(self):
+        '''payload-free events should be shared instances'''
+        self.assertTrue(TickEvent() is TickEvent())
+        self.assertFalse(TickEvent() is QuitEvent())
+        self.assertEqual(str(QuitEvent()), 'Program Quit Event')
+
+    def test_slots(self):
+        '''events should have no attribute dictionary'''
+        self.assertFalse(hasattr(TickEvent(), '__dict__'))
+        self.assertRaises(AttributeError, setattr, EscapeEvent(), 'key', 1)
+
+if __name__ == '__main__':
+    unittest.main()
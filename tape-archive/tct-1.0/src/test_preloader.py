@@ -0,0 +1,160 @@
+try:
+    import asyncio, os, unittest
+    import pygame
+    import constants, graphics, sound_mixer, tasks
+    from preloader import AssetPreloader
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+ICON = constants.FILES['graphics']['window']['icon'][0]
+CURSOR = constants.FILES['graphics']['menu']['share']['cursor'][0]
+FOCUS = constants.FILES['sounds']['menu']['share']['focus'][0]
+
+def forget_image(filename):
+    '''Drop an image from the cache and the stash.'''
+    graphics.image_cache.discard(graphics.image_key(filename))
+    graphics._decoded_images.pop(filename, None)
+
+class Preloader(unittest.TestCase):
+    '''Tests related with decoding the upcoming scenes in the background.'''
+
+    def setUp(self):
+        for filename in (ICON, CURSOR):
+            forget_image(filename)
+        flow = {'first': ['second'], 'second': ['third']}
+        files = {'second': {'graphics': (ICON,), 'sounds': ()},
+                 'third': {'graphics': (CURSOR,), 'sounds': ()}}
+        self.preloader = AssetPreloader(lambda scene: flow.get(scene, []), files)
+
+    def tearDown(self):
+        self.preloader.wait()
+        for filename in (ICON, CURSOR):
+            forget_image(filename)
+
+    def test_warm(self):
+        '''the scenes following a scene (only) should be decoded'''
+        self.preloader.warm('first')
+        self.preloader.wait()
+        self.assertTrue(graphics.is_image_loaded(ICON))
+        self.assertFalse(graphics.is_image_loaded(CURSOR))
+        self.assertEqual(self.preloader.warmed, set(['second']))
+
+        # nothing follows the last scene
+        self.preloader.warm('third')
+        self.preloader.wait()
+        self.assertFalse(graphics.is_image_loaded(CURSOR))
+
+    def test_forget(self):
+        '''a scene should be warmed again only after it is forgotten'''
+        self.preloader.warm('first')
+        self.preloader.wait()
+        forget_image(ICON)
+
+        self.preloader.warm('first')
+        self.preloader.wait()
+        self.assertFalse(graphics.is_image_loaded(ICON))
+
+        self.preloader.forget('second')
+        self.preloader.warm('first')
+        self.preloader.wait()
+        self.assertTrue(graphics.is_image_loaded(ICON))
+
+    def test_event_loop(self):
+        '''with an event loop the resources should be decoded on its pool'''
+        async def warm():
+            tasks.start(asyncio.get_running_loop())
+            try:
+                self.preloader.warm('first')
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self.preloader.wait)
+            finally:
+                tasks.stop()
+
+        asyncio.run(warm())
+        self.assertTrue(self.preloader.worker is None)
+        self.assertTrue(graphics.is_image_loaded(ICON))
+
+    def test_before_event_loop(self):
+        '''without a thread the requests should wait for the event loop'''
+        preloader = AssetPreloader(self.preloader.successors,
+                                   self.preloader.files, threaded=False)
+        preloader.warm('first')
+        self.assertTrue(preloader.worker is None)
+        self.assertFalse(graphics.is_image_loaded(ICON))
+
+        async def dispatch():
+            tasks.start(asyncio.get_running_loop())
+            try:
+                preloader.dispatch()
+                await asyncio.get_running_loop().run_in_executor(
+                    None, preloader.wait)
+            finally:
+                tasks.stop()
+
+        asyncio.run(dispatch())
+        self.assertTrue(preloader.worker is None)
+        self.assertTrue(graphics.is_image_loaded(ICON))
+
+    def test_sounds(self):
+        '''a sound loaded by both threads should be registered once'''
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        sound_mixer.sound_registry.pop(FOCUS, None)
+        preloader = AssetPreloader(lambda scene: ['second'],
+                                   {'second': {'graphics': (), 'sounds': (FOCUS,)}})
+        preloader.warm('first')
+        sound = sound_mixer.load_sound(FOCUS)
+        preloader.wait()
+        self.assertTrue(sound_mixer.sound_registry[FOCUS] is sound)
+        self.assertTrue(sound_mixer.load_sound(FOCUS) is sound)
+
+class Stash(unittest.TestCase):
+    '''Tests related with handing over the decoded images.'''
+
+    def setUp(self):
+        # the images are converted to the display format
+        pygame.display.init()
+        pygame.display.set_mode((8, 8))
+        forget_image(ICON)
+
+    def tearDown(self):
+        graphics.decode_image = self.decode_image
+        forget_image(ICON)
+
+    decode_image = staticmethod(graphics.decode_image)
+
+    def test_handoff(self):
+        '''a stashed image should be converted once and then dropped'''
+        decoded = graphics.decode_image(ICON)
+        graphics.stash_image(ICON, decoded)
+        self.assertTrue(graphics.is_image_loaded(ICON))
+
+        image = graphics.load_image(ICON)[0]
+        self.assertFalse(ICON in graphics._decoded_images)
+        self.assertEqual(image.get_size(), decoded.get_size())
+        self.assertEqual(image.get_at((5, 5)), decoded.get_at((5, 5)))
+
+        # loaded images are not stashed
+        graphics.stash_image(ICON, decoded)
+        self.assertFalse(ICON in graphics._decoded_images)
+
+    def test_stashed_while_loading(self):
+        '''an image stashed while the same one is loaded should be dropped'''
+        def decode_and_stash(filename):
+            image = self.decode_image(filename)
+            graphics.stash_image(filename, image.copy())
+            return image
+        graphics.decode_image = decode_and_stash
+
+        graphics.load_image(ICON)
+        self.assertFalse(ICON in graphics._decoded_images)
+        self.assertTrue(graphics.is_image_loaded(ICON))
+
+if __name__ == '__main__':
+    unittest.main()
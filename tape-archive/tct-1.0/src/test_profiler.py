@@ -0,0 +1,105 @@
+try:
+    import time, unittest
+    from profiler import FrameProfiler
+    from fsm import State, FSM
+    from game_manager import GameManager
+    from preloader import AssetPreloader
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+class RingBuffer(unittest.TestCase):
+    '''Tests related with the frames kept by the profiler.'''
+
+    def test_keeps_last_frames(self):
+        '''only the last frames should be kept, oldest first'''
+        profiler = FrameProfiler('loop', ('update', 'draw'), capacity=3)
+        for i in range(5):
+            profiler.begin()
+            profiler.mark('update')
+            profiler.mark('draw')
+        self.assertEqual(profiler.frames, 5)
+        self.assertEqual([frame for frame, row in profiler.rows()], [2, 3, 4])
+
+    def test_marks_add_up(self):
+        '''marking a phase twice in a frame should add up its durations'''
+        profiler = FrameProfiler('loop', ('update', 'draw'), capacity=2)
+        profiler.begin()
+        profiler.mark('update')
+        profiler.mark('draw')
+        profiler.mark('update')
+        frame, row = profiler.rows()[0]
+        self.assertEqual(len(row), 2)
+        self.assertTrue(all(ms >= 0.0 for ms in row))
+
+    def test_resume(self):
+        '''the time before a resume should be left out'''
+        profiler = FrameProfiler('loop', ('update', 'draw'), capacity=2)
+        profiler.begin()
+        time.sleep(0.05)
+        profiler.resume()
+        profiler.mark('update')
+        frame, row = profiler.rows()[0]
+        self.assertTrue(row[0] < 40.0)
+
+class ProfiledScene(State):
+    '''A scene marking a phase in each of its callbacks.'''
+
+    def __init__(self, name):
+        State.__init__(self, name)
+        self.profiler = FrameProfiler(name, ('events', 'update', 'render'))
+
+    def handle_events(self, events):
+        self.profiler.mark('events')
+
+    def update(self, dt):
+        self.profiler.mark('update')
+
+    def render(self, alpha):
+        self.profiler.mark('render')
+        return []
+
+class SceneFrames(unittest.TestCase):
+    '''Tests related with timing the frames of the active scene.'''
+
+    def setUp(self):
+        # the game manager without the game's scenes
+        self.manager = object.__new__(GameManager)
+        self.manager.scene_profiler = None
+        self.manager.scenes = FSM()
+        self.manager.preloader = AssetPreloader(self.manager.scenes.successors, {})
+        for name in ('intro', 'menu'):
+            self.manager.scenes.add_state(ProfiledScene(name))
+        self.manager.scenes.add_transition('intro', 'menu')
+        self.manager.scenes.set_state('intro')
+
+    def run_frame(self, steps=2):
+        self.manager.handle_events([])
+        for i in range(steps):
+            self.manager.update(0.0)
+        self.manager.render(0.0)
+
+    def test_one_row_per_frame(self):
+        '''each frame of the scene should begin one row'''
+        for i in range(3):
+            self.run_frame()
+        intro = self.manager.scenes.states['intro']
+        self.assertEqual(intro.profiler.frames, 3)
+
+    def test_switched_during_frame(self):
+        '''a scene entered during a frame should begin its own row'''
+        self.run_frame()
+        self.manager.handle_events([])
+        self.manager.scenes.set_state('menu')
+        self.manager.update(0.0)
+        self.manager.render(0.0)
+        self.assertEqual(self.manager.scenes.states['intro'].profiler.frames, 2)
+        self.assertEqual(self.manager.scenes.states['menu'].profiler.frames, 1)
+
+if __name__ == '__main__':
+    unittest.main()
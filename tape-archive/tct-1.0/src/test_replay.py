@@ -0,0 +1,74 @@
+try:
+    import os, tempfile, unittest
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from replay import Recorder, Player, ReplayError
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+class InputLog(unittest.TestCase):
+    '''Tests related with the recorded input log.'''
+
+    def setUp(self):
+        pygame.display.init()
+        pygame.display.set_mode((8, 8))
+        fd, self.filename = tempfile.mkstemp(suffix='.rec')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.filename)
+        pygame.display.quit()
+
+    def test_round_trip(self):
+        '''a replayed log should give back the recorded input'''
+        pressed = [False] * len(pygame.key.get_pressed())
+        pressed[41] = True
+        recorder = Recorder(self.filename, 1234)
+        recorder.tick(16)
+        recorder.events([pygame.event.Event(pygame.KEYDOWN, key=pygame.K_c,
+                                            mod=0, unicode='c', scancode=6)])
+        recorder.keys(pressed)
+        recorder.mouse_pos((320, 200))
+        recorder.mouse_buttons((True, False, False))
+        recorder.tick(16)
+        recorder.events([])
+        recorder.close()
+
+        player = Player(self.filename)
+        self.assertEqual(player.seed, 1234)
+        self.assertEqual(player.tick(), 16)
+        event, = player.events()
+        self.assertEqual((event.type, event.key, event.unicode),
+                         (pygame.KEYDOWN, pygame.K_c, 'c'))
+        self.assertEqual(list(player.keys()), pressed)
+        self.assertEqual(tuple(player.mouse_pos()), (320, 200))
+        self.assertEqual(player.mouse_buttons(), (True, False, False))
+        self.assertEqual(player.tick(), 16)
+        self.assertEqual(player.events(), [])
+        self.assertTrue(player.finished())
+
+    def test_repeats(self):
+        '''repeated input should take a byte per record'''
+        recorder = Recorder(self.filename, 0)
+        recorder.tick(16)
+        size = recorder.log.tell()
+        for i in range(10):
+            recorder.tick(16)
+        self.assertEqual(recorder.log.tell() - size, 10)
+        recorder.close()
+
+    def test_mismatch(self):
+        '''reading other input than recorded should fail'''
+        recorder = Recorder(self.filename, 0)
+        recorder.tick(16)
+        recorder.close()
+        self.assertRaises(ReplayError, Player(self.filename).events)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+try:
+    import random, unittest
+    import pygame
+    from spatial import *
+    from level import Room, Item
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+BOUNDS = pygame.Rect(0, 0, 800, 600)
+
+class IndexTests(object):
+    '''Tests both indexes should pass (compared with looking at all
+    the rectangles); the test cases set index_class to what makes
+    an empty index.'''
+
+    def setUp(self):
+        self.random = random.Random(1)
+        self.index = self.index_class()
+        self.rects = {}
+        for i in range(300):
+            self.insert(i, self.random_rect())
+
+    def random_rect(self):
+        # some entities outside the bounds, most crowded in a corner
+        if self.random.random() < 0.7:
+            left, top = self.random.randint(0, 100), self.random.randint(0, 100)
+        else:
+            left, top = self.random.randint(-50, 850), self.random.randint(-50, 650)
+        return pygame.Rect(left, top, self.random.randint(1, 80),
+                           self.random.randint(1, 80))
+
+    def insert(self, entity, rect):
+        self.index.insert(entity, rect)
+        self.rects[entity] = rect
+
+    def check_queries(self):
+        for i in range(200):
+            pos = (self.random.randint(-60, 860), self.random.randint(-60, 660))
+            self.assertEqual(self.index.query_point(pos),
+                             [e for e in sorted(self.rects)
+                              if self.rects[e].collidepoint(pos)])
+            rect = self.random_rect()
+            self.assertEqual(self.index.query_rect(rect),
+                             [e for e in sorted(self.rects)
+                              if self.rects[e].colliderect(rect)])
+
+    def test_queries(self):
+        '''the queries should find what looking at all the entities finds'''
+        self.assertEqual(len(self.index), 300)
+        self.check_queries()
+
+    def test_move_and_remove(self):
+        '''moved and removed entities should be found where they are'''
+        for entity in range(0, 300, 3):
+            self.index.remove(entity)
+            del self.rects[entity]
+        for entity in range(1, 300, 3):
+            rect = self.random_rect()
+            self.index.move(entity, rect)
+            self.rects[entity] = rect
+        self.assertEqual(len(self.index), 200)
+        self.assertFalse(0 in self.index)
+        self.check_queries()
+
+    def test_bad_input(self):
+        '''an entity should be inserted once and removed once'''
+        self.assertRaises(ValueError, self.index.insert, 1, (0, 0, 1, 1))
+        self.index.remove(1)
+        self.assertRaises(KeyError, self.index.remove, 1)
+
+class SpatialHashTests(IndexTests, unittest.TestCase):
+    '''Tests related with the spatial hash.'''
+
+    index_class = SpatialHash
+
+class QuadTreeTests(IndexTests, unittest.TestCase):
+    '''Tests related with the quadtree.'''
+
+    index_class = staticmethod(lambda: QuadTree(BOUNDS))
+
+    def test_split(self):
+        '''crowded quadrants should be split'''
+        self.assertTrue(self.index.root.children is not None)
+
+class RoomTests(unittest.TestCase):
+    '''Tests related with the sites of a room.'''
+
+    def test_pick(self):
+        '''the topmost site under the mouse should be picked'''
+        for uneven in (False, True):
+            room = Room('office', BOUNDS, uneven)
+            desk = Item('desk', (100, 100, 200, 100))
+            clue = Item('clue', (150, 120, 10, 10))
+            room.add_site(desk)
+            room.add_site(clue)
+            self.assertTrue(room.pick((155, 125)) is clue)
+            self.assertTrue(room.pick((110, 110)) is desk)
+            self.assertTrue(room.pick((10, 10)) is None)
+
+            room.move_site(desk, (400, 400))
+            self.assertTrue(room.pick((155, 125)) is clue)
+            self.assertTrue(room.pick((410, 410)) is desk)
+            self.assertEqual(room.collide((0, 0, 800, 600)), [desk, clue])
+
+            room.remove_site(clue)
+            self.assertTrue(room.pick((155, 125)) is None)
+
+if __name__ == '__main__':
+    unittest.main()
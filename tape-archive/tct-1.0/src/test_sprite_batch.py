@@ -0,0 +1,83 @@
+try:
+    import unittest
+    import pygame
+    import anim_sprite
+    from sprite_batch import *
+except ImportError as err:
+    try:
+        import os
+        path = os.path.basename(__file__)
+        print((': '.join((path, str(err)))))
+    except ImportError:
+        print((': '.join(("couldn't load module", str(err)))))
+    exit(2)
+
+AREA = pygame.Rect(0, 0, 200, 100)
+
+class Batch(unittest.TestCase):
+    '''Tests related with the movement of the batched sprites.'''
+
+    def setUp(self):
+        anim_sprite.rng.seed(1)
+        self.batch = SpriteBatch(AREA)
+        self.image = pygame.Surface((10, 20))
+
+    def test_move(self):
+        '''each sprite should move along its own axis'''
+        self.batch.add(self.image, (0, 0), 100.0, HORIZONTAL)
+        self.batch.add(self.image, (0, 0), 50.0, VERTICAL)
+        self.batch.update(0.5)
+        self.assertEqual(self.batch.position[:2].tolist(),
+                         [[50.0, 0.0], [0.0, 25.0]])
+        self.batch.interpolate(0.5)
+        self.assertEqual(self.batch.drawn[:2].tolist(),
+                         [[25.0, 0.0], [0.0, 12.5]])
+
+    def test_wrap(self):
+        '''a sprite leaving the screen should jump before it, within its limits'''
+        self.batch.add(self.image, (0, 90), 100.0, VERTICAL)
+        self.batch.update(0.1)
+        x, y = self.batch.position[0]
+        self.assertEqual(y, AREA.top - AREA.height)
+        self.assertTrue(AREA.left + 10 <= x <= AREA.right - 10)
+        self.assertEqual(self.batch.previous[0].tolist(), [x, y])
+
+    def test_seed(self):
+        '''the same seed should place the sprites at the same places'''
+        places = []
+        for i in range(2):
+            anim_sprite.rng.seed(2)
+            batch = SpriteBatch(AREA)
+            batch.add(self.image, (0, 0), 1000.0, HORIZONTAL)
+            for step in range(10):
+                batch.update(0.1)
+            places.append(batch.position[0].tolist())
+        self.assertEqual(places[0], places[1])
+
+    def test_grow(self):
+        '''adding many sprites should keep the earlier ones'''
+        for i in range(100):
+            self.batch.add(self.image, (i, 0), 100.0, HORIZONTAL)
+        self.assertEqual(self.batch.count, 100)
+        self.assertEqual(self.batch.position[:100, 0].tolist(), list(range(100)))
+        self.assertEqual(self.batch.sources, [self.image])
+        self.assertEqual(len(self.batch.images), 1)
+
+    def test_draw(self):
+        '''drawing should return the rectangle of every sprite'''
+        for i in range(3):
+            self.batch.add(self.image, (i * 20, 0), 100.0, HORIZONTAL)
+        self.batch.interpolate(1.0)
+        rects = self.batch.draw(pygame.Surface(AREA.size))
+        self.assertEqual([tuple(r) for r in rects],
+                         [(0, 0, 10, 20), (20, 0, 10, 20), (40, 0, 10, 20)])
+
+    def test_alpha(self):
+        '''the alpha should change the batch's images only'''
+        self.batch.add(self.image, (0, 0), 100.0, HORIZONTAL)
+        self.batch.set_alpha(80)
+        self.assertEqual(self.batch.images[0].get_alpha(), 80)
+        self.assertEqual(self.image.get_alpha(), None)
+
+if __name__ == '__main__':
+    unittest.main()